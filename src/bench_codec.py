@@ -0,0 +1,67 @@
+from core.codec import JSONCodec, FastJSONCodec, MsgpackCodec
+import json
+import os
+import sys
+import time
+
+# 对比各编解码器在 save_samples_batch 形状负载上的编码/解码耗时与体积
+# 用法: python bench_codec.py [样本数，默认 10000]
+
+def load_samples(path, num_samples):
+    """
+    以 test_dataset.jsonl 中的问答为素材，构造 save_samples_batch 的样本列表
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+
+    samples = []
+    for i in range(num_samples):
+        messages = records[i % len(records)]["messages"]
+        samples.append({
+            "input": messages[1]["content"],
+            "output": messages[2]["content"],
+            "topic_path": ["人工智能", "基础概念", f"主题{i % 50}"],
+            "input_model_name": "Qwen/Qwen2.5-72B-Instruct-Turbo",
+            "input_provider": "together_ai",
+            "output_model_name": "Qwen/Qwen2.5-72B-Instruct-Turbo",
+            "output_provider": "together_ai",
+            "prompt_method": "simple_prompt_builder",
+            "human_guidance": messages[0]["content"]
+        })
+    return {"samples": samples}
+
+
+def bench(codec, payload, rounds=5):
+    encoded = codec.encode(payload)
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        codec.encode(payload)
+    encode_ms = (time.perf_counter() - start) / rounds * 1000
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        codec.decode(encoded)
+    decode_ms = (time.perf_counter() - start) / rounds * 1000
+
+    return len(encoded), encode_ms, decode_ms
+
+
+def main():
+    num_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    dataset_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_dataset.jsonl")
+    payload = load_samples(dataset_path, num_samples)
+
+    print(f"样本数: {num_samples}")
+    print(f"{'codec':<10}{'bytes':>14}{'encode ms':>12}{'decode ms':>12}")
+    for codec_class in (JSONCodec, FastJSONCodec, MsgpackCodec):
+        try:
+            codec = codec_class()
+        except ImportError as e:
+            print(f"{codec_class.name:<10}跳过: {str(e)}")
+            continue
+        size, encode_ms, decode_ms = bench(codec, payload)
+        print(f"{codec.name:<10}{size:>14}{encode_ms:>12.1f}{decode_ms:>12.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+import asyncio
+import json
+from typing import Callable, Dict, Optional, Any, Union
+
+import aiohttp
+from multidict import CIMultiDict
+
+from core.cache import ResponseCache
+from core.coalesce import AsyncSingleFlight, request_key
+from core.codec import decode_response_body, encode_request_kwargs, get_codec
+from core.conditional import ValidatorEntry, ValidatorStore
+from core.compression import DEFAULT_COMPRESS_LEVEL, DEFAULT_COMPRESS_THRESHOLD, compress_request_kwargs
+from core.retry import RetryPolicy, is_replayable
+from core.transport import PoolStats
+
+
+class AsyncResponse:
+    """
+    已读取完毕的异步响应，接口与 requests.Response 的常用部分保持一致
+    """
+
+    def __init__(self, status_code: int, headers: CIMultiDict, content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self) -> Any:
+        return json.loads(self.content)
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise Exception(f"HTTP {self.status_code}: {self.text}")
+
+
+class AsyncHetuAITransport:
+    """
+    HetuAI 异步 HTTP 传输层，基于 aiohttp 共享连接池并限制并发请求数
+
+    同一事件循环内的多个异步客户端可以共享同一个实例。被取消的调用会立即中止
+    对应的请求并释放并发名额。
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 100,
+        limit: int = 100,
+        limit_per_host: int = 0,
+        keepalive_timeout: float = 15.0,
+        timeout: Optional[float] = None,
+        compression: bool = False,
+        compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+        compress_level: int = DEFAULT_COMPRESS_LEVEL,
+        codec: Union[str, Any] = "json",
+        retry_policy: Optional[RetryPolicy] = None,
+        coalesce: bool = True,
+        cache: Optional[ResponseCache] = None,
+        validators: Optional[ValidatorStore] = None
+    ):
+        """
+        初始化异步传输层
+
+        Args:
+            max_concurrency: 同时在途的最大请求数，超出的调用排队等待
+            limit: 连接池的最大连接总数，0 表示不限制
+            limit_per_host: 每个主机的最大连接数，0 表示不限制
+            keepalive_timeout: 空闲连接保持时间（秒）
+            timeout: 默认请求超时时间（秒），None 表示不超时
+            compression: 是否启用 gzip 压缩模式，启用后超过阈值的请求体会被压缩
+            compress_threshold: 触发请求体压缩的最小字节数
+            compress_level: gzip 压缩级别（1-9）
+            codec: 请求/响应体的编解码器，可选 json（默认）、fastjson、msgpack 或编解码器实例
+            retry_policy: 重试策略，不传时使用默认策略；传入 RetryPolicy(max_attempts=1) 可关闭重试
+            coalesce: 是否合并并发的相同 GET 请求，合并后只发出一次请求并共享结果
+            cache: 读接口的响应缓存（可选），不传时不缓存
+            validators: 条件请求校验器存储（可选），设置后非流式 GET 请求携带
+                If-None-Match / If-Modified-Since，304 时使用保存的响应体
+        """
+        self.max_concurrency = max_concurrency
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = timeout
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self.codec = get_codec(codec)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache
+        self.validators = validators
+        self.single_flight = AsyncSingleFlight() if coalesce else None
+        self.pool_stats = PoolStats()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._in_flight = 0
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # aiohttp 要求在事件循环内创建会话，因此延迟到首次请求时创建
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                keepalive_timeout=self.keepalive_timeout
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[self._build_trace_config()]
+            )
+        return self._session
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        stats = self.pool_stats
+
+        async def on_request_start(session, ctx, params):
+            ctx.host = params.url.host or ""
+
+        async def on_connection_create_end(session, ctx, params):
+            stats.record_checkout(ctx.host)
+            stats.record_new_connection(ctx.host)
+
+        async def on_connection_reuseconn(session, ctx, params):
+            stats.record_checkout(ctx.host)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    async def request(
+        self,
+        method: str,
+        url: str,
+        idempotency_key: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        on_attempt: Optional[Callable[[int], None]] = None,
+        **kwargs
+    ) -> AsyncResponse:
+        """
+        发送 HTTP 请求并读取完整响应，按重试策略自动重试
+
+        Args:
+            method: HTTP 方法
+            url: 请求 URL
+            idempotency_key: 幂等键（可选），作为 Idempotency-Key 头发送，
+                重试时保持不变，使非幂等请求也可以安全重试
+            endpoint: 接口名（可选），用于匹配缓存 TTL
+            on_attempt: 每次尝试收到响应后的回调（可选），参数为状态码；重试前的
+                429/503 也会传给回调，例如用于自适应限流
+            **kwargs: 透传给 aiohttp.ClientSession.request 的参数，
+                timeout 可以是秒数
+
+        Returns:
+            响应对象
+        """
+        timeout = kwargs.pop("timeout", None)
+        if timeout is not None and not isinstance(timeout, aiohttp.ClientTimeout):
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        elif timeout is not None:
+            kwargs["timeout"] = timeout
+        if idempotency_key:
+            headers = dict(kwargs.get("headers") or {})
+            headers["Idempotency-Key"] = idempotency_key
+            kwargs["headers"] = headers
+        kwargs = encode_request_kwargs(kwargs, self.codec)
+        if self.compression:
+            kwargs = compress_request_kwargs(kwargs, self.compress_threshold, self.compress_level)
+
+        # 流式请求（stream=True，文件下载与 iter_* 迭代器）不经过读接口缓存与条件请求：
+        # 保存或重放完整响应体与固定内存的流式读取相矛盾
+        is_read = method.upper() == "GET" and not kwargs.get("stream")
+        cache_key = None
+        generation = None
+        if is_read and self.cache is not None and self.cache.is_cacheable(endpoint):
+            cache_key = request_key(method, url, kwargs)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = self.cache.generation
+
+        send = self._send_conditional if is_read and self.validators is not None else self._send
+        if is_read and self.single_flight is not None:
+            key = cache_key or request_key(method, url, kwargs)
+            response = await self.single_flight.do(key, lambda: send(method, url, idempotency_key, kwargs, on_attempt))
+        else:
+            response = await send(method, url, idempotency_key, kwargs, on_attempt)
+
+        if cache_key is not None and response.status_code == 200:
+            self.cache.put(endpoint, cache_key, response, generation)
+        return response
+
+    async def _send_conditional(
+        self,
+        method: str,
+        url: str,
+        idempotency_key: Optional[str],
+        kwargs: Dict[str, Any],
+        on_attempt: Optional[Callable[[int], None]] = None
+    ) -> AsyncResponse:
+        key = request_key(method, url, kwargs)
+        entry = self.validators.get(key)
+        if entry is not None:
+            headers = dict(kwargs.get("headers") or {})
+            headers.update(entry.conditional_headers())
+            kwargs = dict(kwargs, headers=headers)
+
+        response = await self._send(method, url, idempotency_key, kwargs, on_attempt)
+        if response.status_code == 304 and entry is not None:
+            self.validators.record_not_modified(entry)
+            return self._response_from_entry(entry, response)
+        if response.status_code == 200:
+            self.validators.put(key, response.headers, response.content)
+        return response
+
+    def _response_from_entry(self, entry: ValidatorEntry, response: AsyncResponse) -> AsyncResponse:
+        return AsyncResponse(200, CIMultiDict(entry.headers), entry.read_content())
+
+    async def _send(
+        self,
+        method: str,
+        url: str,
+        idempotency_key: Optional[str],
+        kwargs: Dict[str, Any],
+        on_attempt: Optional[Callable[[int], None]] = None
+    ) -> AsyncResponse:
+        policy = self.retry_policy
+        replayable = is_replayable(kwargs)
+        idempotent = policy.is_idempotent(method, idempotency_key) and replayable
+        policy.record_request()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = await self._send_once(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                delay = policy.next_delay(attempt, idempotent)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                continue
+
+            if on_attempt is not None:
+                on_attempt(response.status_code)
+            delay = None
+            if replayable:
+                delay = policy.next_delay(
+                    attempt, idempotent, response.status_code, response.headers.get("Retry-After")
+                )
+            if delay is None:
+                return response
+            await asyncio.sleep(delay)
+
+    async def _send_once(self, method: str, url: str, **kwargs) -> AsyncResponse:
+        async with self._semaphore:
+            self._in_flight += 1
+            try:
+                session = self._get_session()
+                async with session.request(method, url, **kwargs) as response:
+                    content = await response.read()
+                    return AsyncResponse(response.status, CIMultiDict(response.headers), content)
+            finally:
+                self._in_flight -= 1
+
+    async def get(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request("POST", url, **kwargs)
+
+    async def patch(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request("PATCH", url, **kwargs)
+
+    async def delete(self, url: str, **kwargs) -> AsyncResponse:
+        return await self.request("DELETE", url, **kwargs)
+
+    @property
+    def in_flight(self) -> int:
+        """
+        当前在途的请求数
+        """
+        return self._in_flight
+
+    def decode(self, response: AsyncResponse) -> Any:
+        """
+        按响应的 Content-Type 使用对应的编解码器解析响应体
+
+        Args:
+            response: 响应对象
+
+        Returns:
+            解析后的对象
+        """
+        return decode_response_body(response.content, response.headers.get("Content-Type", ""), self.codec)
+
+    def invalidate_cache(self, url: str, prefix: bool = False) -> None:
+        """
+        使指定 URL 的缓存失效，写操作成功后由客户端调用
+
+        Args:
+            url: 请求 URL
+            prefix: 为 True 时同时失效该 URL 下的所有子路径
+        """
+        if self.cache is not None:
+            self.cache.invalidate(url, prefix)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            包含 hits、misses、evictions、expirations、invalidations、size 的字典
+        """
+        if self.cache is None:
+            return {}
+        return self.cache.get_stats()
+
+    def get_conditional_stats(self) -> Dict[str, Any]:
+        """
+        获取条件请求统计
+
+        Returns:
+            包含 revalidations、not_modified、bytes_saved 等字段的字典
+        """
+        if self.validators is None:
+            return {}
+        return self.validators.get_stats()
+
+    def get_coalesce_stats(self) -> Dict[str, int]:
+        """
+        获取请求合并统计
+
+        Returns:
+            executed 为实际发出的 GET 请求数，coalesced 为被合并（节省）的请求数
+        """
+        if self.single_flight is None:
+            return {"executed": 0, "coalesced": 0}
+        return self.single_flight.get_stats()
+
+    def get_retry_stats(self) -> Dict[str, Any]:
+        """
+        获取重试统计
+
+        Returns:
+            包含 requests、retries、budget_exhausted 及剩余预算的字典
+        """
+        return self.retry_policy.get_stats()
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        获取连接池命中统计
+
+        Returns:
+            包含 hits、misses、hit_rate 及各主机明细的字典
+        """
+        return self.pool_stats.snapshot()
+
+    async def close(self) -> None:
+        """
+        关闭会话及所有连接
+        """
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> "AsyncHetuAITransport":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -0,0 +1,141 @@
+import threading
+from typing import Dict, Optional, Any
+
+
+class AdaptiveBatchSizer:
+    """
+    根据观测到的请求耗时与请求体字节数自动调整批量写接口的批大小
+
+    每个成功的批次更新两个指数滑动平均：每个样本的耗时和每个样本序列化后的字节数。
+    下一批的大小取 target_seconds / 每样本耗时 与 max_bytes / 每样本字节数 中较小者，
+    每次最多增长到上一批的 max_growth 倍，并限制在 [min_size, max_size] 内。
+
+    批次被拒绝（413 或超时）时批大小立即减半；413 时把本次请求体字节数的
+    reject_ratio 倍记为新的字节上限，此后的批次不会再超过它。
+
+    用法:
+
+        sizer = AdaptiveBatchSizer(target_seconds=2.0)
+        result = client.save_samples_adaptive(project_id, task_id, samples, sizer=sizer)
+        print(sizer.get_stats())
+    """
+
+    def __init__(
+        self,
+        target_seconds: float = 2.0,
+        initial_size: int = 50,
+        min_size: int = 1,
+        max_size: int = 1000,
+        max_bytes: Optional[int] = None,
+        smoothing: float = 0.3,
+        max_growth: float = 2.0,
+        reject_ratio: float = 0.75
+    ):
+        """
+        初始化批大小控制器
+
+        Args:
+            target_seconds: 每个请求的目标耗时（秒）
+            initial_size: 初始批大小
+            min_size: 最小批大小
+            max_size: 最大批大小
+            max_bytes: 请求体字节数上限（可选），遇到 413 时会自动学习
+            smoothing: 滑动平均系数，越大越偏向最近的观测
+            max_growth: 每次调整的最大增长倍数
+            reject_ratio: 413 时新字节上限相对被拒请求体的比例
+        """
+        self.target_seconds = target_seconds
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.smoothing = smoothing
+        self.max_growth = max_growth
+        self.reject_ratio = reject_ratio
+        self._size = max(min_size, min(initial_size, max_size))
+        self._seconds_per_sample: Optional[float] = None
+        self._bytes_per_sample: Optional[float] = None
+        self._batches = 0
+        self._rejected = 0
+        self._too_large = 0
+        self._timeouts = 0
+        self._lock = threading.Lock()
+
+    def _smooth(self, current: Optional[float], value: float) -> float:
+        if current is None:
+            return value
+        return current + self.smoothing * (value - current)
+
+    def next_size(self) -> int:
+        """
+        下一批的样本数
+        """
+        with self._lock:
+            return self._size
+
+    def fit_bytes(self, count: int, nbytes: int) -> bool:
+        """
+        count 个样本、共 nbytes 字节的批次是否在已知的字节上限内
+        """
+        return count <= 1 or self.max_bytes is None or nbytes <= self.max_bytes
+
+    def observe(self, count: int, nbytes: int, seconds: float) -> None:
+        """
+        记录一个成功的批次
+
+        Args:
+            count: 样本数
+            nbytes: 请求体字节数
+            seconds: 请求耗时
+        """
+        if count <= 0:
+            return
+        with self._lock:
+            self._batches += 1
+            self._seconds_per_sample = self._smooth(self._seconds_per_sample, max(seconds, 1e-6) / count)
+            self._bytes_per_sample = self._smooth(self._bytes_per_sample, max(nbytes, 1) / count)
+
+            size = self.target_seconds / self._seconds_per_sample
+            if self.max_bytes is not None:
+                size = min(size, self.max_bytes / self._bytes_per_sample)
+            size = min(size, max(count, self._size) * self.max_growth)
+            self._size = max(self.min_size, min(int(size), self.max_size))
+
+    def reject(self, count: int, nbytes: int, too_large: bool) -> None:
+        """
+        记录一个被拒绝的批次（413 或超时），批大小减半
+
+        Args:
+            count: 样本数
+            nbytes: 请求体字节数
+            too_large: 是否为 413（否则为超时）
+        """
+        with self._lock:
+            self._rejected += 1
+            if too_large:
+                self._too_large += 1
+                if count > 1:
+                    limit = int(nbytes * self.reject_ratio)
+                    self.max_bytes = limit if self.max_bytes is None else min(self.max_bytes, limit)
+            else:
+                self._timeouts += 1
+            self._size = max(self.min_size, min(self._size, count) // 2)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            包含 size、seconds_per_sample、bytes_per_sample、max_bytes、batches、
+            rejected、too_large、timeouts 的字典
+        """
+        with self._lock:
+            return {
+                "size": self._size,
+                "seconds_per_sample": self._seconds_per_sample,
+                "bytes_per_sample": self._bytes_per_sample,
+                "max_bytes": self.max_bytes,
+                "batches": self._batches,
+                "rejected": self._rejected,
+                "too_large": self._too_large,
+                "timeouts": self._timeouts
+            }
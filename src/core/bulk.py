@@ -0,0 +1,125 @@
+import asyncio
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Awaitable, Callable, Dict, Iterable, Iterator, List, Any
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def _item_result(index: int, item: Any, result: Any = None, error: BaseException = None) -> Dict[str, Any]:
+    return {
+        "index": index,
+        "item": item,
+        "success": error is None,
+        "result": result,
+        "error": None if error is None else str(error)
+    }
+
+
+def iter_bulk(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    ordered: bool = True
+) -> Iterator[Dict[str, Any]]:
+    """
+    用线程池对每个元素调用 fn，逐个返回每个元素的结果
+
+    同时最多 max_workers 个调用，元素按需从迭代器中读取。单个元素出错不会中断
+    其他元素，错误记录在该元素的结果中。
+
+    Args:
+        fn: 对单个元素执行的操作
+        items: 元素迭代器
+        max_workers: 最大并发数
+        ordered: 是否按输入顺序返回；为 False 时按完成顺序返回
+
+    Returns:
+        结果迭代器，每个结果包含 index、item、success、result 和 error
+    """
+    pending = enumerate(items)
+    futures = {}
+    finished = {}
+    next_index = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            # 按顺序返回时，已完成但排在前面的调用未结束的结果暂存在 finished 中，也计入窗口
+            while len(futures) < max_workers and len(finished) < max_workers * 4:
+                entry = next(pending, None)
+                if entry is None:
+                    break
+                index, item = entry
+                futures[executor.submit(fn, item)] = (index, item)
+            if not futures:
+                break
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, item = futures.pop(future)
+                error = future.exception()
+                result = _item_result(index, item, None if error else future.result(), error)
+                if not ordered:
+                    yield result
+                    continue
+                finished[index] = result
+            while next_index in finished:
+                yield finished.pop(next_index)
+                next_index += 1
+
+
+def run_bulk(
+    fn: Callable[[Any], Any],
+    items: Iterable[Any],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    ordered: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    iter_bulk 的列表版本，参数与结果格式同 iter_bulk
+    """
+    return list(iter_bulk(fn, items, max_workers=max_workers, ordered=ordered))
+
+
+async def run_bulk_async(
+    fn: Callable[[Any], Awaitable[Any]],
+    items: Iterable[Any],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    ordered: bool = True
+) -> List[Dict[str, Any]]:
+    """
+    run_bulk 的 asyncio 版本，fn 为协程函数
+
+    Args:
+        fn: 对单个元素执行的协程函数
+        items: 元素迭代器
+        max_workers: 最大并发数
+        ordered: 是否按输入顺序返回；为 False 时按完成顺序返回
+
+    Returns:
+        结果列表，每个结果包含 index、item、success、result 和 error
+    """
+    pending = enumerate(items)
+    tasks = {}
+    results = []
+    try:
+        while True:
+            while len(tasks) < max_workers:
+                entry = next(pending, None)
+                if entry is None:
+                    break
+                index, item = entry
+                tasks[asyncio.ensure_future(fn(item))] = (index, item)
+            if not tasks:
+                break
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index, item = tasks.pop(task)
+                # 单个元素的协程被取消时记为失败，task.exception() 会直接抛出 CancelledError
+                error = asyncio.CancelledError("已取消") if task.cancelled() else task.exception()
+                results.append(_item_result(index, item, None if error else task.result(), error))
+    finally:
+        # 调用方取消或出错时取消并等待尚未完成的调用，不留下孤立的任务
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    if ordered:
+        results.sort(key=lambda result: result["index"])
+    return results
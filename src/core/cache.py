@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Any
+
+# 各读接口的默认缓存时间（秒）
+DEFAULT_CACHE_TTLS = {
+    "get_projects": 30.0,
+    "get_project": 30.0,
+    "get_tasks": 30.0,
+    "get_task": 30.0,
+    "get_dataset_splits": 30.0,
+    "get_finetune_providers": 600.0,
+    "get_finetune_hyperparameters": 600.0
+}
+
+
+class ResponseCache:
+    """
+    读接口的内存缓存，按接口设置 TTL，超出容量时按 LRU 淘汰
+
+    缓存的是原始响应，每次命中都会重新解析，调用方拿到的对象互不影响。
+    键由 core.coalesce.request_key 计算，第二个元素为请求 URL，用于写操作后失效。
+    """
+
+    def __init__(self, max_entries: int = 1024, ttls: Optional[Dict[str, float]] = None):
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 最大缓存条目数
+            ttls: 接口名到缓存时间（秒）的映射，不传时使用 DEFAULT_CACHE_TTLS；
+                未列出的接口不缓存
+        """
+        self.max_entries = max_entries
+        self.ttls = dict(DEFAULT_CACHE_TTLS if ttls is None else ttls)
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    @property
+    def generation(self) -> int:
+        """
+        失效计数，每次失效或清空时递增
+        """
+        return self._generation
+
+    def is_cacheable(self, endpoint: Optional[str]) -> bool:
+        return endpoint is not None and self.ttls.get(endpoint, 0) > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        查询缓存
+
+        Args:
+            key: 请求键
+
+        Returns:
+            缓存的响应，未命中或已过期时返回 None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            response, expires_at = entry
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return response
+
+    def put(self, endpoint: str, key: Hashable, response: Any, generation: Optional[int] = None) -> None:
+        """
+        写入缓存
+
+        Args:
+            endpoint: 接口名，用于确定 TTL
+            key: 请求键
+            response: 响应对象
+            generation: 发出请求前读取的 generation，期间发生过失效时不写入，
+                避免写操作之前发出的读请求把旧数据放回缓存
+        """
+        ttl = self.ttls.get(endpoint, 0)
+        if ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (response, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, url: str, prefix: bool = False) -> int:
+        """
+        使指定 URL 的缓存失效
+
+        Args:
+            url: 请求 URL
+            prefix: 为 True 时同时失效该 URL 下的所有子路径
+
+        Returns:
+            失效的条目数
+        """
+        with self._lock:
+            keys = [
+                key for key in self._entries
+                if key[1] == url or (prefix and key[1].startswith(url.rstrip("/") + "/"))
+            ]
+            for key in keys:
+                del self._entries[key]
+            self._stats["invalidations"] += len(keys)
+            self._generation += 1
+        return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            包含 hits、misses、evictions、expirations、invalidations、size 的字典
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["size"] = len(self._entries)
+        return stats
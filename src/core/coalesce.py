@@ -0,0 +1,141 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Any, Tuple
+
+# 参与请求键计算的请求头：影响响应内容的头
+KEY_HEADERS = ("Authorization", "Accept")
+
+
+def request_key(method: str, url: str, kwargs: Dict[str, Any]) -> Tuple:
+    """
+    计算请求的标识键：方法、URL、查询参数以及影响响应内容的请求头
+
+    Args:
+        method: HTTP 方法
+        url: 请求 URL
+        kwargs: 请求参数
+
+    Returns:
+        可哈希的请求键
+    """
+    params = kwargs.get("params") or {}
+    if isinstance(params, dict):
+        params = tuple(sorted((str(k), str(v)) for k, v in params.items()))
+    headers = kwargs.get("headers") or {}
+    header_values = tuple(headers.get(name) for name in KEY_HEADERS)
+    return (method.upper(), url, params, header_values)
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """
+    合并并发的相同请求：同一个键同时只执行一次，其余调用方等待并共享结果（线程版）
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._stats = {"executed": 0, "coalesced": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        执行或加入一次调用
+
+        Args:
+            key: 请求键
+            fn: 实际执行请求的函数
+
+        Returns:
+            fn 的返回值（所有等待者共享同一个结果）
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._stats["coalesced"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._stats["executed"] += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取合并统计
+
+        Returns:
+            executed 为实际发出的请求数，coalesced 为被合并（节省）的请求数
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight 的 asyncio 版本
+
+    实际请求在独立的任务中执行，某个调用方被取消不会影响其他等待者。
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._stats = {"executed": 0, "coalesced": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        执行或加入一次调用
+
+        Args:
+            key: 请求键
+            fn: 返回协程的函数，实际执行请求
+
+        Returns:
+            协程的返回值（所有等待者共享同一个结果）
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self._stats["executed"] += 1
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: Hashable, task: asyncio.Future) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            # 所有等待者都被取消时避免 "exception was never retrieved" 警告
+            task.exception()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        获取合并统计
+
+        Returns:
+            executed 为实际发出的请求数，coalesced 为被合并（节省）的请求数
+        """
+        return dict(self._stats)
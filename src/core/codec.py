@@ -0,0 +1,135 @@
+import json
+from typing import Dict, Any, Union
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # 可选依赖
+    msgpack = None
+
+from core.models import encode_model
+
+
+class JSONCodec:
+    """
+    基于标准库 json 的编解码器（默认）
+    """
+
+    name = "json"
+    content_type = "application/json"
+    accept = "application/json"
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=encode_model).encode("utf-8")
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class FastJSONCodec(JSONCodec):
+    """
+    基于 orjson 的快速 JSON 编解码器，线上格式与 JSONCodec 相同
+    """
+
+    name = "fastjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("fastjson 编解码器需要安装 orjson: pip install orjson")
+
+    def encode(self, obj: Any) -> bytes:
+        return orjson.dumps(obj, default=encode_model)
+
+    def decode(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+
+class MsgpackCodec:
+    """
+    基于 msgpack 的二进制编解码器，通过 Accept/Content-Type 与服务端协商
+    """
+
+    name = "msgpack"
+    content_type = "application/msgpack"
+    accept = "application/msgpack, application/json;q=0.9"
+
+    def __init__(self):
+        if msgpack is None:
+            raise ImportError("msgpack 编解码器需要安装 msgpack: pip install msgpack")
+
+    def encode(self, obj: Any) -> bytes:
+        return msgpack.packb(obj, use_bin_type=True, default=encode_model)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False)
+
+
+_CODECS = {
+    "json": JSONCodec,
+    "fastjson": FastJSONCodec,
+    "msgpack": MsgpackCodec
+}
+
+
+def get_codec(codec: Union[str, Any] = "json") -> Any:
+    """
+    获取编解码器实例
+
+    Args:
+        codec: 编解码器名称（json、fastjson、msgpack）或已创建的编解码器实例
+
+    Returns:
+        编解码器实例
+    """
+    if not isinstance(codec, str):
+        return codec
+    if codec not in _CODECS:
+        raise ValueError(f"不支持的编解码器: {codec}")
+    return _CODECS[codec]()
+
+
+def encode_request_kwargs(kwargs: Dict[str, Any], codec: Any) -> Dict[str, Any]:
+    """
+    用编解码器序列化 json 参数，并设置 Content-Type 与 Accept
+
+    Args:
+        kwargs: 传给底层 HTTP 库的请求参数
+        codec: 编解码器实例
+
+    Returns:
+        处理后的请求参数
+    """
+    headers = dict(kwargs.get("headers") or {})
+    headers["Accept"] = codec.accept
+    if kwargs.get("json") is not None:
+        kwargs["data"] = codec.encode(kwargs.pop("json"))
+        headers["Content-Type"] = codec.content_type
+    else:
+        kwargs.pop("json", None)
+    kwargs["headers"] = headers
+    return kwargs
+
+
+def decode_response_body(content: bytes, content_type: str, codec: Any) -> Any:
+    """
+    按响应的 Content-Type 选择编解码器解析响应体
+
+    Args:
+        content: 响应体
+        content_type: 响应的 Content-Type
+        codec: 请求时使用的编解码器
+
+    Returns:
+        解析后的对象
+    """
+    if "msgpack" in (content_type or ""):
+        if codec.name != "msgpack":
+            codec = MsgpackCodec()
+        return codec.decode(content)
+    if codec.name == "msgpack":
+        return json.loads(content)
+    return codec.decode(content)
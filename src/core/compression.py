@@ -0,0 +1,39 @@
+import gzip
+from typing import Dict, Any
+
+DEFAULT_COMPRESS_THRESHOLD = 16 * 1024
+DEFAULT_COMPRESS_LEVEL = 6
+
+
+def compress_request_kwargs(
+    kwargs: Dict[str, Any],
+    threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+    level: int = DEFAULT_COMPRESS_LEVEL
+) -> Dict[str, Any]:
+    """
+    对超过阈值的请求体进行 gzip 压缩并设置 Content-Encoding
+
+    只压缩已序列化为 bytes 的 data（json 参数由编解码器先行序列化）；表单、文件
+    等其他请求体保持不变。同时声明可接受 gzip 响应，响应体由 urllib3/aiohttp
+    在读取时流式解压。
+
+    Args:
+        kwargs: 传给底层 HTTP 库的请求参数
+        threshold: 触发压缩的最小请求体字节数
+        level: gzip 压缩级别（1-9）
+
+    Returns:
+        处理后的请求参数
+    """
+    headers = dict(kwargs.get("headers") or {})
+    headers.setdefault("Accept-Encoding", "gzip, deflate")
+
+    body = kwargs.get("data")
+    if isinstance(body, (bytes, bytearray)):
+        if len(body) >= threshold and "Content-Encoding" not in headers:
+            body = gzip.compress(bytes(body), compresslevel=level)
+            headers["Content-Encoding"] = "gzip"
+        kwargs["data"] = body
+
+    kwargs["headers"] = headers
+    return kwargs
@@ -0,0 +1,179 @@
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Hashable, Optional, Any
+
+
+class ValidatorEntry:
+    """
+    一个已保存的响应：校验器（ETag / Last-Modified）、响应头以及响应体
+
+    响应体较大时保存在磁盘文件中，内存中只保留路径。
+    """
+
+    __slots__ = ("etag", "last_modified", "headers", "content", "path", "size")
+
+    def __init__(
+        self,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        headers: Dict[str, str],
+        content: Optional[bytes] = None,
+        path: Optional[str] = None,
+        size: int = 0
+    ):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.headers = headers
+        self.content = content
+        self.path = path
+        self.size = size
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def read_content(self) -> bytes:
+        if self.content is not None:
+            return self.content
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def open_content(self) -> BinaryIO:
+        """
+        以文件对象打开响应体，落盘的响应体直接从磁盘流式读取而不整体读入内存
+        """
+        if self.content is not None:
+            return io.BytesIO(self.content)
+        return open(self.path, "rb")
+
+
+class ValidatorStore:
+    """
+    条件请求校验器存储
+
+    保存带 ETag 或 Last-Modified 的 GET 响应，后续相同请求携带 If-None-Match /
+    If-Modified-Since，服务端返回 304 时直接使用保存的响应体。流式请求（stream=True）
+    不使用校验器，文件下载由 download_to_file 自行保存校验器。超过
+    max_memory_body_bytes 的响应体写入 spill_dir（未设置时不保存），重放时从磁盘
+    流式读取；内存中的响应体总量超过 max_memory_bytes 时按 LRU 淘汰。
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_memory_bytes: int = 64 * 1024 * 1024,
+        max_memory_body_bytes: int = 8 * 1024 * 1024,
+        spill_dir: Optional[str] = None
+    ):
+        """
+        初始化校验器存储
+
+        Args:
+            max_entries: 最大条目数
+            max_memory_bytes: 内存中响应体的总字节数上限
+            max_memory_body_bytes: 单个响应体保存在内存中的最大字节数
+            spill_dir: 大响应体的落盘目录（可选）
+        """
+        self.max_entries = max_entries
+        self.max_memory_bytes = max_memory_bytes
+        self.max_memory_body_bytes = max_memory_body_bytes
+        self.spill_dir = spill_dir
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+        self._entries: "OrderedDict[Hashable, ValidatorEntry]" = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"revalidations": 0, "not_modified": 0, "bytes_saved": 0}
+
+    def get(self, key: Hashable) -> Optional[ValidatorEntry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["revalidations"] += 1
+            return entry
+
+    def record_not_modified(self, entry: ValidatorEntry) -> None:
+        with self._lock:
+            self._stats["not_modified"] += 1
+            self._stats["bytes_saved"] += entry.size
+
+    def put(self, key: Hashable, headers: Dict[str, str], content: bytes) -> None:
+        """
+        保存响应，响应没有 ETag 与 Last-Modified 时忽略
+
+        Args:
+            key: 请求键
+            headers: 响应头
+            content: 响应体
+        """
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if not etag and not last_modified:
+            self.discard(key)
+            return
+
+        kept_headers = {
+            name: value for name, value in headers.items()
+            if name.lower() not in ("content-encoding", "content-length", "transfer-encoding")
+        }
+        entry = ValidatorEntry(etag, last_modified, kept_headers, size=len(content))
+        if len(content) <= self.max_memory_body_bytes:
+            entry.content = content
+        elif self.spill_dir:
+            entry.path = self._spill_path(key)
+            tmp_path = entry.path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(content)
+            os.replace(tmp_path, entry.path)
+        else:
+            self.discard(key)
+            return
+
+        with self._lock:
+            self._remove(key, delete_file=entry.path is None)
+            self._entries[key] = entry
+            if entry.content is not None:
+                self._memory_bytes += entry.size
+            while self._entries and (
+                len(self._entries) > self.max_entries or self._memory_bytes > self.max_memory_bytes
+            ):
+                oldest = next(iter(self._entries))
+                self._remove(oldest, delete_file=True)
+
+    def discard(self, key: Hashable) -> None:
+        with self._lock:
+            self._remove(key, delete_file=True)
+
+    def _remove(self, key: Hashable, delete_file: bool) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        if entry.content is not None:
+            self._memory_bytes -= entry.size
+        if entry.path and delete_file and os.path.exists(entry.path):
+            os.remove(entry.path)
+
+    def _spill_path(self, key: Hashable) -> str:
+        digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()
+        return os.path.join(self.spill_dir, f"{digest}.body")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取条件请求统计
+
+        Returns:
+            包含 revalidations、not_modified、bytes_saved、entries、memory_bytes 的字典
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["memory_bytes"] = self._memory_bytes
+        return stats
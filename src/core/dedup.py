@@ -0,0 +1,332 @@
+import hashlib
+import math
+import sqlite3
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Any, Sequence, Tuple
+
+# 单条 SQL 中 IN 列表的最大长度（SQLite 默认的变量数上限为 999 或 32766）
+_QUERY_BATCH = 500
+
+
+def normalize_text(text: Any) -> str:
+    """
+    规范化文本：NFKC（全角转半角等）、转小写、合并连续空白并去掉首尾空白
+    """
+    if text is None:
+        return ""
+    return " ".join(unicodedata.normalize("NFKC", str(text)).lower().split())
+
+
+def sample_key(project_id: str, task_id: str, sample: Any) -> bytes:
+    """
+    样本的去重键：(project_id, task_id)、规范化后的 input 与 topic_path 的哈希
+
+    Args:
+        project_id: 项目ID
+        task_id: 任务ID
+        sample: 样本字典或 core.models.Sample
+
+    Returns:
+        16 字节的键
+    """
+    topic_path = sample.get("topic_path") or []
+    if isinstance(topic_path, str):
+        topic_path = [topic_path]
+    parts = (project_id, task_id, normalize_text(sample.get("input")), "/".join(normalize_text(t) for t in topic_path))
+    return hashlib.blake2b("\x1e".join(parts).encode("utf-8"), digest_size=16).digest()
+
+
+class BloomFilter:
+    """
+    布隆过滤器：判断键“一定不存在”或“可能存在”，误判率约为 error_rate
+
+    键应当是已经均匀分布的哈希值（如 sample_key 的结果），位置由键的前后 8 字节双重哈希得到。
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.capacity = max(capacity, 1)
+        self.error_rate = error_rate
+        self.num_bits = max(int(-self.capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.num_hashes = max(int(round(self.num_bits / self.capacity * math.log(2))), 1)
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: bytes) -> List[int]:
+        h1 = int.from_bytes(key[:8], "little")
+        h2 = int.from_bytes(key[8:16], "little") | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, key: bytes) -> bool:
+        """
+        加入键，返回是否为新键（至少有一位原来未置位）；只有新键计入 count
+        """
+        bits = self.bits
+        added = False
+        for position in self._positions(key):
+            mask = 1 << (position & 7)
+            if not bits[position >> 3] & mask:
+                bits[position >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+    def __contains__(self, key: bytes) -> bool:
+        bits = self.bits
+        for position in self._positions(key):
+            if not bits[position >> 3] & (1 << (position & 7)):
+                return False
+        return True
+
+
+class SampleDedupIndex:
+    """
+    跨运行持久化的样本去重索引
+
+    按 (project_id, task_id) 记录已保存样本的去重键（规范化后的 input 与
+    topic_path 的哈希），保存在 SQLite 中；内存中的布隆过滤器在查询 SQLite
+    之前排除绝大多数新样本。打开时从 SQLite 重建布隆过滤器，已保存的键数超过
+    容量时自动扩容重建。
+
+    数据客户端以 dedup_index 初始化后，save_sample / save_samples_batch /
+    save_samples_adaptive（以及基于它们的 ingest_file 与生成流水线）在序列化之前
+    用 claim 原子地跳过重复样本并记录新样本，并发的多个批次中同一个样本只会被
+    保存一次；保存失败的样本用 release 撤销记录。
+
+    用法:
+
+        with SampleDedupIndex("samples_dedup.sqlite") as index:
+            client = HetuAIDataGenClient(base_url, dedup_index=index)
+            client.ingest_file(project_id, task_id, "data.jsonl")
+            print(index.get_stats())
+    """
+
+    def __init__(self, path: str, capacity: int = 1000000, error_rate: float = 0.001):
+        """
+        打开（或创建）去重索引
+
+        Args:
+            path: SQLite 数据库文件路径
+            capacity: 布隆过滤器的初始容量（键数）
+            error_rate: 布隆过滤器的误判率
+        """
+        self.path = path
+        self.error_rate = error_rate
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sample_keys ("
+            "key BLOB PRIMARY KEY, project_id TEXT NOT NULL, task_id TEXT NOT NULL) WITHOUT ROWID"
+        )
+        self._conn.commit()
+        self._stats = {"lookups": 0, "duplicates": 0, "bloom_negatives": 0, "false_positives": 0, "added": 0}
+        entries = self._conn.execute("SELECT COUNT(*) FROM sample_keys").fetchone()[0]
+        self._rebuild(max(capacity, entries * 2))
+
+    def _rebuild(self, capacity: int) -> None:
+        bloom = BloomFilter(capacity, self.error_rate)
+        for (key,) in self._conn.execute("SELECT key FROM sample_keys"):
+            bloom.add(key)
+        self._bloom = bloom
+
+    def _existing(self, keys: Sequence[bytes]) -> set:
+        found = set()
+        for start in range(0, len(keys), _QUERY_BATCH):
+            chunk = keys[start:start + _QUERY_BATCH]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self._conn.execute(f"SELECT key FROM sample_keys WHERE key IN ({placeholders})", chunk)
+            found.update(row[0] for row in rows)
+        return found
+
+    def split(self, project_id: str, task_id: str, samples: Iterable[Any]) -> Tuple[List[Any], List[Any]]:
+        """
+        把样本分为新样本和重复样本（同一批内重复出现的样本只保留第一个），不修改索引
+
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            samples: 样本列表
+
+        Returns:
+            (新样本列表, 重复样本列表)
+        """
+        keyed = [(sample_key(project_id, task_id, sample), sample) for sample in samples]
+        with self._lock:
+            candidates = [key for key, _ in keyed if key in self._bloom]
+            existing = self._existing(candidates) if candidates else set()
+            self._stats["lookups"] += len(keyed)
+            self._stats["bloom_negatives"] += len(keyed) - len(candidates)
+            self._stats["false_positives"] += len(candidates) - len(existing)
+
+        new, duplicates = [], []
+        seen = set()
+        for key, sample in keyed:
+            if key in existing or key in seen:
+                duplicates.append(sample)
+            else:
+                seen.add(key)
+                new.append(sample)
+        with self._lock:
+            self._stats["duplicates"] += len(duplicates)
+        return new, duplicates
+
+    def filter_new(self, project_id: str, task_id: str, samples: Iterable[Any]) -> List[Any]:
+        """
+        只返回新样本，参数同 split
+        """
+        return self.split(project_id, task_id, samples)[0]
+
+    def contains(self, project_id: str, task_id: str, sample: Any) -> bool:
+        """
+        样本是否已保存过
+        """
+        return not self.split(project_id, task_id, [sample])[0]
+
+    def claim(self, project_id: str, task_id: str, samples: Iterable[Any]) -> Tuple[List[Any], List[Any]]:
+        """
+        原子地检查并记录样本：新样本的键立即写入索引，并发调用中同一个样本只会被
+        一个调用当作新样本。布隆过滤器判定不存在的键一次批量写入，只有可能存在的键
+        逐行插入确认。保存失败时应当用 release 撤销
+
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            samples: 样本列表
+
+        Returns:
+            (新样本列表, 重复样本列表)
+        """
+        keyed = [(sample_key(project_id, task_id, sample), sample) for sample in samples]
+        is_new = []
+        with self._lock:
+            seen = set()
+            absent, candidates = [], []
+            for key, _ in keyed:
+                if key in seen:
+                    # 同一批内重复出现的样本只保留第一个
+                    is_new.append(False)
+                    continue
+                seen.add(key)
+                # 布隆过滤器判定不存在的键一定是新键，批量写入；可能存在的键逐行插入确认
+                (candidates if key in self._bloom else absent).append(key)
+                is_new.append(True)
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sample_keys (key, project_id, task_id) VALUES (?, ?, ?)",
+                ((key, project_id, task_id) for key in absent)
+            )
+            existing = set()
+            for key in candidates:
+                inserted = self._conn.execute(
+                    "INSERT OR IGNORE INTO sample_keys (key, project_id, task_id) VALUES (?, ?, ?)",
+                    (key, project_id, task_id)
+                ).rowcount
+                if not inserted:
+                    existing.add(key)
+            self._conn.commit()
+            for key in absent:
+                self._bloom.add(key)
+            for key in candidates:
+                if key not in existing:
+                    self._bloom.add(key)
+
+            new, duplicates = [], []
+            for (key, sample), first in zip(keyed, is_new):
+                if first and key not in existing:
+                    new.append(sample)
+                else:
+                    duplicates.append(sample)
+            self._stats["lookups"] += len(keyed)
+            self._stats["bloom_negatives"] += len(absent)
+            self._stats["false_positives"] += len(candidates) - len(existing)
+            self._stats["duplicates"] += len(duplicates)
+            self._stats["added"] += len(new)
+            if self._bloom.count > self._bloom.capacity:
+                self._rebuild(self._bloom.capacity * 2)
+        return new, duplicates
+
+    def release(self, project_id: str, task_id: str, samples: Iterable[Any]) -> None:
+        """
+        撤销 claim 记录的样本（保存失败时调用），之后这些样本会再次被当作新样本
+
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            samples: 样本列表
+        """
+        keys = [(sample_key(project_id, task_id, sample),) for sample in samples]
+        if not keys:
+            return
+        with self._lock:
+            self._conn.executemany("DELETE FROM sample_keys WHERE key = ?", keys)
+            self._conn.commit()
+
+    def add(self, project_id: str, task_id: str, samples: Iterable[Any]) -> None:
+        """
+        记录已保存的样本
+
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            samples: 样本列表
+        """
+        keys = [sample_key(project_id, task_id, sample) for sample in samples]
+        if not keys:
+            return
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO sample_keys (key, project_id, task_id) VALUES (?, ?, ?)",
+                ((key, project_id, task_id) for key in keys)
+            )
+            self._conn.commit()
+            added = self._conn.total_changes - before
+            self._stats["added"] += added
+            for key in keys:
+                self._bloom.add(key)
+            if self._bloom.count > self._bloom.capacity:
+                self._rebuild(self._bloom.capacity * 2)
+
+    def clear(self, project_id: str, task_id: str) -> int:
+        """
+        删除某个任务的所有键（例如任务被删除后），返回删除的键数
+        """
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM sample_keys WHERE project_id = ? AND task_id = ?", (project_id, task_id)
+            ).rowcount
+            self._conn.commit()
+            self._rebuild(self._bloom.capacity)
+            return deleted
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sample_keys").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            包含 lookups（查询的样本数）、duplicates（重复样本数）、hit_rate（重复率）、
+            bloom_negatives（布隆过滤器直接排除的样本数）、false_positives（布隆过滤器误判数）、
+            added（新记录的键数）和 bloom_bits 的字典
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["bloom_bits"] = self._bloom.num_bits
+        stats["hit_rate"] = stats["duplicates"] / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self) -> "SampleDedupIndex":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,324 @@
+import hashlib
+import json
+import os
+from typing import Callable, Dict, Iterable, Iterator, Optional, Any
+
+import requests
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+# 流式读取中断时可以通过 Range 续传的异常
+RESUMABLE_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError
+)
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    把字节块按换行符切分为行（不含换行符），只缓存当前未结束的一行
+
+    Args:
+        chunks: 字节块迭代器
+
+    Returns:
+        行迭代器，空行会被跳过
+    """
+    pending = bytearray()
+    for chunk in chunks:
+        pending += chunk
+        start = 0
+        while True:
+            end = pending.find(b"\n", start)
+            if end == -1:
+                break
+            line = bytes(pending[start:end]).rstrip(b"\r")
+            if line:
+                yield line
+            start = end + 1
+        del pending[:start]
+    if pending.strip():
+        yield bytes(pending).rstrip(b"\r")
+
+
+def _total_size(response: requests.Response, offset: int) -> Optional[int]:
+    content_range = response.headers.get("Content-Range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        if total.isdigit():
+            return int(total)
+    content_length = response.headers.get("Content-Length")
+    if content_length and content_length.isdigit():
+        return offset + int(content_length)
+    return None
+
+
+def _meta_path(path: str) -> str:
+    return path + ".dlmeta"
+
+
+def read_download_meta(path: str) -> Dict[str, Any]:
+    """
+    读取下载到 path 的元数据旁路文件（path + ".dlmeta"），不存在或损坏时返回空字典
+    """
+    try:
+        with open(_meta_path(path), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return meta if isinstance(meta, dict) else {}
+
+
+def _write_meta(path: str, meta: Dict[str, Any]) -> None:
+    meta_path = _meta_path(path)
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _range_validator(response: requests.Response) -> Optional[str]:
+    # If-Range 只能使用强 ETag，弱 ETag 时改用 Last-Modified
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def download_to_file(
+    transport: Any,
+    url: str,
+    path: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    resume: bool = True,
+    max_resumes: int = 5,
+    progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+    error_prefix: str = "下载失败",
+    revalidate: bool = True
+) -> Dict[str, Any]:
+    """
+    以固定内存流式下载到文件，中断后用 HTTP Range 续传，并在下载过程中计算 SHA-256
+
+    数据先写入 path + ".part"，完成后再重命名为 path。第一个响应的 ETag /
+    Last-Modified 保存在旁路文件 path + ".dlmeta" 中，续传（包括续传上次下载遗留的
+    .part 文件）时作为 If-Range 发送，资源已变化时服务端返回完整响应并从头下载，
+    不会拼接两个版本的数据；遗留的 .part 文件没有保存的校验器时丢弃并从头下载。
+    为保证字节偏移准确，续传下载请求原始（未压缩）响应体。
+
+    下载完成后 .dlmeta 保留文件的校验器、大小与 SHA-256。再次下载到同一路径时携带
+    If-None-Match / If-Modified-Since，服务端返回 304 时保留已有文件，不重新传输。
+
+    Args:
+        transport: HetuAITransport 实例
+        url: 请求 URL
+        path: 保存路径
+        headers: 请求头
+        params: 查询参数
+        chunk_size: 每次读取的字节数
+        resume: 是否在中断后续传
+        max_resumes: 最大续传次数
+        progress_callback: 进度回调，参数为已下载字节数和总字节数（未知时为 None）
+        error_prefix: 服务端返回错误时异常信息的前缀
+        revalidate: 目标文件已存在且有保存的校验器时是否发送条件请求
+
+    Returns:
+        包含 path、bytes、sha256、resumes、not_modified 的字典
+    """
+    part_path = path + ".part"
+    digest = hashlib.sha256()
+    offset = 0
+    meta = read_download_meta(path)
+    validator = None
+    if os.path.exists(part_path):
+        validator = meta.get("validator") if resume else None
+        if validator:
+            with open(part_path, "rb") as f:
+                for chunk in iter(lambda: f.read(chunk_size), b""):
+                    digest.update(chunk)
+                    offset += len(chunk)
+        else:
+            # 无法确认遗留数据与服务端当前版本一致
+            _remove(part_path)
+
+    # 只有 .dlmeta 记录的是当前这个完整文件时才能用它做条件请求
+    conditional = {}
+    if (
+        revalidate and not offset and meta.get("sha256")
+        and os.path.exists(path) and os.path.getsize(path) == meta.get("bytes")
+    ):
+        if meta.get("etag"):
+            conditional["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            conditional["If-Modified-Since"] = meta["last_modified"]
+    resumes = 0
+
+    while True:
+        request_headers = dict(headers or {})
+        request_headers["Accept-Encoding"] = "identity"
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+            if validator:
+                request_headers["If-Range"] = validator
+        else:
+            request_headers.update(conditional)
+
+        response = None
+        try:
+            response = transport.get(url, headers=request_headers, params=params, stream=True)
+            if response.status_code == 304 and conditional and not offset:
+                return {
+                    "path": path,
+                    "bytes": meta["bytes"],
+                    "sha256": meta["sha256"],
+                    "resumes": resumes,
+                    "not_modified": True
+                }
+            if response.status_code == 416 and offset:
+                # 已下载完整
+                break
+            if response.status_code not in (200, 206):
+                error_msg = transport.decode(response).get("detail", "Unknown error")
+                raise Exception(f"{error_prefix}: {error_msg}")
+            if response.status_code == 200 and offset:
+                # 服务端不支持 Range 或资源已变化，从头开始
+                offset = 0
+                digest = hashlib.sha256()
+            if response.status_code == 200:
+                validator = _range_validator(response)
+                meta = {
+                    "validator": validator,
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified")
+                }
+                _write_meta(path, meta)
+            else:
+                meta["etag"] = response.headers.get("ETag") or meta.get("etag")
+                meta["last_modified"] = response.headers.get("Last-Modified") or meta.get("last_modified")
+            total = _total_size(response, offset)
+
+            with open(part_path, "ab" if offset else "wb") as f:
+                for chunk in response.iter_content(chunk_size):
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    digest.update(chunk)
+                    offset += len(chunk)
+                    if progress_callback:
+                        progress_callback(offset, total)
+
+            if total is None or offset >= total:
+                break
+            # 连接提前关闭但没有抛出异常
+            if not resume or resumes >= max_resumes:
+                raise Exception(f"{error_prefix}: 响应体不完整（{offset}/{total} 字节）")
+            resumes += 1
+        except RESUMABLE_ERRORS:
+            if not resume or resumes >= max_resumes:
+                raise
+            resumes += 1
+        finally:
+            if response is not None:
+                response.close()
+
+    os.replace(part_path, path)
+    sha256 = digest.hexdigest()
+    if meta.get("etag") or meta.get("last_modified"):
+        _write_meta(path, {
+            "etag": meta.get("etag"),
+            "last_modified": meta.get("last_modified"),
+            "bytes": offset,
+            "sha256": sha256
+        })
+    else:
+        _remove(_meta_path(path))
+    return {"path": path, "bytes": offset, "sha256": sha256, "resumes": resumes, "not_modified": False}
+
+
+def iter_download(
+    transport: Any,
+    url: str,
+    headers: Optional[Dict[str, str]] = None,
+    params: Optional[Dict[str, Any]] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    resume: bool = True,
+    max_resumes: int = 5,
+    progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+    error_prefix: str = "下载失败"
+) -> Iterator[bytes]:
+    """
+    流式产出响应体字节块，中断后从已产出的字节偏移用 HTTP Range 续传
+
+    续传时把第一个响应的 ETag / Last-Modified 作为 If-Range 发送；已产出的数据
+    无法撤回，因此服务端返回完整响应（不支持 Range 或资源已变化）时抛出异常，
+    而不是从头重新产出。需要校验和或跨进程续传时使用 download_to_file。
+
+    Args:
+        transport: HetuAITransport 实例
+        url: 请求 URL
+        headers: 请求头
+        params: 查询参数
+        chunk_size: 每次读取的字节数
+        resume: 是否在中断后续传
+        max_resumes: 最大续传次数
+        progress_callback: 进度回调，参数为已产出字节数和总字节数（未知时为 None）
+        error_prefix: 服务端返回错误时异常信息的前缀
+
+    Returns:
+        字节块迭代器
+    """
+    offset = 0
+    validator = None
+    resumes = 0
+
+    while True:
+        request_headers = dict(headers or {})
+        request_headers["Accept-Encoding"] = "identity"
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+            if validator:
+                request_headers["If-Range"] = validator
+
+        response = None
+        try:
+            response = transport.get(url, headers=request_headers, params=params, stream=True)
+            if response.status_code == 416 and offset:
+                return
+            if response.status_code not in (200, 206):
+                error_msg = transport.decode(response).get("detail", "Unknown error")
+                raise Exception(f"{error_prefix}: {error_msg}")
+            if response.status_code == 200 and offset:
+                raise Exception(f"{error_prefix}: 服务端不支持续传或资源已变化（已读取 {offset} 字节）")
+            if response.status_code == 200:
+                validator = _range_validator(response)
+            total = _total_size(response, offset)
+
+            for chunk in response.iter_content(chunk_size):
+                if not chunk:
+                    continue
+                offset += len(chunk)
+                if progress_callback:
+                    progress_callback(offset, total)
+                yield chunk
+
+            if total is None or offset >= total:
+                return
+            if not resume or resumes >= max_resumes:
+                raise Exception(f"{error_prefix}: 响应体不完整（{offset}/{total} 字节）")
+            resumes += 1
+        except RESUMABLE_ERRORS:
+            if not resume or resumes >= max_resumes:
+                raise
+            resumes += 1
+        finally:
+            if response is not None:
+                response.close()
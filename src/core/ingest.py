@@ -0,0 +1,207 @@
+import csv
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Any, Tuple
+
+from core.jsonl_index import JSONLIndex
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def iter_records(
+    path: str,
+    encoding: str = "utf-8",
+    shard: Optional[Tuple[int, int]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    逐条读取本地数据集文件，不会整体读入内存
+
+    扩展名为 .csv 时按表头解析为字典，其余按 JSONL 解析（跳过空行）。
+
+    Args:
+        path: 文件路径
+        encoding: 文件编码
+        shard: (分片数, 分片序号)（可选，仅 JSONL），通过 JSONLIndex 只读取该分片的记录，
+            多个进程或机器各取一个分片即可分摊导入
+
+    Returns:
+        记录迭代器
+    """
+    if path.lower().endswith(".csv"):
+        if shard is not None:
+            raise ValueError("分片导入只支持 JSONL 文件")
+        with open(path, "r", encoding=encoding, newline="") as f:
+            yield from csv.DictReader(f)
+    elif shard is not None:
+        with JSONLIndex(path) as index:
+            for _, record in index.iter_shard(*shard):
+                yield record
+    else:
+        with open(path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def record_to_sample(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    把数据集记录转换为 save_samples_batch 的样本格式
+
+    OpenAI chat 格式（messages）的记录取 user 消息为 input、assistant 消息为 output；
+    其他记录（例如 input/output 两列的 CSV）原样返回。
+
+    Args:
+        record: 数据集记录
+
+    Returns:
+        样本字典
+    """
+    messages = record.get("messages")
+    if not isinstance(messages, list):
+        return dict(record)
+    sample = {}
+    for role, field in (("user", "input"), ("assistant", "output")):
+        contents = [m.get("content", "") for m in messages if m.get("role") == role]
+        if contents:
+            sample[field] = "\n".join(contents)
+    return sample
+
+
+def iter_batches(records: Iterable[Any], batch_size: int) -> Iterator[Tuple[int, List[Any]]]:
+    """
+    把记录流切分为批次
+
+    Args:
+        records: 记录迭代器
+        batch_size: 每批记录数
+
+    Returns:
+        (批次序号, 记录列表) 迭代器
+    """
+    batch = []
+    index = 0
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield index, batch
+            index += 1
+            batch = []
+    if batch:
+        yield index, batch
+
+
+def file_fingerprint(path: str, *parts: Any) -> str:
+    """
+    根据文件路径、大小、修改时间以及附加参数计算指纹，文件或参数变化后指纹随之变化
+    """
+    stat = os.stat(path)
+    raw = json.dumps([os.path.abspath(path), stat.st_size, stat.st_mtime_ns, *parts], default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class IngestCheckpoint:
+    """
+    批量导入的检查点文件，记录已成功的批次序号
+
+    文件中保存导入任务的指纹，指纹不一致（文件内容、批大小或目标任务变化）时
+    忽略旧记录重新开始。每次更新都先写临时文件再原子替换。
+    """
+
+    def __init__(self, path: str, fingerprint: str):
+        """
+        初始化检查点
+
+        Args:
+            path: 检查点文件路径
+            fingerprint: 导入任务的指纹
+        """
+        self.path = path
+        self.fingerprint = fingerprint
+        self.completed = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("fingerprint") == fingerprint:
+                self.completed = set(state.get("completed", []))
+
+    def is_done(self, index: int) -> bool:
+        return index in self.completed
+
+    def mark_done(self, index: int) -> None:
+        with self._lock:
+            self.completed.add(index)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"fingerprint": self.fingerprint, "completed": sorted(self.completed)}, f)
+            os.replace(tmp_path, self.path)
+
+
+def run_batches(
+    save_fn: Callable[[int, List[Any]], Any],
+    batches: Iterable[Tuple[int, List[Any]]],
+    max_workers: int = 4,
+    checkpoint: Optional[IngestCheckpoint] = None
+) -> Iterator[Tuple[int, Any]]:
+    """
+    以有限并发执行批次，按批次序号顺序返回结果
+
+    在途与等待按序返回的批次合计最多 2 * max_workers 个，即使前面的批次卡住，
+    文件再大内存占用也是有界的。检查点中
+    已完成的批次直接跳过（不返回）。某个批次失败后不再提交新批次，等待已提交的
+    批次结束后抛出异常；成功的批次已写入检查点，重新运行时只会补传剩余批次。
+
+    Args:
+        save_fn: 上传一个批次的函数，参数为批次序号和记录列表
+        batches: (批次序号, 记录列表) 迭代器
+        max_workers: 最大并发数
+        checkpoint: 检查点（可选）
+
+    Returns:
+        (批次序号, save_fn 返回值) 迭代器
+    """
+    pending = iter(batches)
+    window = max_workers * 2
+    futures = {}
+    results = {}
+    order = []
+    error = None
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            # 已完成但排在前面的批次未结束的结果暂存在 results 中，也计入窗口
+            while error is None and len(futures) + len(results) < window:
+                item = next(pending, None)
+                if item is None:
+                    break
+                index, batch = item
+                if checkpoint is not None and checkpoint.is_done(index):
+                    continue
+                futures[executor.submit(save_fn, index, batch)] = index
+                order.append(index)
+
+            if not futures:
+                break
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = futures.pop(future)
+                try:
+                    results[index] = future.result()
+                except Exception as e:
+                    if error is None:
+                        error = (index, e)
+                    order.remove(index)
+                    continue
+                if checkpoint is not None:
+                    checkpoint.mark_done(index)
+
+            while order and order[0] in results:
+                index = order.pop(0)
+                yield index, results.pop(index)
+
+    if error is not None:
+        index, e = error
+        raise Exception(f"第 {index} 批导入失败: {str(e)}") from e
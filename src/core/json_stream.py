@@ -0,0 +1,156 @@
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Optional
+
+from core.codec import decode_response_body
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\r\n"
+
+
+class _TextReader:
+    """
+    在字节块迭代器上按需解码文本；已解析的部分及时丢弃，内存中只保留当前值
+    """
+
+    def __init__(self, chunks: Iterable[bytes], encoding: str = "utf-8"):
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder(encoding)()
+        self._json = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            text = self._decoder.decode(b"", final=True)
+            self.eof = True
+        else:
+            text = self._decoder.decode(chunk)
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return True
+
+    def peek(self) -> Optional[str]:
+        """
+        跳过空白，返回下一个字符但不消费；已到末尾时返回 None
+        """
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return None
+
+    def take(self, expected: str) -> str:
+        char = self.peek()
+        if char is None or char not in expected:
+            raise ValueError(f"JSON 格式错误: 位置 {self.pos} 处期望 {expected!r}，实际为 {char!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        """
+        解析下一个完整的 JSON 值
+        """
+        if self.peek() is None:
+            raise ValueError("JSON 格式错误: 响应体意外结束")
+        want = 0
+        while True:
+            # 值后面至少还有一个字符（或已到末尾）时才认为解析完整，避免把被截断的数字当作完整值
+            if len(self.buf) - self.pos > want or self.eof:
+                try:
+                    value, end = self._json.raw_decode(self.buf, self.pos)
+                    if end < len(self.buf) or self.eof:
+                        self.pos = end
+                        return value
+                except json.JSONDecodeError:
+                    if self.eof:
+                        raise
+                # 每次重试前至少读入一倍的数据，大值的解析总成本保持线性
+                want = 2 * (len(self.buf) - self.pos)
+            if not self._fill():
+                raise ValueError("JSON 格式错误: 响应体意外结束")
+
+
+def _iter_array(reader: _TextReader) -> Iterator[Any]:
+    reader.take("[")
+    if reader.peek() == "]":
+        reader.pos += 1
+        return
+    while True:
+        yield reader.value()
+        if reader.take(",]") == "]":
+            return
+
+
+def iter_json_array(chunks: Iterable[bytes], key: Optional[str] = None, encoding: str = "utf-8") -> Iterator[Any]:
+    """
+    增量解析 JSON 数组，边读取边逐个返回元素
+
+    支持顶层数组，以及 {"projects": [...]} 形式的对象包装：key 指定数组所在的
+    字段，不传时使用第一个值为数组的字段。找到数组之前的其他字段会被解析并丢弃，
+    数组之后的内容不再读取。
+
+    Args:
+        chunks: 响应体字节块迭代器
+        key: 对象包装中数组的字段名（可选）
+        encoding: 文本编码
+
+    Returns:
+        数组元素迭代器
+    """
+    reader = _TextReader(chunks, encoding)
+    first = reader.peek()
+    if first == "[":
+        yield from _iter_array(reader)
+        return
+    reader.take("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        name = reader.value()
+        reader.take(":")
+        if reader.peek() == "[" and (key is None or name == key):
+            yield from _iter_array(reader)
+            return
+        reader.value()
+        if reader.take(",}") == "}":
+            return
+
+
+def iter_response_items(
+    transport: Any,
+    response: Any,
+    key: Optional[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Iterator[Any]:
+    """
+    逐个返回流式响应（stream=True）中列表的元素，结束或中途退出时关闭响应
+
+    JSON 响应边接收边解析；服务端返回 msgpack 时无法增量解析，读取完整响应体后再逐个返回。
+
+    Args:
+        transport: 传输层
+        response: 以 stream=True 发送得到的响应
+        key: 对象包装中数组的字段名（可选），见 iter_json_array
+        chunk_size: 每次读取的字节数
+
+    Returns:
+        列表元素迭代器
+    """
+    try:
+        if "msgpack" in response.headers.get("Content-Type", ""):
+            data = decode_response_body(response.content, response.headers["Content-Type"], transport.codec)
+            if isinstance(data, dict):
+                data = data.get(key) if key else next((v for v in data.values() if isinstance(v, list)), [])
+            yield from data or []
+            return
+        yield from iter_json_array(response.iter_content(chunk_size), key=key, encoding=response.encoding or "utf-8")
+    finally:
+        response.close()
@@ -0,0 +1,238 @@
+import json
+import mmap
+import os
+import random
+import struct
+import zlib
+from array import array
+from typing import Iterator, List, Optional, Any, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+_MAGIC = b"HJLIDX01"
+_HEADER = struct.Struct("<QqQ")  # 源文件大小、修改时间（纳秒）、行数
+
+
+class JSONLIndex:
+    """
+    JSONL 文件的行偏移索引
+
+    以 mmap 打开 JSONL 文件，扫描一次得到每行的起始偏移（array('Q')，每行 8 字节），
+    之后按行号 O(1) 定位，只解析访问到的记录。默认只在内存中保存索引；传入
+    index_path 时保存为旁路文件，再次打开时直接加载，源文件的大小或修改时间变化后
+    自动重建索引。
+
+    索引覆盖文件的每一行，第 i 条（从 0 开始）即文件第 i + 1 行；空行解析为 None，
+    迭代、分片与抽样时会跳过空行。
+
+    用法:
+
+        with JSONLIndex("test_dataset.jsonl") as index:
+            record = index[1000]
+            for i, record in index.iter_shard(4, 0):
+                ...
+    """
+
+    def __init__(self, path: str, index_path: Optional[str] = None, rebuild: bool = False):
+        """
+        打开或建立索引
+
+        Args:
+            path: JSONL 文件路径
+            index_path: 旁路索引文件路径（可选，例如 path + ".idx"），不传时不读写旁路文件，
+                不会在数据文件旁生成任何文件
+            rebuild: 是否忽略已有的旁路文件强制重建
+        """
+        self.path = path
+        self.index_path = index_path
+        self._file = open(path, "rb")
+        stat = os.fstat(self._file.fileno())
+        self._size = stat.st_size
+        self._mtime_ns = stat.st_mtime_ns
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else b""
+
+        offsets = None if rebuild else self._load()
+        if offsets is None:
+            offsets = self._build()
+            if self.index_path:
+                self._save(offsets)
+        # offsets[i] 为第 i 行的起始偏移，末尾哨兵为“最后一行结束位置 + 1”
+        self._offsets = offsets
+
+    def _build(self) -> array:
+        mm = self._mm
+        offsets = array("Q", [0])
+        find = mm.find
+        pos = find(b"\n")
+        while pos != -1:
+            offsets.append(pos + 1)
+            pos = find(b"\n", pos + 1)
+        if offsets[-1] < self._size:
+            # 最后一行没有换行符
+            offsets.append(self._size + 1)
+        elif len(offsets) == 1:
+            offsets = array("Q")
+        return offsets
+
+    def _load(self) -> Optional[array]:
+        if not self.index_path or not os.path.exists(self.index_path):
+            return None
+        with open(self.index_path, "rb") as f:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                return None
+            header = f.read(_HEADER.size)
+            if len(header) != _HEADER.size:
+                return None
+            size, mtime_ns, count = _HEADER.unpack(header)
+            if size != self._size or mtime_ns != self._mtime_ns:
+                return None
+            offsets = array("Q")
+            data = f.read()
+            if len(data) != count * offsets.itemsize:
+                return None
+            offsets.frombytes(data)
+        return offsets
+
+    def _save(self, offsets: array) -> None:
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(_HEADER.pack(self._size, self._mtime_ns, len(offsets)))
+            offsets.tofile(f)
+        os.replace(tmp_path, self.index_path)
+
+    def __len__(self) -> int:
+        return max(len(self._offsets) - 1, 0)
+
+    def raw(self, i: int) -> bytes:
+        """
+        读取第 i 行的原始字节（不含换行符）
+
+        Args:
+            i: 行序号（从 0 开始，支持负数）
+
+        Returns:
+            行内容
+        """
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("行序号超出范围")
+        return self._mm[self._offsets[i]:self._offsets[i + 1] - 1].rstrip(b"\r")
+
+    def record(self, i: int) -> Optional[Any]:
+        """
+        解析第 i 行，空行返回 None
+        """
+        line = self.raw(i)
+        return _loads(line) if line.strip() else None
+
+    def __getitem__(self, key: Union[int, slice]) -> Union[Optional[Any], List[Optional[Any]]]:
+        if isinstance(key, slice):
+            return [self.record(i) for i in range(*key.indices(len(self)))]
+        return self.record(key)
+
+    def __iter__(self) -> Iterator[Any]:
+        for _, record in self.iter_records():
+            yield record
+
+    def iter_raw(self, indices: Optional[Any] = None) -> Iterator[Tuple[int, bytes]]:
+        """
+        按序号迭代非空行的原始字节
+
+        Args:
+            indices: 行序号序列（可选），默认全部行
+
+        Returns:
+            (行序号, 行内容) 迭代器
+        """
+        if indices is not None:
+            for i in indices:
+                line = self.raw(i)
+                if line.strip():
+                    yield i, line
+            return
+        mm = self._mm
+        offsets = self._offsets
+        for i in range(len(self)):
+            line = mm[offsets[i]:offsets[i + 1] - 1]
+            if line.strip():
+                yield i, line.rstrip(b"\r")
+
+    def iter_records(self, indices: Optional[Any] = None) -> Iterator[Tuple[int, Any]]:
+        """
+        按序号迭代非空行并解析
+
+        Args:
+            indices: 行序号序列（可选），默认全部行
+
+        Returns:
+            (行序号, 记录) 迭代器
+        """
+        for i, line in self.iter_raw(indices):
+            yield i, _loads(line)
+
+    def shard_indices(self, num_shards: int, shard: int) -> array:
+        """
+        按行内容的 CRC32 把非空行分配到 num_shards 个分片，返回第 shard 个分片的行序号
+
+        分配只取决于行内容，文件追加记录或重排后已有记录仍落在原分片。
+
+        Args:
+            num_shards: 分片数
+            shard: 分片序号（0 到 num_shards - 1）
+
+        Returns:
+            行序号数组
+        """
+        if not 0 <= shard < num_shards:
+            raise ValueError("分片序号超出范围")
+        indices = array("Q")
+        for i, line in self.iter_raw():
+            if zlib.crc32(line) % num_shards == shard:
+                indices.append(i)
+        return indices
+
+    def iter_shard(self, num_shards: int, shard: int) -> Iterator[Tuple[int, Any]]:
+        """
+        迭代第 shard 个分片的记录，参数同 shard_indices
+
+        Returns:
+            (行序号, 记录) 迭代器
+        """
+        if not 0 <= shard < num_shards:
+            raise ValueError("分片序号超出范围")
+        for i, line in self.iter_raw():
+            if zlib.crc32(line) % num_shards == shard:
+                yield i, _loads(line)
+
+    def sample(self, k: int, seed: Optional[int] = None) -> List[int]:
+        """
+        随机抽取 k 个行序号（不重复，按升序返回），用于抽查
+
+        Args:
+            k: 抽样数量，超过行数时返回全部行
+            seed: 随机种子（可选）
+
+        Returns:
+            行序号列表
+        """
+        n = len(self)
+        return sorted(random.Random(seed).sample(range(n), min(k, n)))
+
+    def close(self) -> None:
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,265 @@
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import Dict, Hashable, Optional, Any, Tuple
+
+# 视为上游限流的状态码
+THROTTLE_STATUSES = (429, 503)
+
+
+class AIMDController:
+    """
+    AIMD（加性增、乘性减）并发上限计算，不负责同步
+
+    延迟稳定时每完成 limit 个请求上限加 increase；遇到限流或延迟超过基线的
+    latency_tolerance 倍时上限乘以 decrease_factor。两次下调之间至少间隔一个
+    平均延迟，避免同一批在途请求重复触发下调。
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        decrease_factor: float = 0.5,
+        latency_tolerance: float = 2.0,
+        smoothing: float = 0.2
+    ):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self.smoothing = smoothing
+        self.latency_ewma: Optional[float] = None
+        self.baseline: Optional[float] = None
+        self._last_decrease = 0.0
+
+    @property
+    def current_limit(self) -> int:
+        return max(int(self.limit), self.min_limit)
+
+    def on_sample(self, latency: float, throttled: bool) -> None:
+        """
+        记录一次请求结果并调整上限
+
+        Args:
+            latency: 请求耗时（秒）
+            throttled: 是否被上游限流
+        """
+        if self.latency_ewma is None:
+            self.latency_ewma = latency
+        else:
+            self.latency_ewma += self.smoothing * (latency - self.latency_ewma)
+        if self.baseline is None or self.latency_ewma < self.baseline:
+            self.baseline = self.latency_ewma
+        else:
+            # 基线缓慢上移，适应上游整体变慢
+            self.baseline += 0.01 * (self.latency_ewma - self.baseline)
+
+        congested = throttled or self.latency_ewma > self.baseline * self.latency_tolerance
+        if congested:
+            now = time.monotonic()
+            if now - self._last_decrease >= self.latency_ewma:
+                self.limit = max(self.limit * self.decrease_factor, float(self.min_limit))
+                self._last_decrease = now
+        else:
+            self.limit = min(self.limit + self.increase / self.limit, float(self.max_limit))
+
+
+class LimiterSlot:
+    """
+    并发名额，调用方通过 observe 上报响应状态码
+
+    传输层会自动重试 429/503，observe 应当接收每一次尝试的状态码（作为传输层的
+    on_attempt 回调），任一次被限流即视为限流，即使重试最终成功。
+    """
+
+    def __init__(self):
+        self.status_code: Optional[int] = None
+        self.throttled_attempts = 0
+
+    def observe(self, status_code: int) -> None:
+        self.status_code = status_code
+        if status_code in THROTTLE_STATUSES:
+            self.throttled_attempts += 1
+
+    @property
+    def throttled(self) -> bool:
+        return self.throttled_attempts > 0
+
+
+class _KeyState:
+    def __init__(self, controller: AIMDController):
+        self.controller = controller
+        self.in_flight = 0
+        self.waiting = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "limit": self.controller.current_limit,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "latency_ewma": self.controller.latency_ewma,
+            "baseline_latency": self.controller.baseline
+        }
+
+
+def generation_key(input_data: Dict[str, Any]) -> Tuple[Any, Any]:
+    """
+    生成类接口的限流键：(provider, model_name)
+    """
+    return (input_data.get("provider"), input_data.get("model_name"))
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    按键（如 (provider, model_name)）独立调整并发上限的自适应限流器（线程版）
+
+    用法:
+
+        with limiter.slot(("together_ai", "Qwen/Qwen2.5-72B-Instruct-Turbo")) as slot:
+            response = transport.post(..., on_attempt=slot.observe)
+    """
+
+    def __init__(self, **controller_kwargs):
+        """
+        初始化限流器
+
+        Args:
+            **controller_kwargs: 传给 AIMDController 的参数，如 initial_limit、max_limit
+        """
+        self._controller_kwargs = controller_kwargs
+        self._states: Dict[Hashable, _KeyState] = {}
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+
+    def _state(self, key: Hashable) -> _KeyState:
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _KeyState(AIMDController(**self._controller_kwargs))
+        return state
+
+    def acquire(self, key: Hashable, timeout: Optional[float] = None) -> bool:
+        with self._condition:
+            state = self._state(key)
+            state.waiting += 1
+            try:
+                acquired = self._condition.wait_for(
+                    lambda: state.in_flight < state.controller.current_limit, timeout
+                )
+            finally:
+                state.waiting -= 1
+            if acquired:
+                state.in_flight += 1
+            return acquired
+
+    def release(self, key: Hashable, latency: float, throttled: bool = False) -> None:
+        with self._condition:
+            state = self._state(key)
+            state.in_flight -= 1
+            state.controller.on_sample(latency, throttled)
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, key: Hashable):
+        """
+        获取一个并发名额，退出时根据耗时和上报的状态码调整上限；
+        抛出异常时按限流处理
+        """
+        self.acquire(key)
+        slot = LimiterSlot()
+        start = time.monotonic()
+        throttled = True
+        try:
+            yield slot
+            throttled = slot.throttled
+        finally:
+            self.release(key, time.monotonic() - start, throttled)
+
+    def get_stats(self) -> Dict[Hashable, Dict[str, Any]]:
+        """
+        获取各键的当前上限、在途请求数和排队深度
+
+        Returns:
+            以键为索引的统计字典
+        """
+        with self._lock:
+            return {key: state.stats() for key, state in self._states.items()}
+
+
+class AsyncAdaptiveConcurrencyLimiter:
+    """
+    AdaptiveConcurrencyLimiter 的 asyncio 版本
+
+    用法:
+
+        async with limiter.slot(key) as slot:
+            response = await transport.post(..., on_attempt=slot.observe)
+    """
+
+    def __init__(self, **controller_kwargs):
+        self._controller_kwargs = controller_kwargs
+        self._states: Dict[Hashable, _KeyState] = {}
+        self._condition: Optional[asyncio.Condition] = None
+
+    def _get_condition(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _state(self, key: Hashable) -> _KeyState:
+        state = self._states.get(key)
+        if state is None:
+            state = self._states[key] = _KeyState(AIMDController(**self._controller_kwargs))
+        return state
+
+    async def acquire(self, key: Hashable) -> None:
+        condition = self._get_condition()
+        async with condition:
+            state = self._state(key)
+            state.waiting += 1
+            try:
+                await condition.wait_for(lambda: state.in_flight < state.controller.current_limit)
+            finally:
+                state.waiting -= 1
+            state.in_flight += 1
+
+    async def release(self, key: Hashable, latency: float, throttled: bool = False) -> None:
+        condition = self._get_condition()
+        async with condition:
+            state = self._state(key)
+            state.in_flight -= 1
+            state.controller.on_sample(latency, throttled)
+            condition.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, key: Hashable):
+        """
+        获取一个并发名额，退出时根据耗时和上报的状态码调整上限；
+        抛出异常时按限流处理（取消除外）
+        """
+        await self.acquire(key)
+        slot = LimiterSlot()
+        start = time.monotonic()
+        throttled = True
+        try:
+            yield slot
+            throttled = slot.throttled
+        except asyncio.CancelledError:
+            throttled = False
+            raise
+        finally:
+            await asyncio.shield(self.release(key, time.monotonic() - start, throttled))
+
+    def get_stats(self) -> Dict[Hashable, Dict[str, Any]]:
+        """
+        获取各键的当前上限、在途请求数和排队深度
+
+        Returns:
+            以键为索引的统计字典
+        """
+        return {key: state.stats() for key, state in self._states.items()}
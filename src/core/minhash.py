@@ -0,0 +1,375 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Any, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 可选依赖
+    np = None
+
+from core.dedup import normalize_text
+
+_EMPTY = 0xFFFFFFFF
+# 每个分块最多包含的字符数，控制中间数组的大小
+_CHUNK_CHARS = 1 << 20
+
+
+def sample_text(sample: Any) -> str:
+    """
+    默认用于近似去重的文本：样本的 input
+    """
+    return sample.get("input") or ""
+
+
+def choose_bands(threshold: float, num_perm: int) -> Tuple[int, int]:
+    """
+    选择 LSH 的分段数与每段行数，使 S 曲线的拐点 (1/bands)^(1/rows) 最接近 threshold
+
+    Returns:
+        (bands, rows)
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHashLSH:
+    """
+    基于 MinHash 签名与 LSH 分段的近似重复检测，全部计算用 NumPy 向量化完成
+
+    文本先规范化（NFKC、小写、合并空白），再切分为字符 n-gram（默认 3，对中文和
+    英文都适用，不需要分词）。每个 n-gram 的哈希经 num_perm 个乘移位哈希函数取
+    最小值得到签名；签名分为 bands 段，任一段完全相同的文本成为候选对，再用签名
+    估计的 Jaccard 相似度（相同位置的比例）确认，达到 threshold 的文本归为一簇。
+    每簇的代表为其中序号最小的文本。
+
+    用法:
+
+        lsh = MinHashLSH(threshold=0.8)
+        kept, duplicates = lsh.deduplicate(samples)
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, ngram: int = 3, seed: int = 1):
+        """
+        初始化
+
+        Args:
+            threshold: 判为近似重复的 Jaccard 相似度阈值
+            num_perm: 签名长度（哈希函数个数），越大估计越准、计算越慢
+            ngram: 字符 n-gram 的长度
+            seed: 哈希函数的随机种子，签名需要相互比较时必须相同
+        """
+        if np is None:
+            raise ImportError("近似去重需要安装 numpy: pip install numpy")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.ngram = ngram
+        self.bands, self.rows = choose_bands(threshold, num_perm)
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+        self._band_mix = rng.integers(1, 1 << 63, size=self.bands, dtype=np.uint64)
+
+    def _shingles(self, texts: Sequence[str]) -> Tuple[Any, Any]:
+        """
+        计算一批文本的 n-gram 哈希
+
+        Returns:
+            (所有 n-gram 哈希, 每个文本的 n-gram 数)
+        """
+        n = self.ngram
+        pad = "\0" * (n - 1)
+        lengths = np.fromiter((len(text) for text in texts), dtype=np.int64, count=len(texts))
+        codes = np.frombuffer("".join(text + pad for text in texts).encode("utf-32-le"), dtype=np.uint32)
+        codes = codes.astype(np.uint64)
+
+        # 多项式滚动哈希（uint64 自然溢出），每个位置对应以该字符开头的 n-gram
+        windows = len(codes) - n + 1
+        hashes = codes[:windows].copy()
+        for j in range(1, n):
+            hashes *= np.uint64(0x100000001B3)
+            hashes ^= codes[j:j + windows]
+
+        # 每个文本取 max(长度 - n + 1, 1) 个 n-gram（短文本整体作为一个 n-gram），空文本没有 n-gram
+        counts = np.where(lengths > 0, np.maximum(lengths - n + 1, 1), 0)
+        starts = np.concatenate(([0], np.cumsum(lengths + n - 1)[:-1]))
+        offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+        index = np.arange(counts.sum(), dtype=np.int64) + np.repeat(starts - offsets, counts)
+        shingles = hashes[index]
+
+        # splitmix64 终结函数，使哈希值分布均匀
+        shingles ^= shingles >> np.uint64(30)
+        shingles *= np.uint64(0xBF58476D1CE4E5B9)
+        shingles ^= shingles >> np.uint64(27)
+        shingles *= np.uint64(0x94D049BB133111EB)
+        shingles ^= shingles >> np.uint64(31)
+        return shingles, counts
+
+    def _signatures_chunk(self, texts: Sequence[str]) -> Any:
+        shingles, counts = self._shingles(texts)
+        signatures = np.full((len(texts), self.num_perm), _EMPTY, dtype=np.uint32)
+        present = counts > 0
+        if not present.any():
+            return signatures
+        segment_starts = np.concatenate(([0], np.cumsum(counts[present])[:-1]))
+        # 逐个哈希函数在一维数组上计算并按文本分段取最小值，比二维矩阵按行分段快一个数量级
+        hashed = np.empty_like(shingles)
+        minimums = np.empty((self.num_perm, len(segment_starts)), dtype=np.uint64)
+        for i in range(self.num_perm):
+            np.multiply(shingles, self._a[i], out=hashed)
+            hashed += self._b[i]
+            hashed >>= np.uint64(32)
+            np.minimum.reduceat(hashed, segment_starts, out=minimums[i])
+        signatures[present] = minimums.T
+        return signatures
+
+    def signatures(self, texts: Iterable[str]) -> Any:
+        """
+        计算 MinHash 签名
+
+        Args:
+            texts: 文本列表
+
+        Returns:
+            形状为 (文本数, num_perm) 的 uint32 数组；空文本的签名全为 0xFFFFFFFF
+        """
+        texts = [normalize_text(text) for text in texts]
+        if not texts:
+            return np.zeros((0, self.num_perm), dtype=np.uint32)
+        chunks = []
+        begin = 0
+        total = 0
+        for i, text in enumerate(texts):
+            total += len(text) + 1
+            if total >= _CHUNK_CHARS:
+                chunks.append(self._signatures_chunk(texts[begin:i + 1]))
+                begin, total = i + 1, 0
+        if begin < len(texts):
+            chunks.append(self._signatures_chunk(texts[begin:]))
+        return np.concatenate(chunks) if len(chunks) > 1 else chunks[0]
+
+    def band_keys(self, signatures: Any) -> Any:
+        """
+        每个签名在各段上的桶键
+
+        Returns:
+            形状为 (文本数, bands) 的 uint64 数组，不同段的键互不相同
+        """
+        keys = np.zeros((len(signatures), self.bands), dtype=np.uint64)
+        for band in range(self.bands):
+            key = np.full(len(signatures), self._band_mix[band], dtype=np.uint64)
+            for column in range(band * self.rows, (band + 1) * self.rows):
+                key ^= signatures[:, column].astype(np.uint64)
+                key *= np.uint64(0x9E3779B97F4A7C15)
+            keys[:, band] = key
+        return keys
+
+    def similarity(self, left: Any, right: Any) -> Any:
+        """
+        用签名估计 Jaccard 相似度（相同位置的比例），left 与 right 逐行比较
+        """
+        return (left == right).mean(axis=1)
+
+    def cluster_labels(self, texts: Iterable[str] = None, signatures: Any = None) -> Any:
+        """
+        近似重复聚类
+
+        Args:
+            texts: 文本列表
+            signatures: 已计算的签名（可选），传入时忽略 texts
+
+        Returns:
+            每个文本所在簇的标签（簇中最小的序号），不与其他文本重复的文本标签为自身序号
+        """
+        if signatures is None:
+            signatures = self.signatures(texts)
+        count = len(signatures)
+        labels = np.arange(count, dtype=np.int64)
+        valid = np.flatnonzero(signatures[:, 0] != _EMPTY) if count else labels
+        if len(valid) < 2:
+            return labels
+
+        keys = self.band_keys(signatures[valid])
+        sources, targets = [], []
+        for band in range(self.bands):
+            order = np.argsort(keys[:, band], kind="stable")
+            sorted_keys = keys[order, band]
+            run_start = np.concatenate(([True], sorted_keys[1:] != sorted_keys[:-1]))
+            first = np.maximum.accumulate(np.where(run_start, np.arange(len(order)), 0))
+            pairs = ~run_start
+            if pairs.any():
+                # 每个桶中的文本与桶内第一个文本组成候选对
+                sources.append(valid[order[first[pairs]]])
+                targets.append(valid[order[pairs]])
+        if not sources:
+            return labels
+
+        sources = np.concatenate(sources)
+        targets = np.concatenate(targets)
+        keep = np.zeros(len(sources), dtype=bool)
+        step = max((1 << 24) // self.num_perm, 1)
+        for start in range(0, len(sources), step):
+            stop = start + step
+            similarity = self.similarity(signatures[sources[start:stop]], signatures[targets[start:stop]])
+            keep[start:stop] = similarity >= self.threshold
+        sources, targets = sources[keep], targets[keep]
+
+        # 沿确认的边传播最小标签，直到连通分量稳定
+        while len(sources):
+            before = labels.copy()
+            np.minimum.at(labels, sources, labels[targets])
+            np.minimum.at(labels, targets, labels[sources])
+            labels = labels[labels]
+            if np.array_equal(labels, before):
+                break
+        return labels
+
+    def clusters(self, texts: Iterable[str]) -> List[List[int]]:
+        """
+        返回包含两个及以上文本的簇（文本序号列表，按序号排序）
+        """
+        labels = self.cluster_labels(texts)
+        groups: Dict[int, List[int]] = {}
+        for index in np.flatnonzero(labels != np.arange(len(labels))):
+            groups.setdefault(int(labels[index]), [int(labels[index])]).append(int(index))
+        return list(groups.values())
+
+    def deduplicate(
+        self,
+        samples: Sequence[Any],
+        text_fn: Callable[[Any], str] = sample_text
+    ) -> Tuple[List[Any], List[Any]]:
+        """
+        每簇只保留第一个样本
+
+        Args:
+            samples: 样本列表
+            text_fn: 取出用于比较的文本的函数，默认为 input
+
+        Returns:
+            (保留的样本, 近似重复的样本)
+        """
+        labels = self.cluster_labels([text_fn(sample) for sample in samples])
+        kept, duplicates = [], []
+        for index, sample in enumerate(samples):
+            (kept if labels[index] == index else duplicates).append(sample)
+        return kept, duplicates
+
+
+class NearDuplicateFilter:
+    """
+    增量的近似重复过滤：每批样本先在批内聚类，再与之前保留的所有样本比较
+
+    之前保留样本的签名与桶索引常驻内存（num_perm=128 时每个样本约 2KB），适合
+    在生成流水线中过滤几十万量级的样本；一次性处理更大的数据集时直接使用
+    MinHashLSH.deduplicate。线程安全。
+
+    用法:
+
+        near_filter = NearDuplicateFilter(threshold=0.8)
+        pipeline = GenerateSavePipeline(client, project_id, task_id, near_duplicate_filter=near_filter)
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        num_perm: int = 128,
+        ngram: int = 3,
+        seed: int = 1,
+        text_fn: Callable[[Any], str] = sample_text,
+        lsh: Optional[MinHashLSH] = None
+    ):
+        """
+        初始化
+
+        Args:
+            threshold: 判为近似重复的 Jaccard 相似度阈值
+            num_perm: 签名长度
+            ngram: 字符 n-gram 的长度
+            seed: 哈希函数的随机种子
+            text_fn: 取出用于比较的文本的函数，默认为 input
+            lsh: 已创建的 MinHashLSH（可选），传入时忽略前四个参数
+        """
+        self.lsh = lsh or MinHashLSH(threshold, num_perm, ngram, seed)
+        self.text_fn = text_fn
+        self._buckets: Dict[int, List[int]] = {}
+        self._signatures = np.zeros((0, self.lsh.num_perm), dtype=np.uint32)
+        self._size = 0
+        self._stats = {"checked": 0, "duplicates": 0}
+        self._lock = threading.Lock()
+
+    def _append(self, signature: Any) -> int:
+        if self._size == len(self._signatures):
+            grown = np.zeros((max(1024, 2 * self._size), self.lsh.num_perm), dtype=np.uint32)
+            grown[:self._size] = self._signatures[:self._size]
+            self._signatures = grown
+        self._signatures[self._size] = signature
+        self._size += 1
+        return self._size - 1
+
+    def split(self, samples: Sequence[Any]) -> Tuple[List[Any], List[Any]]:
+        """
+        把样本分为保留的样本与近似重复的样本，保留的样本记入历史
+
+        Args:
+            samples: 样本列表
+
+        Returns:
+            (保留的样本, 近似重复的样本)
+        """
+        samples = list(samples)
+        if not samples:
+            return [], []
+        signatures = self.lsh.signatures([self.text_fn(sample) for sample in samples])
+        labels = self.lsh.cluster_labels(signatures=signatures)
+        keys = self.lsh.band_keys(signatures)
+        kept, duplicates = [], []
+        with self._lock:
+            for index, sample in enumerate(samples):
+                signature = signatures[index]
+                if labels[index] != index:
+                    duplicates.append(sample)
+                    continue
+                if signature[0] == _EMPTY:
+                    kept.append(sample)
+                    continue
+                row_keys = keys[index].tolist()
+                candidates = {c for key in row_keys for c in self._buckets.get(key, ())}
+                if candidates:
+                    ids = np.fromiter(candidates, dtype=np.int64, count=len(candidates))
+                    similarity = self.lsh.similarity(self._signatures[ids], signature[None, :])
+                    if (similarity >= self.lsh.threshold).any():
+                        duplicates.append(sample)
+                        continue
+                sample_id = self._append(signature)
+                for key in row_keys:
+                    self._buckets.setdefault(key, []).append(sample_id)
+                kept.append(sample)
+            self._stats["checked"] += len(samples)
+            self._stats["duplicates"] += len(duplicates)
+        return kept, duplicates
+
+    def filter_new(self, samples: Sequence[Any]) -> List[Any]:
+        """
+        只返回保留的样本，参数同 split
+        """
+        return self.split(samples)[0]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            包含 checked、duplicates、duplicate_rate 和 kept（历史中保留的样本数）的字典
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["kept"] = self._size
+        stats["duplicate_rate"] = stats["duplicates"] / stats["checked"] if stats["checked"] else 0.0
+        return stats
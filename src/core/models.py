@@ -0,0 +1,153 @@
+import sys
+from typing import Dict, List, Any, Tuple
+
+
+class Model:
+    """
+    类型化结果对象的基类
+
+    子类用 __slots__ 声明已知字段，实例不带 __dict__，大量对象常驻内存时比字典
+    省得多。响应中未声明的字段保存在 extra 中（没有时为 None），编码回请求体时
+    原样带上，保证往返不丢字段。INTERN 中列出的字段（模型名、提供商等高度重复的
+    短字符串）解码时驻留，相同的值只保存一份。
+
+    客户端以 typed=True 初始化时返回这些对象；请求编解码器可以直接序列化它们，
+    写接口可以直接传入对象作为请求体。
+    """
+
+    __slots__ = ("extra",)
+    INTERN: Tuple[str, ...] = ()
+
+    def __init__(self, **fields: Any):
+        for name in self.__slots__:
+            setattr(self, name, fields.pop(name, None))
+        self.extra = fields or None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """
+        从响应字典解码
+
+        Args:
+            data: 响应中的一条记录
+
+        Returns:
+            模型对象
+        """
+        obj = cls.__new__(cls)
+        extra = dict(data)
+        for name in cls.__slots__:
+            value = extra.pop(name, None)
+            if name in cls.INTERN and type(value) is str:
+                value = sys.intern(value)
+            setattr(obj, name, value)
+        obj.extra = extra or None
+        return obj
+
+    @classmethod
+    def from_list(cls, items: List[Dict[str, Any]]) -> List["Model"]:
+        return [cls.from_dict(item) for item in items]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        编码为请求体字典，值为 None 的字段不输出
+        """
+        data = {}
+        for name in self.__slots__:
+            value = getattr(self, name)
+            if value is not None:
+                data[name] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """
+        按字段名取值，兼容按字典使用结果的代码
+        """
+        if name in self.__slots__:
+            value = getattr(self, name)
+            return default if value is None else value
+        return (self.extra or {}).get(name, default)
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self.__slots__:
+            return getattr(self, name)
+        if self.extra and name in self.extra:
+            return self.extra[name]
+        raise KeyError(name)
+
+    def __eq__(self, other: Any) -> bool:
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.to_dict().items())
+        return f"{type(self).__name__}({fields})"
+
+
+class Project(Model):
+    __slots__ = ("id", "name", "description", "created_at", "updated_at")
+
+
+class Task(Model):
+    __slots__ = ("id", "project_id", "name", "description", "instruction", "created_at", "updated_at")
+
+
+class Sample(Model):
+    __slots__ = (
+        "id", "input", "output", "topic_path",
+        "input_model_name", "input_provider", "output_model_name", "output_provider",
+        "prompt_method", "human_guidance", "session_id", "created_at"
+    )
+    INTERN = ("input_model_name", "input_provider", "output_model_name", "output_provider", "prompt_method")
+
+
+class DatasetSplit(Model):
+    __slots__ = ("id", "name", "description", "dataset_split_type", "filter_id", "splits", "created_at")
+    INTERN = ("dataset_split_type", "filter_id")
+
+
+class Finetune(Model):
+    __slots__ = (
+        "id", "name", "description", "status", "provider", "base_model_id", "fine_tune_model_id",
+        "dataset_id", "train_split_name", "validation_split_name", "parameters",
+        "custom_system_message", "custom_thinking_instructions", "data_strategy", "created_at"
+    )
+    INTERN = ("status", "provider", "base_model_id", "train_split_name", "validation_split_name", "data_strategy")
+
+
+class Provider(Model):
+    __slots__ = ("id", "name", "enabled", "models")
+    INTERN = ("id",)
+
+
+class Hyperparameter(Model):
+    __slots__ = ("name", "type", "description", "optional", "default")
+    INTERN = ("type",)
+
+
+def decode_as(data: Any, model: type) -> Any:
+    """
+    把解码后的响应转换为模型对象：字典转为单个对象，列表转为对象列表，其他值原样返回
+
+    Args:
+        data: 解码后的响应
+        model: 模型类
+
+    Returns:
+        模型对象、对象列表或原值
+    """
+    if isinstance(data, dict):
+        return model.from_dict(data)
+    if isinstance(data, list):
+        return [model.from_dict(item) if isinstance(item, dict) else item for item in data]
+    return data
+
+
+def encode_model(obj: Any) -> Dict[str, Any]:
+    """
+    编解码器的 default 钩子：把模型对象编码为字典
+    """
+    if isinstance(obj, Model):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not serializable")
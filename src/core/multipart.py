@@ -0,0 +1,141 @@
+import asyncio
+import os
+import uuid
+import zlib
+from typing import AsyncIterator, Callable, Iterable, Iterator, Optional, Any, Union
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class MultipartFileStream:
+    """
+    流式生成只含一个文件字段的 multipart/form-data 请求体
+
+    文件内容按固定大小分块读取，整个请求体不会同时驻留内存。来源可以是文件路径、
+    带 read() 的文件对象，或产出 bytes/str 的任意可迭代对象（例如边生成边上传的
+    CSV 行）。compress=True 时整个请求体以 gzip 流式压缩，配合
+    Content-Encoding: gzip 发送。来源为文件路径且不压缩时长度已知，会发送
+    Content-Length，否则使用分块传输编码。
+
+    用法:
+
+        stream = MultipartFileStream("samples.csv", compress=True)
+        requests.post(url, data=stream, headers=stream.headers)
+
+    异步迭代（aiohttp）时文件读取和压缩在线程池中执行，不阻塞事件循环。
+    """
+
+    def __init__(
+        self,
+        source: Union[str, Any, Iterable[Union[bytes, str]]],
+        field_name: str = "file",
+        filename: Optional[str] = None,
+        content_type: str = "application/octet-stream",
+        compress: bool = False,
+        compress_level: int = 6,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+    ):
+        """
+        初始化请求体
+
+        Args:
+            source: 文件路径、文件对象或产出 bytes/str 的可迭代对象
+            field_name: 表单字段名
+            filename: 上传的文件名，不传时取自路径或文件对象的 name 属性
+            content_type: 文件字段的 Content-Type
+            compress: 是否以 gzip 流式压缩整个请求体
+            compress_level: gzip 压缩级别（1-9）
+            chunk_size: 从来源读取的块大小
+            progress_callback: 进度回调，参数为已读取的原始字节数和总字节数（未知时为 None）
+        """
+        self.source = source
+        self.compress = compress
+        self.compress_level = compress_level
+        self.chunk_size = chunk_size
+        self.progress_callback = progress_callback
+        self.boundary = uuid.uuid4().hex
+
+        if filename is None:
+            name = source if isinstance(source, str) else getattr(source, "name", None)
+            filename = os.path.basename(name) if isinstance(name, str) else "upload"
+        safe_filename = filename.replace("\\", "\\\\").replace('"', '\\"')
+        self._preamble = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{safe_filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n"
+        ).encode("utf-8")
+        self._epilogue = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self.source_size = os.path.getsize(source) if isinstance(source, str) else None
+
+    @property
+    def headers(self) -> dict:
+        """
+        发送该请求体需要的请求头
+        """
+        headers = {"Content-Type": f"multipart/form-data; boundary={self.boundary}"}
+        if self.compress:
+            headers["Content-Encoding"] = "gzip"
+        return headers
+
+    @property
+    def len(self) -> int:
+        """
+        请求体总字节数
+
+        requests 通过该属性确定 Content-Length（与 requests-toolbelt 的约定一致）；
+        长度未知时抛出 AttributeError，使其回退到分块传输编码
+        """
+        if self.compress or self.source_size is None:
+            raise AttributeError("请求体长度未知")
+        return len(self._preamble) + self.source_size + len(self._epilogue)
+
+    def _iter_source(self) -> Iterator[bytes]:
+        if isinstance(self.source, str):
+            with open(self.source, "rb") as f:
+                yield from iter(lambda: f.read(self.chunk_size), b"")
+        elif hasattr(self.source, "read"):
+            while True:
+                chunk = self.source.read(self.chunk_size)
+                if not chunk:
+                    break
+                yield chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        else:
+            buffer = bytearray()
+            for item in self.source:
+                buffer += item.encode("utf-8") if isinstance(item, str) else item
+                if len(buffer) >= self.chunk_size:
+                    yield bytes(buffer)
+                    buffer.clear()
+            if buffer:
+                yield bytes(buffer)
+
+    def _iter_raw(self) -> Iterator[bytes]:
+        yield self._preamble
+        sent = 0
+        for chunk in self._iter_source():
+            sent += len(chunk)
+            yield chunk
+            if self.progress_callback:
+                self.progress_callback(sent, self.source_size)
+        yield self._epilogue
+
+    def __iter__(self) -> Iterator[bytes]:
+        if not self.compress:
+            yield from self._iter_raw()
+            return
+        compressor = zlib.compressobj(self.compress_level, zlib.DEFLATED, 31)
+        for chunk in self._iter_raw():
+            compressed = compressor.compress(chunk)
+            if compressed:
+                yield compressed
+        yield compressor.flush()
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        loop = asyncio.get_running_loop()
+        chunks = iter(self)
+        while True:
+            chunk = await loop.run_in_executor(None, next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
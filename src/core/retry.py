@@ -0,0 +1,183 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Any
+
+# 无论请求是否幂等都可以安全重试的状态码：服务端明确表示未处理该请求
+SAFE_RETRY_STATUSES = (429, 503)
+# 服务端可能已经处理了请求，只对幂等请求（或携带幂等键的请求）重试
+UNSAFE_RETRY_STATUSES = (502, 504)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+
+
+class RetryBudget:
+    """
+    重试预算（令牌桶）
+
+    每个原始请求存入 ratio 个令牌，每次重试取出一个令牌，令牌不足时放弃重试。
+    这样重试流量最多占原始流量的 ratio 比例，避免故障时重试风暴放大压力。
+    """
+
+    def __init__(self, ratio: float = 0.2, min_tokens: float = 10.0, max_tokens: float = 100.0):
+        """
+        初始化重试预算
+
+        Args:
+            ratio: 每个原始请求存入的令牌数，即允许的重试比例
+            min_tokens: 初始令牌数，保证低流量时也能重试
+            max_tokens: 令牌上限
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = min_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+class RetryPolicy:
+    """
+    重试策略：带抖动的指数退避，遵循 Retry-After，并受重试预算约束
+
+    多个传输层共享同一个策略实例时，也共享同一个全局重试预算。
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_retry_after: float = 120.0,
+        safe_statuses: Iterable[int] = SAFE_RETRY_STATUSES,
+        unsafe_statuses: Iterable[int] = UNSAFE_RETRY_STATUSES,
+        budget: Optional[RetryBudget] = None
+    ):
+        """
+        初始化重试策略
+
+        Args:
+            max_attempts: 最大尝试次数（含首次请求），1 表示不重试
+            backoff_base: 退避基数（秒），第 n 次重试最多等待 backoff_base * 2^n
+            backoff_max: 单次退避的最大等待时间（秒）
+            max_retry_after: 服务端 Retry-After 的最大采纳值（秒）
+            safe_statuses: 对任何请求都重试的状态码
+            unsafe_statuses: 仅对幂等请求重试的状态码
+            budget: 重试预算，不传时创建独立的预算
+        """
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.safe_statuses = set(safe_statuses)
+        self.unsafe_statuses = set(unsafe_statuses)
+        self.budget = budget or RetryBudget()
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "retries": 0, "budget_exhausted": 0}
+
+    def is_idempotent(self, method: str, idempotency_key: Optional[str] = None) -> bool:
+        return method.upper() in IDEMPOTENT_METHODS or bool(idempotency_key)
+
+    def record_request(self) -> None:
+        self.budget.deposit()
+        with self._lock:
+            self._stats["requests"] += 1
+
+    def next_delay(
+        self,
+        attempt: int,
+        idempotent: bool,
+        status_code: Optional[int] = None,
+        retry_after: Optional[str] = None
+    ) -> Optional[float]:
+        """
+        判断是否重试并计算等待时间
+
+        Args:
+            attempt: 已完成的尝试次数
+            idempotent: 请求是否幂等
+            status_code: 响应状态码，连接错误时为 None
+            retry_after: 响应的 Retry-After 头
+
+        Returns:
+            下次重试前的等待秒数，不重试时返回 None
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if status_code is None:
+            retryable = idempotent
+        else:
+            retryable = status_code in self.safe_statuses or (idempotent and status_code in self.unsafe_statuses)
+        if not retryable:
+            return None
+
+        if not self.budget.withdraw():
+            with self._lock:
+                self._stats["budget_exhausted"] += 1
+            return None
+
+        with self._lock:
+            self._stats["retries"] += 1
+
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1))))
+        server_delay = parse_retry_after(retry_after)
+        if server_delay is not None:
+            delay = max(delay, min(server_delay, self.max_retry_after))
+        return delay
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取重试统计
+
+        Returns:
+            包含 requests、retries、budget_exhausted 及剩余预算的字典
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["budget_tokens"] = self.budget.tokens
+        return stats
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    解析 Retry-After 头，支持秒数和 HTTP 日期两种格式
+
+    Args:
+        value: Retry-After 头的值
+
+    Returns:
+        需要等待的秒数，无法解析时返回 None
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def is_replayable(kwargs: Dict[str, Any]) -> bool:
+    """
+    判断请求体能否在重试时原样重发（文件、生成器等流式请求体不能）
+    """
+    if kwargs.get("files"):
+        return False
+    data = kwargs.get("data")
+    return data is None or isinstance(data, (bytes, bytearray, str, dict))
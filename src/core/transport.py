@@ -0,0 +1,406 @@
+import threading
+import time
+from typing import Callable, Dict, Optional, Any, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from core.cache import ResponseCache
+from core.coalesce import SingleFlight, request_key
+from core.codec import decode_response_body, encode_request_kwargs, get_codec
+from core.conditional import ValidatorEntry, ValidatorStore
+from core.compression import DEFAULT_COMPRESS_LEVEL, DEFAULT_COMPRESS_THRESHOLD, compress_request_kwargs
+from core.retry import RetryPolicy, is_replayable
+
+
+class PoolStats:
+    """
+    连接池统计，按主机记录连接复用（命中）与新建连接（未命中）次数
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+
+    def record_checkout(self, host: str) -> None:
+        with self._lock:
+            counters = self._hosts.setdefault(host, {"checkouts": 0, "misses": 0})
+            counters["checkouts"] += 1
+
+    def record_new_connection(self, host: str) -> None:
+        with self._lock:
+            counters = self._hosts.setdefault(host, {"checkouts": 0, "misses": 0})
+            counters["misses"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取统计快照
+
+        Returns:
+            包含总体及各主机 hits、misses、hit_rate 的字典
+        """
+        with self._lock:
+            hosts = {}
+            total_hits = 0
+            total_misses = 0
+            for host, counters in self._hosts.items():
+                misses = counters["misses"]
+                hits = max(counters["checkouts"] - misses, 0)
+                hosts[host] = {"hits": hits, "misses": misses, "hit_rate": _rate(hits, misses)}
+                total_hits += hits
+                total_misses += misses
+        return {
+            "hits": total_hits,
+            "misses": total_misses,
+            "hit_rate": _rate(total_hits, total_misses),
+            "hosts": hosts
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
+
+
+def _rate(hits: int, misses: int) -> float:
+    total = hits + misses
+    return hits / total if total else 0.0
+
+
+def _counting_pool_class(base: type, stats: PoolStats) -> type:
+    class CountingPool(base):
+        def _get_conn(self, timeout=None):
+            stats.record_checkout(self.host)
+            return super()._get_conn(timeout)
+
+        def _new_conn(self):
+            stats.record_new_connection(self.host)
+            return super()._new_conn()
+
+    CountingPool.__name__ = f"Counting{base.__name__}"
+    return CountingPool
+
+
+class _CountingHTTPAdapter(HTTPAdapter):
+    """
+    为 urllib3 连接池注入计数逻辑的 HTTPAdapter
+    """
+
+    def __init__(self, stats: PoolStats, **kwargs):
+        self._stats = stats
+        super().__init__(**kwargs)
+
+    def _install_counting_pools(self, manager) -> None:
+        manager.pool_classes_by_scheme = {
+            "http": _counting_pool_class(HTTPConnectionPool, self._stats),
+            "https": _counting_pool_class(HTTPSConnectionPool, self._stats)
+        }
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self._install_counting_pools(self.poolmanager)
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        is_new = proxy not in self.proxy_manager
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        if is_new:
+            self._install_counting_pools(manager)
+        return manager
+
+
+class HetuAITransport:
+    """
+    HetuAI 共享 HTTP 传输层，基于 requests.Session 复用 TCP/TLS 连接
+
+    多个客户端可以共享同一个实例，例如:
+
+        transport = HetuAITransport(pool_maxsize=32)
+        project_client = HetuAIClient(base_url, transport=transport)
+        data_client = HetuAIDataGenClient(base_url, transport=transport)
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        timeout: Optional[float] = None,
+        compression: bool = False,
+        compress_threshold: int = DEFAULT_COMPRESS_THRESHOLD,
+        compress_level: int = DEFAULT_COMPRESS_LEVEL,
+        codec: Union[str, Any] = "json",
+        retry_policy: Optional[RetryPolicy] = None,
+        coalesce: bool = True,
+        cache: Optional[ResponseCache] = None,
+        validators: Optional[ValidatorStore] = None
+    ):
+        """
+        初始化传输层
+
+        Args:
+            pool_connections: 缓存的主机连接池数量
+            pool_maxsize: 每个主机保持的最大连接数
+            pool_block: 为 True 时严格限制每个主机的连接数，连接用尽时等待而不是新建
+            timeout: 默认请求超时时间（秒），None 表示不超时
+            compression: 是否启用 gzip 压缩模式，启用后超过阈值的请求体会被压缩
+            compress_threshold: 触发请求体压缩的最小字节数
+            compress_level: gzip 压缩级别（1-9）
+            codec: 请求/响应体的编解码器，可选 json（默认）、fastjson、msgpack 或编解码器实例
+            retry_policy: 重试策略，不传时使用默认策略；传入 RetryPolicy(max_attempts=1) 可关闭重试
+            coalesce: 是否合并并发的相同 GET 请求，合并后只发出一次请求并共享结果
+            cache: 读接口的响应缓存（可选），不传时不缓存
+            validators: 条件请求校验器存储（可选），设置后非流式 GET 请求携带
+                If-None-Match / If-Modified-Since，304 时使用保存的响应体
+        """
+        self.timeout = timeout
+        self.compression = compression
+        self.compress_threshold = compress_threshold
+        self.compress_level = compress_level
+        self.codec = get_codec(codec)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.cache = cache
+        self.validators = validators
+        self.single_flight = SingleFlight() if coalesce else None
+        self.pool_stats = PoolStats()
+        self.session = requests.Session()
+
+        adapter = _CountingHTTPAdapter(
+            self.pool_stats,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Connection"] = "keep-alive"
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        idempotency_key: Optional[str] = None,
+        endpoint: Optional[str] = None,
+        on_attempt: Optional[Callable[[int], None]] = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        发送 HTTP 请求，按重试策略自动重试
+
+        Args:
+            method: HTTP 方法
+            url: 请求 URL
+            idempotency_key: 幂等键（可选），作为 Idempotency-Key 头发送，
+                重试时保持不变，使非幂等请求也可以安全重试
+            endpoint: 接口名（可选），用于匹配缓存 TTL
+            on_attempt: 每次尝试收到响应后的回调（可选），参数为状态码；重试前的
+                429/503 也会传给回调，例如用于自适应限流
+            **kwargs: 透传给 requests.Session.request 的参数
+
+        Returns:
+            响应对象
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        if idempotency_key:
+            headers = dict(kwargs.get("headers") or {})
+            headers["Idempotency-Key"] = idempotency_key
+            kwargs["headers"] = headers
+        kwargs = encode_request_kwargs(kwargs, self.codec)
+        if self.compression:
+            kwargs = compress_request_kwargs(kwargs, self.compress_threshold, self.compress_level)
+
+        # 流式请求（stream=True，文件下载与 iter_* 迭代器）不经过读接口缓存与条件请求：
+        # 保存或重放完整响应体与固定内存的流式读取相矛盾，文件下载由 download_to_file
+        # 自行保存校验器
+        is_read = method.upper() == "GET" and not kwargs.get("stream")
+        cache_key = None
+        generation = None
+        if is_read and self.cache is not None and self.cache.is_cacheable(endpoint):
+            cache_key = request_key(method, url, kwargs)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+            generation = self.cache.generation
+
+        send = self._send_conditional if is_read and self.validators is not None else self._send
+        if is_read and self.single_flight is not None:
+            key = cache_key or request_key(method, url, kwargs)
+            response = self.single_flight.do(key, lambda: send(method, url, idempotency_key, kwargs, on_attempt))
+        else:
+            response = send(method, url, idempotency_key, kwargs, on_attempt)
+
+        if cache_key is not None and response.status_code == 200:
+            self.cache.put(endpoint, cache_key, response, generation)
+        return response
+
+    def _send_conditional(
+        self,
+        method: str,
+        url: str,
+        idempotency_key: Optional[str],
+        kwargs: Dict[str, Any],
+        on_attempt: Optional[Callable[[int], None]] = None
+    ) -> requests.Response:
+        key = request_key(method, url, kwargs)
+        entry = self.validators.get(key)
+        if entry is not None:
+            headers = dict(kwargs.get("headers") or {})
+            headers.update(entry.conditional_headers())
+            kwargs = dict(kwargs, headers=headers)
+
+        response = self._send(method, url, idempotency_key, kwargs, on_attempt)
+        if response.status_code == 304 and entry is not None:
+            self.validators.record_not_modified(entry)
+            return self._response_from_entry(entry, response)
+        if response.status_code == 200:
+            self.validators.put(key, response.headers, response.content)
+        return response
+
+    def _response_from_entry(self, entry: ValidatorEntry, response: requests.Response) -> requests.Response:
+        replay = requests.Response()
+        replay.status_code = 200
+        replay.headers = CaseInsensitiveDict(entry.headers)
+        if entry.path is not None:
+            # 落盘的大响应体在读取 content / iter_content 时才从磁盘读取
+            replay.raw = entry.open_content()
+        else:
+            replay._content = entry.content
+        replay.encoding = get_encoding_from_headers(replay.headers)
+        replay.url = response.url
+        replay.request = response.request
+        return replay
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        idempotency_key: Optional[str],
+        kwargs: Dict[str, Any],
+        on_attempt: Optional[Callable[[int], None]] = None
+    ) -> requests.Response:
+        policy = self.retry_policy
+        replayable = is_replayable(kwargs)
+        idempotent = policy.is_idempotent(method, idempotency_key) and replayable
+        policy.record_request()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                delay = policy.next_delay(attempt, idempotent)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                continue
+
+            if on_attempt is not None:
+                on_attempt(response.status_code)
+            delay = None
+            if replayable:
+                delay = policy.next_delay(
+                    attempt, idempotent, response.status_code, response.headers.get("Retry-After")
+                )
+            if delay is None:
+                return response
+            response.close()
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> requests.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def decode(self, response: requests.Response) -> Any:
+        """
+        按响应的 Content-Type 使用对应的编解码器解析响应体
+
+        Args:
+            response: 响应对象
+
+        Returns:
+            解析后的对象
+        """
+        return decode_response_body(response.content, response.headers.get("Content-Type", ""), self.codec)
+
+    def invalidate_cache(self, url: str, prefix: bool = False) -> None:
+        """
+        使指定 URL 的缓存失效，写操作成功后由客户端调用
+
+        Args:
+            url: 请求 URL
+            prefix: 为 True 时同时失效该 URL 下的所有子路径
+        """
+        if self.cache is not None:
+            self.cache.invalidate(url, prefix)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存统计
+
+        Returns:
+            包含 hits、misses、evictions、expirations、invalidations、size 的字典
+        """
+        if self.cache is None:
+            return {}
+        return self.cache.get_stats()
+
+    def get_conditional_stats(self) -> Dict[str, Any]:
+        """
+        获取条件请求统计
+
+        Returns:
+            包含 revalidations、not_modified、bytes_saved 等字段的字典
+        """
+        if self.validators is None:
+            return {}
+        return self.validators.get_stats()
+
+    def get_coalesce_stats(self) -> Dict[str, int]:
+        """
+        获取请求合并统计
+
+        Returns:
+            executed 为实际发出的 GET 请求数，coalesced 为被合并（节省）的请求数
+        """
+        if self.single_flight is None:
+            return {"executed": 0, "coalesced": 0}
+        return self.single_flight.get_stats()
+
+    def get_retry_stats(self) -> Dict[str, Any]:
+        """
+        获取重试统计
+
+        Returns:
+            包含 requests、retries、budget_exhausted 及剩余预算的字典
+        """
+        return self.retry_policy.get_stats()
+
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        获取连接池命中统计
+
+        Returns:
+            包含 hits、misses、hit_rate 及各主机明细的字典
+        """
+        return self.pool_stats.snapshot()
+
+    def close(self) -> None:
+        """
+        关闭所有连接
+        """
+        self.session.close()
+
+    def __enter__(self) -> "HetuAITransport":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
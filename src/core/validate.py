@@ -0,0 +1,283 @@
+import csv
+import json
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
+
+try:
+    import orjson
+except ImportError:  # 可选依赖
+    orjson = None
+
+from core.jsonl_index import JSONLIndex
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+CHAT_ROLES = ("system", "user", "assistant")
+CSV_COLUMNS = ("input", "output")
+
+
+class ValidationReport:
+    """
+    数据集校验结果
+
+    只保存出错的行，内存占用与文件大小无关（可用 max_errors 限制保存的错误数）。
+    """
+
+    def __init__(self, path: Optional[str] = None, max_errors: Optional[int] = None):
+        self.path = path
+        self.max_errors = max_errors
+        self.lines = 0
+        self.records = 0
+        self.error_count = 0
+        self.errors: List[Tuple[int, str]] = []
+        self.elapsed = 0.0
+
+    @property
+    def valid(self) -> bool:
+        return self.error_count == 0
+
+    @property
+    def bad_lines(self) -> List[int]:
+        return sorted({line for line, _ in self.errors})
+
+    @property
+    def lines_per_sec(self) -> float:
+        return self.lines / self.elapsed if self.elapsed > 0 else 0.0
+
+    def add_error(self, line: int, message: str) -> None:
+        self.error_count += 1
+        if self.max_errors is None or len(self.errors) < self.max_errors:
+            self.errors.append((line, message))
+
+    def summary(self, limit: int = 10) -> str:
+        """
+        生成适合放进异常信息的简短描述
+
+        Args:
+            limit: 最多列出的错误数
+
+        Returns:
+            错误描述
+        """
+        parts = [f"第 {line} 行: {message}" for line, message in self.errors[:limit]]
+        if self.error_count > limit:
+            parts.append(f"另有 {self.error_count - limit} 处错误")
+        return f"{self.path or '数据集'} 共 {self.error_count} 处错误; " + "; ".join(parts)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "valid": self.valid,
+            "lines": self.lines,
+            "records": self.records,
+            "error_count": self.error_count,
+            "errors": [{"line": line, "message": message} for line, message in self.errors],
+            "elapsed": self.elapsed,
+            "lines_per_sec": self.lines_per_sec
+        }
+
+
+def check_chat_record(record: Any) -> Optional[str]:
+    """
+    校验一条 OpenAI chat 格式记录
+
+    要求 messages 为非空列表，role 只能是 system/user/assistant，content 为非空字符串，
+    顺序为可选的一条 system，随后 user 与 assistant 交替，并以 assistant 结尾。
+
+    Args:
+        record: 解析后的记录
+
+    Returns:
+        错误描述，校验通过时返回 None
+    """
+    if not isinstance(record, dict):
+        return "记录不是 JSON 对象"
+    messages = record.get("messages")
+    if not isinstance(messages, list) or not messages:
+        return "缺少非空的 messages 列表"
+
+    roles = []
+    for i, message in enumerate(messages, 1):
+        if not isinstance(message, dict):
+            return f"第 {i} 条消息不是 JSON 对象"
+        role = message.get("role")
+        if role not in CHAT_ROLES:
+            return f"第 {i} 条消息的 role 无效: {role!r}"
+        content = message.get("content")
+        if not isinstance(content, str) or not content.strip():
+            return f"第 {i} 条消息（{role}）的 content 为空"
+        roles.append(role)
+
+    start = 1 if roles[0] == "system" else 0
+    turns = roles[start:]
+    if not turns:
+        return "缺少 user 与 assistant 消息"
+    for i, role in enumerate(turns):
+        expected = "user" if i % 2 == 0 else "assistant"
+        if role != expected:
+            return f"第 {start + i + 1} 条消息应为 {expected}，实际为 {role}"
+    if turns[-1] != "assistant":
+        return "最后一条消息应为 assistant"
+    return None
+
+
+def validate_chat_jsonl(
+    lines: Iterable[bytes],
+    path: Optional[str] = None,
+    max_errors: Optional[int] = None
+) -> ValidationReport:
+    """
+    流式校验 OpenAI chat 格式的 JSONL
+
+    Args:
+        lines: 原始行迭代器（例如以二进制模式打开的文件对象）
+        path: 文件路径，仅用于报告
+        max_errors: 报告中保存的最大错误数（可选），error_count 始终为总数
+
+    Returns:
+        校验结果
+    """
+    return validate_chat_lines(enumerate(lines, 1), path, max_errors)
+
+
+def validate_chat_lines(
+    numbered_lines: Iterable[Tuple[int, bytes]],
+    path: Optional[str] = None,
+    max_errors: Optional[int] = None
+) -> ValidationReport:
+    """
+    校验带行号的 chat JSONL 行，可用于只校验文件的一部分（例如 JSONLIndex 的抽样）
+
+    Args:
+        numbered_lines: (行号, 原始行) 迭代器，行号从 1 开始
+        path: 文件路径，仅用于报告
+        max_errors: 报告中保存的最大错误数（可选）
+
+    Returns:
+        校验结果，lines 为校验过的行数
+    """
+    report = ValidationReport(path, max_errors)
+    started = time.perf_counter()
+    for line_no, line in numbered_lines:
+        report.lines += 1
+        if not line.strip():
+            continue
+        report.records += 1
+        try:
+            record = _loads(line)
+        except ValueError as e:
+            report.add_error(line_no, f"JSON 解析失败: {e}")
+            continue
+        error = check_chat_record(record)
+        if error:
+            report.add_error(line_no, error)
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def _decode_lines(lines: Iterable[bytes], encoding: str, report: ValidationReport) -> Iterator[str]:
+    for line_no, line in enumerate(lines, 1):
+        if line_no == 1 and line.startswith(b"\xef\xbb\xbf") and encoding.replace("-", "").lower() == "utf8":
+            line = line[3:]
+        try:
+            yield line.decode(encoding)
+        except UnicodeDecodeError as e:
+            report.add_error(line_no, f"编码错误（{encoding}）: {e.reason}，位置 {e.start}")
+            yield line.decode(encoding, errors="replace")
+        report.lines = line_no
+
+
+def validate_io_csv(
+    lines: Iterable[bytes],
+    path: Optional[str] = None,
+    columns: Tuple[str, ...] = CSV_COLUMNS,
+    encoding: str = "utf-8",
+    max_errors: Optional[int] = None
+) -> ValidationReport:
+    """
+    流式校验 input/output 两列的 CSV
+
+    检查编码、表头、引号、每行列数以及必需列是否为空。多行的引号字段按其起始行报告。
+
+    Args:
+        lines: 原始行迭代器（例如以二进制模式打开的文件对象）
+        path: 文件路径，仅用于报告
+        columns: 必需的列名
+        encoding: 文件编码
+        max_errors: 报告中保存的最大错误数（可选），error_count 始终为总数
+
+    Returns:
+        校验结果
+    """
+    report = ValidationReport(path, max_errors)
+    started = time.perf_counter()
+    reader = csv.reader(_decode_lines(lines, encoding, report), strict=True)
+
+    header = None
+    indexes = []
+    row_start = 1
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            break
+        except csv.Error as e:
+            report.add_error(row_start, f"CSV 格式错误: {e}")
+            row_start = reader.line_num + 1
+            continue
+        line_no, row_start = row_start, reader.line_num + 1
+        if not row:
+            continue
+
+        if header is None:
+            header = [name.strip() for name in row]
+            missing = [name for name in columns if name not in header]
+            if missing:
+                report.add_error(line_no, f"表头缺少列: {', '.join(missing)}")
+                break
+            indexes = [header.index(name) for name in columns]
+            continue
+
+        report.records += 1
+        if len(row) != len(header):
+            report.add_error(line_no, f"列数为 {len(row)}，表头为 {len(header)} 列")
+            continue
+        empty = [columns[i] for i, index in enumerate(indexes) if not row[index].strip()]
+        if empty:
+            report.add_error(line_no, f"列为空: {', '.join(empty)}")
+
+    if header is None:
+        report.add_error(1, "文件为空，缺少表头")
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def validate_file(
+    path: str,
+    encoding: str = "utf-8",
+    max_errors: Optional[int] = None,
+    sample_size: Optional[int] = None,
+    seed: Optional[int] = None
+) -> ValidationReport:
+    """
+    按扩展名校验本地数据集文件：.csv 按 input/output CSV 校验，其余按 chat JSONL 校验
+
+    Args:
+        path: 文件路径
+        encoding: CSV 文件编码
+        max_errors: 报告中保存的最大错误数（可选）
+        sample_size: 只随机抽查的行数（可选，仅 JSONL），通过 JSONLIndex 定位，
+            不读取其余行
+        seed: 抽样的随机种子（可选）
+
+    Returns:
+        校验结果
+    """
+    if sample_size is not None and not path.lower().endswith(".csv"):
+        with JSONLIndex(path) as index:
+            numbered = ((i + 1, index.raw(i)) for i in index.sample(sample_size, seed))
+            return validate_chat_lines(numbered, path, max_errors)
+    with open(path, "rb") as f:
+        if path.lower().endswith(".csv"):
+            return validate_io_csv(f, path, encoding=encoding, max_errors=max_errors)
+        return validate_chat_jsonl(f, path, max_errors=max_errors)
@@ -0,0 +1,446 @@
+import asyncio
+import time
+import uuid
+from contextlib import nullcontext
+from itertools import islice
+from typing import BinaryIO, Callable, Dict, Iterable, List, Optional, Any, Union
+
+from core.async_transport import AsyncHetuAITransport
+from core.batching import AdaptiveBatchSizer
+from core.dedup import SampleDedupIndex
+from core.limiter import AsyncAdaptiveConcurrencyLimiter, LimiterSlot, generation_key
+from core.models import Sample, decode_as
+from core.multipart import DEFAULT_CHUNK_SIZE as DEFAULT_UPLOAD_CHUNK_SIZE, MultipartFileStream
+from core.validate import validate_file
+from dataset.import_jobs import AsyncImportJob
+
+class AsyncHetuAIDataGenClient:
+    """
+    HetuAI 异步数据生成客户端，用于与 hetu_ai_gw 的数据生成 API 进行交互
+    """
+    
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        api_key: Optional[str] = None,
+        transport: Optional[AsyncHetuAITransport] = None,
+        limiter: Optional[AsyncAdaptiveConcurrencyLimiter] = None,
+        typed: bool = False,
+        dedup_index: Optional[SampleDedupIndex] = None
+    ):
+        """
+        初始化 HetuAI 异步数据生成客户端
+        
+        Args:
+            base_url: API 服务的基础 URL
+            api_key: API 认证密钥（如果需要）
+            transport: 共享的异步 HTTP 传输层（可选），不传时创建独立的连接池
+            limiter: 生成接口的自适应并发限流器（可选），按 (provider, model_name) 调整并发
+            typed: 是否返回 core.models 中的类型化结果对象（使用 __slots__，内存占用更小），默认返回字典
+            dedup_index: 持久化的样本去重索引（可选），保存样本前跳过已保存过的样本
+        """
+        self.base_url = base_url
+        self.typed = typed
+        self.limiter = limiter
+        self.dedup_index = dedup_index
+        self.transport = transport or AsyncHetuAITransport()
+        self.headers = {
+            "Content-Type": "application/json"
+        }
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+    
+    def _typed(self, data: Any, model: type) -> Any:
+        return decode_as(data, model) if self.typed else data
+    
+    def _generation_slot(self, input_data: Dict[str, Any]):
+        if self.limiter is None:
+            return nullcontext(LimiterSlot())
+        return self.limiter.slot(generation_key(input_data))
+    
+    async def generate_categories(
+        self, 
+        project_id: str, 
+        task_id: str, 
+        input_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        生成分类
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            input_data: 输入数据，包含 node_path, num_subtopics, model_name, provider 等
+            
+        Returns:
+            生成的分类信息
+        """
+        url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/generate_categories"
+        
+        async with self._generation_slot(input_data) as slot:
+            response = await self.transport.post(url, headers=self.headers, json=input_data, on_attempt=slot.observe)
+        
+        if response.status_code == 200:
+            return self.transport.decode(response)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"生成分类失败: {error_msg}")
+    
+    async def generate_samples(
+        self, 
+        project_id: str, 
+        task_id: str, 
+        input_data: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        生成样本
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            input_data: 输入数据，包含 topic, num_samples, model_name, provider 等
+            
+        Returns:
+            生成的样本信息
+        """
+        url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/generate_samples"
+        
+        async with self._generation_slot(input_data) as slot:
+            response = await self.transport.post(url, headers=self.headers, json=input_data, on_attempt=slot.observe)
+        
+        if response.status_code == 200:
+            result = self.transport.decode(response)
+            if self.typed and isinstance(result, dict) and isinstance(result.get("samples"), list):
+                result["samples"] = Sample.from_list(result["samples"])
+            return result
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"生成样本失败: {error_msg}")
+    
+    async def save_sample(
+        self, 
+        project_id: str, 
+        task_id: str, 
+        sample_data: Dict[str, Any],
+        session_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        保存样本
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            sample_data: 样本数据
+            session_id: 会话ID（可选）
+            idempotency_key: 幂等键（可选），不传时自动生成；重试时保持不变，避免重复写入
+            
+        Returns:
+            保存的样本信息；配置了 dedup_index 且样本已保存过时不发送请求，返回 None
+        """
+        if self.dedup_index is not None and not self.dedup_index.claim(project_id, task_id, [sample_data])[0]:
+            return None
+        url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/save_sample"
+        params = {}
+        if session_id:
+            params["session_id"] = session_id
+        
+        saved = False
+        try:
+            response = await self.transport.post(
+                url,
+                headers=self.headers,
+                json=sample_data,
+                params=params,
+                idempotency_key=idempotency_key or uuid.uuid4().hex
+            )
+            saved = response.status_code == 200
+        finally:
+            if not saved and self.dedup_index is not None:
+                self.dedup_index.release(project_id, task_id, [sample_data])
+        
+        if response.status_code == 200:
+            return self._typed(self.transport.decode(response), Sample)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"保存样本失败: {error_msg}")
+    
+    async def save_samples_batch(
+        self, 
+        project_id: str, 
+        task_id: str, 
+        batch_data: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        批量保存样本
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            batch_data: 批量样本数据
+            idempotency_key: 幂等键（可选），不传时自动生成；重试时保持不变，避免重复写入
+            
+        Returns:
+            保存的样本信息列表；配置了 dedup_index 时已保存过的样本不会发送，全部重复时不发送请求，返回空列表
+        """
+        if self.dedup_index is not None:
+            samples = self.dedup_index.claim(project_id, task_id, batch_data.get("samples") or [])[0]
+            if not samples:
+                return []
+            batch_data = dict(batch_data, samples=samples)
+        url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/save_samples_batch"
+        
+        saved = False
+        try:
+            response = await self.transport.post(
+                url,
+                headers=self.headers,
+                json=batch_data,
+                idempotency_key=idempotency_key or uuid.uuid4().hex
+            )
+            saved = response.status_code == 200
+        finally:
+            if not saved and self.dedup_index is not None:
+                self.dedup_index.release(project_id, task_id, batch_data["samples"])
+        
+        if response.status_code == 200:
+            return self._typed(self.transport.decode(response), Sample)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"批量保存样本失败: {error_msg}")
+    
+    async def save_samples_adaptive(
+        self,
+        project_id: str,
+        task_id: str,
+        samples: Iterable[Dict[str, Any]],
+        sizer: Optional[AdaptiveBatchSizer] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        按自适应批大小调用 save_samples_batch 保存样本
+        
+        每批大小由 sizer 根据观测到的耗时和请求体字节数决定，使每个请求接近目标耗时。
+        批次被 413 拒绝或超时（含 504）时对半拆分后重试，单个样本仍被拒绝时记入 rejected，
+        不会阻塞其余样本。每个请求体只序列化一次。配置了 dedup_index 时已保存过的样本在
+        序列化之前跳过，计入 duplicates。
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            samples: 样本迭代器
+            sizer: 批大小控制器（可选），可在多次调用之间共享以保留学习到的参数
+            idempotency_key: 幂等键前缀（可选），每个批次及拆分后的子批次派生出各自的幂等键
+            
+        Returns:
+            包含 batches（成功的请求数）、samples（保存的样本数）、results（按顺序的保存结果）、
+            rejected（被拒绝的样本与错误）和 duplicates（跳过的重复样本数）的字典
+        """
+        sizer = sizer or AdaptiveBatchSizer()
+        url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/save_samples_batch"
+        headers = dict(self.headers)
+        headers["Content-Type"] = self.transport.codec.content_type
+        key_prefix = idempotency_key or uuid.uuid4().hex
+        outcome = {"batches": 0, "samples": 0, "results": [], "rejected": [], "duplicates": 0}
+        
+        pending = iter(samples)
+        index = 0
+        while True:
+            batch = list(islice(pending, sizer.next_size()))
+            if not batch:
+                break
+            if self.dedup_index is not None:
+                batch, duplicates = self.dedup_index.claim(project_id, task_id, batch)
+                outcome["duplicates"] += len(duplicates)
+                if not batch:
+                    continue
+            rejected_before = len(outcome["rejected"])
+            try:
+                await self._save_bisecting(url, headers, batch, f"{key_prefix}-{index}", sizer, outcome)
+            except BaseException:
+                # 无法确定哪些子批次已保存，撤销整批记录：宁可之后重复保存也不丢样本
+                if self.dedup_index is not None:
+                    self.dedup_index.release(project_id, task_id, batch)
+                raise
+            index += 1
+            if self.dedup_index is not None:
+                rejected = [entry["sample"] for entry in outcome["rejected"][rejected_before:]]
+                self.dedup_index.release(project_id, task_id, rejected)
+        return outcome
+    
+    async def _save_bisecting(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        batch: List[Dict[str, Any]],
+        key: str,
+        sizer: AdaptiveBatchSizer,
+        outcome: Dict[str, Any]
+    ) -> None:
+        stack = [(batch, key)]
+        while stack:
+            batch, key = stack.pop()
+            body = self.transport.codec.encode({"samples": batch})
+            error_msg = None
+            too_large = False
+            if not sizer.fit_bytes(len(batch), len(body)):
+                # 已知会超过字节上限，不发送直接拆分
+                too_large = True
+            else:
+                started = time.perf_counter()
+                try:
+                    response = await self.transport.post(url, headers=headers, data=body, idempotency_key=key)
+                except asyncio.TimeoutError:
+                    response = None
+                    error_msg = "请求超时"
+                if response is not None and response.status_code == 200:
+                    sizer.observe(len(batch), len(body), time.perf_counter() - started)
+                    outcome["batches"] += 1
+                    outcome["samples"] += len(batch)
+                    outcome["results"].append(self._typed(self.transport.decode(response), Sample))
+                    continue
+                if response is not None:
+                    if response.status_code not in (413, 504):
+                        error_msg = self.transport.decode(response).get("detail", "Unknown error")
+                        raise Exception(f"批量保存样本失败: {error_msg}")
+                    too_large = response.status_code == 413
+                    error_msg = "请求体过大" if too_large else "网关超时"
+                sizer.reject(len(batch), len(body), too_large)
+            
+            if len(batch) == 1:
+                outcome["rejected"].append({"sample": batch[0], "error": error_msg or "请求体过大"})
+                continue
+            middle = len(batch) // 2
+            stack.append((batch[middle:], f"{key}.1"))
+            stack.append((batch[:middle], f"{key}.0"))
+    
+    async def import_samples_async(
+        self, 
+        project_id: str, 
+        task_id: str, 
+        batch_data: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> AsyncImportJob:
+        """
+        异步导入样本
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            batch_data: 批量样本数据
+            idempotency_key: 幂等键（可选），不传时自动生成；重试时保持不变，避免重复写入
+            
+        Returns:
+            导入任务句柄（AsyncImportJob），可以像字典一样读取提交时返回的状态，也可以调用 wait 等待完成
+        """
+        url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/import_samples_async"
+        
+        response = await self.transport.post(
+            url,
+            headers=self.headers,
+            json=batch_data,
+            idempotency_key=idempotency_key or uuid.uuid4().hex
+        )
+        
+        if response.status_code == 200:
+            return AsyncImportJob(self, project_id, task_id, self.transport.decode(response))
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"异步导入样本失败: {error_msg}")
+    
+    async def get_import_status(
+        self,
+        project_id: str,
+        task_id: str,
+        job_id: str
+    ) -> Dict[str, Any]:
+        """
+        获取异步导入任务的状态
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            job_id: import_samples_async 返回的任务ID
+            
+        Returns:
+            导入任务的状态信息
+        """
+        url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/import_samples_async/{job_id}"
+        
+        response = await self.transport.get(url, headers=self.headers)
+        
+        if response.status_code == 200:
+            return self.transport.decode(response)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"获取导入状态失败: {error_msg}")
+    
+    async def import_samples_from_file(
+        self, 
+        project_id: str, 
+        task_id: str, 
+        file_path: Union[str, BinaryIO, Iterable[Union[bytes, str]]],
+        request_data: Optional[Dict[str, Any]] = None,
+        filename: Optional[str] = None,
+        compress: bool = False,
+        chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+        validate: bool = False
+    ) -> Dict[str, Any]:
+        """
+        从文件导入样本
+        
+        文件以 multipart 请求体流式上传，内存占用与文件大小无关。
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            file_path: 文件路径，也可以是文件对象或产出 bytes/str 的可迭代对象
+            request_data: 请求数据（可选）
+            filename: 上传的文件名（可选），来源不是文件路径时建议指定
+            compress: 是否以 gzip 流式压缩请求体（Content-Encoding: gzip）
+            chunk_size: 读取文件的块大小
+            progress_callback: 进度回调，参数为已上传字节数和总字节数（未知时为 None）
+            validate: 上传前是否在本地校验文件（仅当 file_path 为路径时），发现错误时不上传
+            
+        Returns:
+            导入操作的状态信息
+        """
+
+        if request_data is None:
+            request_data = {}
+        
+        # 确保prompt_method在查询参数中
+        params = {
+            "prompt_method": request_data.get("prompt_method", "simple_prompt_builder"),
+            "input_model_name": request_data.get("input_model_name", ""),
+            "output_model_name": request_data.get("output_model_name", ""),
+            "input_provider": request_data.get("input_provider", ""),
+            "output_provider": request_data.get("output_provider", ""),
+            "session_id": request_data.get("session_id", "")
+        }
+        
+        url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/import_samples_from_file"
+
+        if validate and isinstance(file_path, str):
+            report = await asyncio.get_running_loop().run_in_executor(None, validate_file, file_path)
+            if not report.valid:
+                raise Exception(f"从文件导入样本失败: 文件校验未通过，{report.summary()}")
+
+        body = MultipartFileStream(
+            file_path,
+            filename=filename,
+            compress=compress,
+            chunk_size=chunk_size,
+            progress_callback=progress_callback
+        )
+        headers = {k: v for k, v in self.headers.items() if k != "Content-Type"}
+        headers.update(body.headers)
+
+        try:
+            response = await self.transport.post(url, params=params, data=body, headers=headers)
+            response.raise_for_status()
+            return self.transport.decode(response)
+        except Exception as e:
+            raise Exception(f"从文件导入样本失败: {str(e)}")
@@ -1,26 +1,74 @@
+import os
+import time
+import uuid
+from contextlib import nullcontext
+from itertools import islice
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Any, Tuple, Union
+
 import requests
-from typing import Dict, List, Optional, Any
+
+from core.batching import AdaptiveBatchSizer
+from core.dedup import SampleDedupIndex
+from core.ingest import (
+    DEFAULT_BATCH_SIZE,
+    IngestCheckpoint,
+    file_fingerprint,
+    iter_batches,
+    iter_records,
+    record_to_sample,
+    run_batches
+)
+from core.limiter import AdaptiveConcurrencyLimiter, LimiterSlot, generation_key
+from core.models import Sample, decode_as
+from core.multipart import DEFAULT_CHUNK_SIZE as DEFAULT_UPLOAD_CHUNK_SIZE, MultipartFileStream
+from core.transport import HetuAITransport
+from core.validate import validate_file
+from dataset.import_jobs import ImportJob
 
 class HetuAIDataGenClient:
     """
     HetuAI 数据生成客户端，用于与 hetu_ai_gw 的数据生成 API 进行交互
     """
     
-    def __init__(self, base_url: str = "http://localhost:8000", api_key: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        api_key: Optional[str] = None,
+        transport: Optional[HetuAITransport] = None,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        typed: bool = False,
+        dedup_index: Optional[SampleDedupIndex] = None
+    ):
         """
         初始化 HetuAI 数据生成客户端
         
         Args:
             base_url: API 服务的基础 URL
             api_key: API 认证密钥（如果需要）
+            transport: 共享的 HTTP 传输层（可选），不传时创建独立的连接池
+            limiter: 生成接口的自适应并发限流器（可选），按 (provider, model_name) 调整并发
+            typed: 是否返回 core.models 中的类型化结果对象（使用 __slots__，内存占用更小），默认返回字典
+            dedup_index: 持久化的样本去重索引（可选），保存样本前跳过已保存过的样本
         """
         self.base_url = base_url
+        self.typed = typed
+        self.limiter = limiter
+        self.dedup_index = dedup_index
+        self.transport = transport or HetuAITransport()
         self.headers = {
             "Content-Type": "application/json"
         }
         if api_key:
             self.headers["Authorization"] = f"Bearer {api_key}"
     
+    def _typed(self, data: Any, model: type) -> Any:
+        return decode_as(data, model) if self.typed else data
+    
+    def _generation_slot(self, input_data: Dict[str, Any]):
+        if self.limiter is None:
+            return nullcontext(LimiterSlot())
+        return self.limiter.slot(generation_key(input_data))
+    
     def generate_categories(
         self, 
         project_id: str, 
@@ -40,12 +88,13 @@ class HetuAIDataGenClient:
         """
         url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/generate_categories"
         
-        response = requests.post(url, headers=self.headers, json=input_data)
+        with self._generation_slot(input_data) as slot:
+            response = self.transport.post(url, headers=self.headers, json=input_data, on_attempt=slot.observe)
         
         if response.status_code == 200:
-            return response.json()
+            return self.transport.decode(response)
         else:
-            error_msg = response.json().get("detail", "Unknown error")
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
             raise Exception(f"生成分类失败: {error_msg}")
     
     def generate_samples(
@@ -67,12 +116,16 @@ class HetuAIDataGenClient:
         """
         url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/generate_samples"
         
-        response = requests.post(url, headers=self.headers, json=input_data)
+        with self._generation_slot(input_data) as slot:
+            response = self.transport.post(url, headers=self.headers, json=input_data, on_attempt=slot.observe)
         
         if response.status_code == 200:
-            return response.json()
+            result = self.transport.decode(response)
+            if self.typed and isinstance(result, dict) and isinstance(result.get("samples"), list):
+                result["samples"] = Sample.from_list(result["samples"])
+            return result
         else:
-            error_msg = response.json().get("detail", "Unknown error")
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
             raise Exception(f"生成样本失败: {error_msg}")
     
     def save_sample(
@@ -80,7 +133,8 @@ class HetuAIDataGenClient:
         project_id: str, 
         task_id: str, 
         sample_data: Dict[str, Any],
-        session_id: Optional[str] = None
+        session_id: Optional[str] = None,
+        idempotency_key: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         保存样本
@@ -90,28 +144,44 @@ class HetuAIDataGenClient:
             task_id: 任务ID
             sample_data: 样本数据
             session_id: 会话ID（可选）
+            idempotency_key: 幂等键（可选），不传时自动生成；重试时保持不变，避免重复写入
             
         Returns:
-            保存的样本信息
+            保存的样本信息；配置了 dedup_index 且样本已保存过时不发送请求，返回 None
         """
+        if self.dedup_index is not None and not self.dedup_index.claim(project_id, task_id, [sample_data])[0]:
+            return None
         url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/save_sample"
         params = {}
         if session_id:
             params["session_id"] = session_id
         
-        response = requests.post(url, headers=self.headers, json=sample_data, params=params)
+        saved = False
+        try:
+            response = self.transport.post(
+                url,
+                headers=self.headers,
+                json=sample_data,
+                params=params,
+                idempotency_key=idempotency_key or uuid.uuid4().hex
+            )
+            saved = response.status_code == 200
+        finally:
+            if not saved and self.dedup_index is not None:
+                self.dedup_index.release(project_id, task_id, [sample_data])
         
         if response.status_code == 200:
-            return response.json()
+            return self._typed(self.transport.decode(response), Sample)
         else:
-            error_msg = response.json().get("detail", "Unknown error")
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
             raise Exception(f"保存样本失败: {error_msg}")
     
     def save_samples_batch(
         self, 
         project_id: str, 
         task_id: str, 
-        batch_data: Dict[str, Any]
+        batch_data: Dict[str, Any],
+        idempotency_key: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         批量保存样本
@@ -120,26 +190,149 @@ class HetuAIDataGenClient:
             project_id: 项目ID
             task_id: 任务ID
             batch_data: 批量样本数据
+            idempotency_key: 幂等键（可选），不传时自动生成；重试时保持不变，避免重复写入
             
         Returns:
-            保存的样本信息列表
+            保存的样本信息列表；配置了 dedup_index 时已保存过的样本不会发送，全部重复时不发送请求，返回空列表
         """
+        if self.dedup_index is not None:
+            samples = self.dedup_index.claim(project_id, task_id, batch_data.get("samples") or [])[0]
+            if not samples:
+                return []
+            batch_data = dict(batch_data, samples=samples)
         url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/save_samples_batch"
         
-        response = requests.post(url, headers=self.headers, json=batch_data)
+        saved = False
+        try:
+            response = self.transport.post(
+                url,
+                headers=self.headers,
+                json=batch_data,
+                idempotency_key=idempotency_key or uuid.uuid4().hex
+            )
+            saved = response.status_code == 200
+        finally:
+            if not saved and self.dedup_index is not None:
+                self.dedup_index.release(project_id, task_id, batch_data["samples"])
         
         if response.status_code == 200:
-            return response.json()
+            return self._typed(self.transport.decode(response), Sample)
         else:
-            error_msg = response.json().get("detail", "Unknown error")
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
             raise Exception(f"批量保存样本失败: {error_msg}")
     
+    def save_samples_adaptive(
+        self,
+        project_id: str,
+        task_id: str,
+        samples: Iterable[Dict[str, Any]],
+        sizer: Optional[AdaptiveBatchSizer] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        按自适应批大小调用 save_samples_batch 保存样本
+        
+        每批大小由 sizer 根据观测到的耗时和请求体字节数决定，使每个请求接近目标耗时。
+        批次被 413 拒绝或超时（含 504）时对半拆分后重试，单个样本仍被拒绝时记入 rejected，
+        不会阻塞其余样本。每个请求体只序列化一次。配置了 dedup_index 时已保存过的样本在
+        序列化之前跳过，计入 duplicates。
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            samples: 样本迭代器
+            sizer: 批大小控制器（可选），可在多次调用之间共享以保留学习到的参数
+            idempotency_key: 幂等键前缀（可选），每个批次及拆分后的子批次派生出各自的幂等键
+            
+        Returns:
+            包含 batches（成功的请求数）、samples（保存的样本数）、results（按顺序的保存结果）、
+            rejected（被拒绝的样本与错误）和 duplicates（跳过的重复样本数）的字典
+        """
+        sizer = sizer or AdaptiveBatchSizer()
+        url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/save_samples_batch"
+        headers = dict(self.headers)
+        headers["Content-Type"] = self.transport.codec.content_type
+        key_prefix = idempotency_key or uuid.uuid4().hex
+        outcome = {"batches": 0, "samples": 0, "results": [], "rejected": [], "duplicates": 0}
+        
+        pending = iter(samples)
+        index = 0
+        while True:
+            batch = list(islice(pending, sizer.next_size()))
+            if not batch:
+                break
+            if self.dedup_index is not None:
+                batch, duplicates = self.dedup_index.claim(project_id, task_id, batch)
+                outcome["duplicates"] += len(duplicates)
+                if not batch:
+                    continue
+            rejected_before = len(outcome["rejected"])
+            try:
+                self._save_bisecting(url, headers, batch, f"{key_prefix}-{index}", sizer, outcome)
+            except BaseException:
+                # 无法确定哪些子批次已保存，撤销整批记录：宁可之后重复保存也不丢样本
+                if self.dedup_index is not None:
+                    self.dedup_index.release(project_id, task_id, batch)
+                raise
+            index += 1
+            if self.dedup_index is not None:
+                rejected = [entry["sample"] for entry in outcome["rejected"][rejected_before:]]
+                self.dedup_index.release(project_id, task_id, rejected)
+        return outcome
+    
+    def _save_bisecting(
+        self,
+        url: str,
+        headers: Dict[str, str],
+        batch: List[Dict[str, Any]],
+        key: str,
+        sizer: AdaptiveBatchSizer,
+        outcome: Dict[str, Any]
+    ) -> None:
+        stack = [(batch, key)]
+        while stack:
+            batch, key = stack.pop()
+            body = self.transport.codec.encode({"samples": batch})
+            error_msg = None
+            too_large = False
+            if not sizer.fit_bytes(len(batch), len(body)):
+                # 已知会超过字节上限，不发送直接拆分
+                too_large = True
+            else:
+                started = time.perf_counter()
+                try:
+                    response = self.transport.post(url, headers=headers, data=body, idempotency_key=key)
+                except requests.Timeout:
+                    response = None
+                    error_msg = "请求超时"
+                if response is not None and response.status_code == 200:
+                    sizer.observe(len(batch), len(body), time.perf_counter() - started)
+                    outcome["batches"] += 1
+                    outcome["samples"] += len(batch)
+                    outcome["results"].append(self._typed(self.transport.decode(response), Sample))
+                    continue
+                if response is not None:
+                    if response.status_code not in (413, 504):
+                        error_msg = self.transport.decode(response).get("detail", "Unknown error")
+                        raise Exception(f"批量保存样本失败: {error_msg}")
+                    too_large = response.status_code == 413
+                    error_msg = "请求体过大" if too_large else "网关超时"
+                sizer.reject(len(batch), len(body), too_large)
+            
+            if len(batch) == 1:
+                outcome["rejected"].append({"sample": batch[0], "error": error_msg or "请求体过大"})
+                continue
+            middle = len(batch) // 2
+            stack.append((batch[middle:], f"{key}.1"))
+            stack.append((batch[:middle], f"{key}.0"))
+    
     def import_samples_async(
         self, 
         project_id: str, 
         task_id: str, 
-        batch_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
+        batch_data: Dict[str, Any],
+        idempotency_key: Optional[str] = None
+    ) -> ImportJob:
         """
         异步导入样本
         
@@ -147,35 +340,80 @@ class HetuAIDataGenClient:
             project_id: 项目ID
             task_id: 任务ID
             batch_data: 批量样本数据
+            idempotency_key: 幂等键（可选），不传时自动生成；重试时保持不变，避免重复写入
             
         Returns:
-            导入操作的状态信息
+            导入任务句柄（ImportJob），可以像字典一样读取提交时返回的状态，也可以调用 wait 等待完成
         """
         url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/import_samples_async"
         
-        response = requests.post(url, headers=self.headers, json=batch_data)
+        response = self.transport.post(
+            url,
+            headers=self.headers,
+            json=batch_data,
+            idempotency_key=idempotency_key or uuid.uuid4().hex
+        )
         
         if response.status_code == 200:
-            return response.json()
+            return ImportJob(self, project_id, task_id, self.transport.decode(response))
         else:
-            error_msg = response.json().get("detail", "Unknown error")
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
             raise Exception(f"异步导入样本失败: {error_msg}")
     
+    def get_import_status(
+        self,
+        project_id: str,
+        task_id: str,
+        job_id: str
+    ) -> Dict[str, Any]:
+        """
+        获取异步导入任务的状态
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            job_id: import_samples_async 返回的任务ID
+            
+        Returns:
+            导入任务的状态信息
+        """
+        url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/import_samples_async/{job_id}"
+        
+        response = self.transport.get(url, headers=self.headers)
+        
+        if response.status_code == 200:
+            return self.transport.decode(response)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"获取导入状态失败: {error_msg}")
+    
     def import_samples_from_file(
         self, 
         project_id: str, 
         task_id: str, 
-        file_path: str,
-        request_data: Optional[Dict[str, Any]] = None
+        file_path: Union[str, BinaryIO, Iterable[Union[bytes, str]]],
+        request_data: Optional[Dict[str, Any]] = None,
+        filename: Optional[str] = None,
+        compress: bool = False,
+        chunk_size: int = DEFAULT_UPLOAD_CHUNK_SIZE,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None,
+        validate: bool = False
     ) -> Dict[str, Any]:
         """
         从文件导入样本
         
+        文件以 multipart 请求体流式上传，内存占用与文件大小无关。
+        
         Args:
             project_id: 项目ID
             task_id: 任务ID
-            file_path: 文件路径
+            file_path: 文件路径，也可以是文件对象或产出 bytes/str 的可迭代对象
             request_data: 请求数据（可选）
+            filename: 上传的文件名（可选），来源不是文件路径时建议指定
+            compress: 是否以 gzip 流式压缩请求体（Content-Encoding: gzip）
+            chunk_size: 读取文件的块大小
+            progress_callback: 进度回调，参数为已上传字节数和总字节数（未知时为 None）
+            validate: 上传前是否在本地校验文件（仅当 file_path 为路径时），发现错误时不上传
             
         Returns:
             导入操作的状态信息
@@ -194,24 +432,125 @@ class HetuAIDataGenClient:
             "session_id": request_data.get("session_id", "")
         }
         
-        # 准备文件上传
-        # files = {"file": open(file_path, "rb")}
-
-        files = {"file": open(file_path, "rb")}
-
         url = f"{self.base_url}/api/dataset/projects/{project_id}/tasks/{task_id}/import_samples_from_file"
+
+        if validate and isinstance(file_path, str):
+            report = validate_file(file_path)
+            if not report.valid:
+                raise Exception(f"从文件导入样本失败: 文件校验未通过，{report.summary()}")
         
+        body = MultipartFileStream(
+            file_path,
+            filename=filename,
+            compress=compress,
+            chunk_size=chunk_size,
+            progress_callback=progress_callback
+        )
+        headers = {k: v for k, v in self.headers.items() if k != "Content-Type"}
+        headers.update(body.headers)
 
         try:
-            print("\n测试从文件导入样本SUCCESS000")
-            response = requests.post(url, params=params, files=files)
+            response = self.transport.post(url, params=params, data=body, headers=headers)
             response.raise_for_status()
-            print("\n测试从文件导入样本SUCCESS")
-            return response.json()
+            return self.transport.decode(response)
         
         except Exception as e:
             raise Exception(f"从文件导入样本失败: {str(e)}")
-        finally:
-            # 确保关闭文件
-            for f in files.values():
-                f.close()
+    
+    def iter_ingest_file(
+        self,
+        project_id: str,
+        task_id: str,
+        file_path: str,
+        sample_defaults: Optional[Dict[str, Any]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_workers: int = 4,
+        checkpoint_path: Optional[str] = None,
+        record_mapper: Callable[[Dict[str, Any]], Dict[str, Any]] = record_to_sample,
+        validate: bool = False,
+        shard: Optional[Tuple[int, int]] = None
+    ) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        把本地 JSONL/CSV 数据集分批并发上传到 save_samples_batch，按批次顺序逐批返回结果
+        
+        文件逐行读取，同时驻留内存的批次数有上限。每个批次使用由文件指纹和批次序号
+        派生的固定幂等键，重新运行时重发的批次不会重复写入。
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            file_path: JSONL 或 CSV 文件路径
+            sample_defaults: 每个样本的默认字段（可选），例如 prompt_method、input_model_name 等
+            batch_size: 每批样本数
+            max_workers: 最大并发请求数
+            checkpoint_path: 检查点文件路径（可选），重新运行时跳过已成功的批次
+            record_mapper: 记录到样本的转换函数，默认支持 OpenAI chat 格式与 input/output 列
+            validate: 上传前是否在本地校验整个文件，发现错误时不上传任何批次
+            shard: (分片数, 分片序号)（可选，仅 JSONL），只导入按行内容哈希分到该分片的记录，
+                用于在多个进程或机器之间分摊导入
+            
+        Returns:
+            (批次序号, 保存的样本信息列表) 迭代器，已在检查点中的批次不会返回
+        """
+        if validate:
+            report = validate_file(file_path)
+            if not report.valid:
+                raise Exception(f"批量导入失败: 文件校验未通过，{report.summary()}")
+
+        fingerprint = file_fingerprint(file_path, project_id, task_id, batch_size, shard)
+        checkpoint = IngestCheckpoint(checkpoint_path, fingerprint) if checkpoint_path else None
+        defaults = sample_defaults or {}
+
+        def save(index: int, records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+            samples = [dict(defaults, **record_mapper(record)) for record in records]
+            return self.save_samples_batch(
+                project_id,
+                task_id,
+                {"samples": samples},
+                idempotency_key=f"{fingerprint}-{index}"
+            )
+
+        batches = iter_batches(iter_records(file_path, shard=shard), batch_size)
+        yield from run_batches(save, batches, max_workers=max_workers, checkpoint=checkpoint)
+    
+    def ingest_file(
+        self,
+        project_id: str,
+        task_id: str,
+        file_path: str,
+        sample_defaults: Optional[Dict[str, Any]] = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_workers: int = 4,
+        checkpoint_path: Optional[str] = None,
+        record_mapper: Callable[[Dict[str, Any]], Dict[str, Any]] = record_to_sample,
+        validate: bool = False,
+        shard: Optional[Tuple[int, int]] = None
+    ) -> Dict[str, Any]:
+        """
+        把本地 JSONL/CSV 数据集分批并发上传，参数同 iter_ingest_file
+        
+        全部批次成功后删除检查点文件。
+        
+        Returns:
+            包含 batches（本次上传的批次数）、samples（本次保存的样本数）和
+            results（按批次顺序的保存结果）的字典
+        """
+        results = []
+        samples = 0
+        for _, result in self.iter_ingest_file(
+            project_id,
+            task_id,
+            file_path,
+            sample_defaults=sample_defaults,
+            batch_size=batch_size,
+            max_workers=max_workers,
+            checkpoint_path=checkpoint_path,
+            record_mapper=record_mapper,
+            validate=validate,
+            shard=shard
+        ):
+            results.append(result)
+            samples += len(result) if isinstance(result, list) else 0
+        if checkpoint_path and os.path.exists(checkpoint_path):
+            os.remove(checkpoint_path)
+        return {"batches": len(results), "samples": samples, "results": results}
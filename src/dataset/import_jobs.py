@@ -0,0 +1,345 @@
+import asyncio
+import heapq
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Any
+
+SUCCESS_STATES = {"completed", "succeeded", "success", "done", "finished"}
+FAILURE_STATES = {"failed", "error", "cancelled", "canceled"}
+
+
+class PollBackoff:
+    """
+    带抖动的轮询间隔：从 initial 开始每次乘以 factor，最大 max_interval，
+    每次在 ±jitter 范围内随机，避免大量任务在同一时刻轮询
+    """
+
+    def __init__(self, initial: float = 1.0, factor: float = 1.5, max_interval: float = 30.0, jitter: float = 0.2):
+        self.initial = initial
+        self.factor = factor
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self._interval = initial
+
+    def next(self) -> float:
+        """
+        下一次轮询前的等待秒数
+        """
+        delay = self._interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        self._interval = min(self._interval * self.factor, self.max_interval)
+        return delay
+
+    def copy(self) -> "PollBackoff":
+        return PollBackoff(self.initial, self.factor, self.max_interval, self.jitter)
+
+
+class ImportJob(dict):
+    """
+    import_samples_async 返回的导入任务句柄
+
+    status 为最近一次获取的状态（初始为提交时的响应）。句柄本身是 dict 的子类，
+    内容与 status 保持一致，in、迭代、json.dumps 等都与原来的返回字典相同。响应中没有任务 ID（job_id / id）时视为
+    服务端已同步完成。
+
+    用法:
+
+        job = client.import_samples_async(project_id, task_id, {"samples": samples})
+        status = job.wait(timeout=600, progress_callback=lambda s: print(job.progress))
+    """
+
+    # 状态中 progress 字段的满值：服务端按百分比（0 到 100）报告进度
+    progress_scale = 100.0
+
+    def __init__(self, client: Any, project_id: str, task_id: str, info: Dict[str, Any]):
+        """
+        初始化导入任务句柄
+
+        Args:
+            client: 提交任务的数据生成客户端
+            project_id: 项目ID
+            task_id: 任务ID
+            info: import_samples_async 的响应
+        """
+        self.client = client
+        self.project_id = project_id
+        self.task_id = task_id
+        super().__init__()
+        self._update(info if isinstance(info, dict) else {})
+        self.job_id = self.status.get("job_id") or self.status.get("id")
+
+    @property
+    def state(self) -> Optional[str]:
+        state = self.status.get("status") or self.status.get("state")
+        return state.lower() if isinstance(state, str) else None
+
+    @property
+    def done(self) -> bool:
+        return self.job_id is None or self.state in SUCCESS_STATES or self.state in FAILURE_STATES
+
+    @property
+    def succeeded(self) -> bool:
+        return self.done and self.state not in FAILURE_STATES
+
+    @property
+    def progress(self) -> Optional[float]:
+        """
+        进度（0 到 1），状态中没有进度信息时为 None
+
+        优先使用 processed（或 imported）/ total；否则使用 progress 字段除以
+        progress_scale，服务端按 0 到 1 报告时把 progress_scale 设为 1。
+        """
+        if self.state in SUCCESS_STATES:
+            return 1.0
+        total = self.status.get("total")
+        processed = self.status.get("processed", self.status.get("imported"))
+        if isinstance(total, int) and total > 0 and isinstance(processed, int):
+            return min(processed / total, 1.0)
+        progress = self.status.get("progress")
+        if isinstance(progress, (int, float)) and not isinstance(progress, bool):
+            return min(max(progress / self.progress_scale, 0.0), 1.0)
+        return None
+
+    def _update(self, status: Dict[str, Any]) -> None:
+        if isinstance(status, dict):
+            self.status = status
+            self.clear()
+            self.update(status)
+
+    def refresh(self) -> Dict[str, Any]:
+        """
+        从服务端获取最新状态
+
+        Returns:
+            最新状态
+        """
+        if self.job_id is not None:
+            self._update(self.client.get_import_status(self.project_id, self.task_id, self.job_id))
+        return self.status
+
+    def _result(self) -> Dict[str, Any]:
+        if not self.succeeded:
+            error_msg = self.status.get("error") or self.status.get("detail") or self.state
+            raise Exception(f"导入任务失败: {error_msg}")
+        return self.status
+
+    def wait(
+        self,
+        timeout: Optional[float] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        backoff: Optional[PollBackoff] = None
+    ) -> Dict[str, Any]:
+        """
+        轮询直到任务结束
+
+        Args:
+            timeout: 最长等待秒数（可选），超时抛出 TimeoutError
+            progress_callback: 每次获取状态后的回调，参数为状态字典
+            backoff: 轮询间隔（可选），默认 1 秒起每次乘 1.5，最大 30 秒
+
+        Returns:
+            任务成功时的最终状态，失败时抛出异常
+        """
+        backoff = backoff or PollBackoff()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.done:
+            delay = backoff.next()
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"等待导入任务超时: {self.job_id}")
+                delay = min(delay, remaining)
+            time.sleep(delay)
+            self.refresh()
+            if progress_callback is not None:
+                progress_callback(self.status)
+        return self._result()
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(job_id={self.job_id!r}, state={self.state!r})"
+
+
+class AsyncImportJob(ImportJob):
+    """
+    AsyncHetuAIDataGenClient.import_samples_async 返回的导入任务句柄，refresh 与 wait 为协程
+    """
+
+    async def refresh(self) -> Dict[str, Any]:
+        if self.job_id is not None:
+            self._update(await self.client.get_import_status(self.project_id, self.task_id, self.job_id))
+        return self.status
+
+    async def wait(
+        self,
+        timeout: Optional[float] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+        backoff: Optional[PollBackoff] = None
+    ) -> Dict[str, Any]:
+        backoff = backoff or PollBackoff()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.done:
+            delay = backoff.next()
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"等待导入任务超时: {self.job_id}")
+                delay = min(delay, remaining)
+            await asyncio.sleep(delay)
+            await self.refresh()
+            if progress_callback is not None:
+                progress_callback(self.status)
+        return self._result()
+
+
+class ImportJobWaiter:
+    """
+    在一个循环中等待大量导入任务
+
+    每个任务有自己的下次轮询时间（带抖动的退避），循环只轮询到期的任务，
+    同时最多 max_concurrency 个状态请求，而不是每个任务各开一个轮询循环。
+    结束的任务不再轮询；失败的任务记录在结果中，不会中断其他任务的等待。
+
+    用法:
+
+        waiter = ImportJobWaiter(jobs)
+        statuses = waiter.wait(timeout=3600, progress_callback=lambda p: print(p))
+        failed = [job for job in waiter.jobs if not job.succeeded]
+
+    返回的最终状态列表与 jobs 顺序一致；没有任务 ID 的任务（已同步完成）也各占一项。
+    """
+
+    def __init__(
+        self,
+        jobs: Iterable[ImportJob] = (),
+        max_concurrency: int = 8,
+        backoff: Optional[PollBackoff] = None
+    ):
+        """
+        初始化等待器
+
+        Args:
+            jobs: 导入任务句柄
+            max_concurrency: 同时进行的状态请求数上限
+            backoff: 轮询间隔模板（可选），每个任务使用独立的副本
+        """
+        self.max_concurrency = max_concurrency
+        self.backoff = backoff or PollBackoff()
+        self.jobs: List[ImportJob] = []
+        self.polls = 0
+        self.errors = 0
+        for job in jobs:
+            self.add(job)
+
+    def add(self, job: ImportJob) -> None:
+        self.jobs.append(job)
+
+    def _schedule(self) -> List[Any]:
+        now = time.monotonic()
+        heap = []
+        for index, job in enumerate(self.jobs):
+            if not job.done:
+                backoff = self.backoff.copy()
+                heap.append((now + backoff.next(), index, backoff))
+        heapq.heapify(heap)
+        return heap
+
+    def _wake_at(self, heap: List[Any], deadline: Optional[float]) -> Optional[float]:
+        """
+        最早到期任务的轮询时间；超过 deadline 时返回 None
+        """
+        wake_at = heap[0][0]
+        if deadline is not None and wake_at > deadline:
+            return None
+        return wake_at
+
+    def _pop_due(self, heap: List[Any]) -> List[Any]:
+        now = time.monotonic()
+        due = []
+        while heap and heap[0][0] <= now and len(due) < self.max_concurrency:
+            due.append(heapq.heappop(heap))
+        return due
+
+    def _after_poll(self, heap: List[Any], due: List[Any], errors: int) -> None:
+        # 获取状态失败（如网络错误）的任务与未结束的任务一样按退避稍后再轮询
+        now = time.monotonic()
+        self.polls += len(due)
+        self.errors += errors
+        for _, index, backoff in due:
+            if not self.jobs[index].done:
+                heapq.heappush(heap, (now + backoff.next(), index, backoff))
+
+    def wait(
+        self,
+        timeout: Optional[float] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        等待所有任务结束
+
+        Args:
+            timeout: 最长等待秒数（可选），超时抛出 TimeoutError
+            progress_callback: 每轮轮询后的回调，参数同 get_progress 的返回值
+
+        Returns:
+            最终状态列表，第 i 项对应 self.jobs[i]
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        heap = self._schedule()
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            while heap:
+                wake_at = self._wake_at(heap, deadline)
+                if wake_at is None:
+                    raise TimeoutError(f"等待导入任务超时: {len(heap)} 个任务未结束")
+                time.sleep(max(wake_at - time.monotonic(), 0))
+                due = self._pop_due(heap)
+                futures = [executor.submit(self.jobs[index].refresh) for _, index, _ in due]
+                errors = sum(1 for future in futures if future.exception() is not None)
+                self._after_poll(heap, due, errors)
+                if progress_callback is not None:
+                    progress_callback(self.get_progress())
+        return [job.status for job in self.jobs]
+
+    async def wait_async(
+        self,
+        timeout: Optional[float] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        wait 的 asyncio 版本，任务须为 AsyncImportJob
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        heap = self._schedule()
+        while heap:
+            wake_at = self._wake_at(heap, deadline)
+            if wake_at is None:
+                raise TimeoutError(f"等待导入任务超时: {len(heap)} 个任务未结束")
+            await asyncio.sleep(max(wake_at - time.monotonic(), 0))
+            due = self._pop_due(heap)
+            results = await asyncio.gather(
+                *(self.jobs[index].refresh() for _, index, _ in due), return_exceptions=True
+            )
+            errors = sum(1 for result in results if isinstance(result, Exception))
+            self._after_poll(heap, due, errors)
+            if progress_callback is not None:
+                progress_callback(self.get_progress())
+        return [job.status for job in self.jobs]
+
+    def get_progress(self) -> Dict[str, Any]:
+        """
+        获取整体进度
+
+        Returns:
+            包含 total、done、succeeded、failed、polls、errors（获取状态失败次数）和
+            progress（已知进度的平均值）的字典
+        """
+        done = [job for job in self.jobs if job.done]
+        progresses = [job.progress for job in self.jobs if job.progress is not None]
+        return {
+            "total": len(self.jobs),
+            "done": len(done),
+            "succeeded": sum(1 for job in done if job.succeeded),
+            "failed": sum(1 for job in done if not job.succeeded),
+            "polls": self.polls,
+            "errors": self.errors,
+            "progress": sum(progresses) / len(progresses) if progresses else None
+        }
@@ -0,0 +1,443 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Any
+
+from core.batching import AdaptiveBatchSizer
+from core.minhash import NearDuplicateFilter
+
+# 生成结果中的样本转换为 save_samples_batch 样本时，从请求中带过来的字段
+_REQUEST_FIELDS = (
+    ("topic", "topic_path"),
+    ("model_name", "input_model_name"),
+    ("provider", "input_provider"),
+    ("model_name", "output_model_name"),
+    ("provider", "output_provider"),
+    ("human_guidance", "human_guidance")
+)
+
+
+def generated_to_sample(sample: Any, input_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    把 generate_samples 返回的样本转换为 save_samples_batch 的样本格式
+
+    主题路径、模型与 provider 取自生成请求，样本自身的字段优先。
+
+    Args:
+        sample: 生成的样本（字典或 core.models.Sample）
+        input_data: 对应的 generate_samples 请求（可选）
+
+    Returns:
+        样本字典
+    """
+    data = sample.to_dict() if hasattr(sample, "to_dict") else dict(sample)
+    for source, field in _REQUEST_FIELDS:
+        if input_data and field not in data and input_data.get(source) is not None:
+            data[field] = input_data[source]
+    return data
+
+
+def _sample_bytes(sample: Dict[str, Any]) -> int:
+    # 近似大小：只统计字符串字段的长度，足以约束缓冲区
+    return sum(len(value) for value in sample.values() if isinstance(value, str)) + 64
+
+
+class SampleBuffer:
+    """
+    生成与保存之间的有界缓冲区
+
+    缓冲的样本数（以及可选的近似字节数）达到上限时 put 阻塞，形成背压；
+    单次放入超过上限的样本时分块放入，每块不超过剩余空间。只有单个样本超过
+    max_bytes 时才会在缓冲区为空时单独放入，此时近似字节数会超过上限。
+    """
+
+    def __init__(self, max_samples: int, max_bytes: Optional[int] = None):
+        self.max_samples = max_samples
+        self.max_bytes = max_bytes
+        self._items = deque()
+        self._bytes = 0
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._cond = threading.Condition()
+        self.peak_samples = 0
+        self.peak_bytes = 0
+        self.put_wait_seconds = 0.0
+
+    def _room(self, sizes: List[int], start: int) -> int:
+        """
+        从 sizes[start] 开始当前能放入的样本数
+        """
+        count = min(self.max_samples - len(self._items), len(sizes) - start)
+        if self.max_bytes is not None:
+            total = self._bytes
+            for i in range(max(count, 0)):
+                total += sizes[start + i]
+                if total > self.max_bytes:
+                    count = i
+                    break
+        if count <= 0 and not self._items:
+            return 1
+        return max(count, 0)
+
+    def put(self, samples: List[Dict[str, Any]]) -> None:
+        """
+        放入样本，缓冲区满时阻塞
+
+        Args:
+            samples: 样本列表
+        """
+        sizes = [_sample_bytes(sample) for sample in samples]
+        start = 0
+        with self._cond:
+            while start < len(samples):
+                started = time.perf_counter()
+                while self._error is None and not self._closed and not self._room(sizes, start):
+                    self._cond.wait()
+                self.put_wait_seconds += time.perf_counter() - started
+                if self._error is not None:
+                    raise self._error
+                if self._closed:
+                    raise Exception("流水线已关闭")
+                end = start + self._room(sizes, start)
+                self._items.extend(zip(samples[start:end], sizes[start:end]))
+                self._bytes += sum(sizes[start:end])
+                start = end
+                self.peak_samples = max(self.peak_samples, len(self._items))
+                self.peak_bytes = max(self.peak_bytes, self._bytes)
+                self._cond.notify_all()
+
+    def get_batch(self, max_count: int, max_wait: float) -> List[Dict[str, Any]]:
+        """
+        取出最多 max_count 个样本；不足一批时最多等待 max_wait 秒
+
+        Returns:
+            样本列表，缓冲区关闭且已取空时返回空列表
+        """
+        with self._cond:
+            deadline = None
+            while self._error is None:
+                if len(self._items) >= max_count or (self._closed and self._items):
+                    break
+                if self._closed:
+                    return []
+                if self._items:
+                    if deadline is None:
+                        deadline = time.monotonic() + max_wait
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                else:
+                    self._cond.wait()
+            if self._error is not None:
+                return []
+            batch = []
+            while self._items and len(batch) < max_count:
+                sample, size = self._items.popleft()
+                self._bytes -= size
+                batch.append(sample)
+            self._cond.notify_all()
+            return batch
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    def abort(self, error: BaseException) -> None:
+        with self._cond:
+            if self._error is None:
+                self._error = error
+            self._cond.notify_all()
+
+    def __len__(self) -> int:
+        with self._cond:
+            return len(self._items)
+
+
+class _StageStats:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.calls = 0
+        self.samples = 0
+        self.busy_seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, samples: int, busy: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self.samples += samples
+            self.busy_seconds += busy
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            end = self.finished_at or time.monotonic()
+            elapsed = end - self.started_at if self.started_at is not None else 0.0
+            return {
+                "calls": self.calls,
+                "samples": self.samples,
+                "samples_per_sec": self.samples / elapsed if elapsed > 0 else 0.0,
+                "utilization": self.busy_seconds / (elapsed * self.workers) if elapsed > 0 else 0.0
+            }
+
+
+class GenerateSavePipeline:
+    """
+    生成 → 保存流水线
+
+    生成线程调用 generate_samples，把样本放入有界缓冲区；保存线程从缓冲区按
+    微批（save_batch_size，不足一批时最多等待 flush_interval 秒）调用
+    save_samples_batch。保存跟不上时缓冲区满，生成线程阻塞在 put 上，不再发起
+    新的生成请求，缓冲的样本数不会超过 max_buffered_samples。
+
+    get_stats 返回各阶段的吞吐量与利用率：生成阶段长时间阻塞（buffer.put_wait_seconds
+    大）说明保存是瓶颈，保存阶段利用率低说明生成是瓶颈。
+
+    也可以只使用保存阶段，由外部（例如 GenerationScheduler 的 on_result）调用 put_samples：
+
+        with GenerateSavePipeline(client, project_id, task_id) as pipeline:
+            scheduler = GenerationScheduler(..., on_result=lambda job, target, result:
+                                            pipeline.put_samples(result["samples"], {"topic": job.topic}))
+            scheduler.run(jobs)
+        print(pipeline.get_stats())
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        project_id: str,
+        task_id: str,
+        save_batch_size: int = 50,
+        save_workers: int = 2,
+        generate_workers: int = 4,
+        max_buffered_samples: int = 1000,
+        max_buffered_bytes: Optional[int] = None,
+        flush_interval: float = 1.0,
+        sample_defaults: Optional[Dict[str, Any]] = None,
+        sample_mapper: Callable[[Any, Optional[Dict[str, Any]]], Dict[str, Any]] = generated_to_sample,
+        on_saved: Optional[Callable[[List[Dict[str, Any]], Any], None]] = None,
+        batch_sizer: Optional[AdaptiveBatchSizer] = None,
+        on_rejected: Optional[Callable[[List[Dict[str, Any]]], None]] = None,
+        near_duplicate_filter: Optional[NearDuplicateFilter] = None,
+        on_near_duplicates: Optional[Callable[[List[Dict[str, Any]]], None]] = None
+    ):
+        """
+        初始化流水线
+
+        Args:
+            client: HetuAIDataGenClient 实例
+            project_id: 项目ID
+            task_id: 任务ID
+            save_batch_size: 每次 save_samples_batch 的样本数
+            save_workers: 保存线程数
+            generate_workers: 生成线程数（run 使用）
+            max_buffered_samples: 缓冲区最多保存的样本数
+            max_buffered_bytes: 缓冲区样本的近似字节数上限（可选）
+            flush_interval: 不足一批时最多等待的秒数
+            sample_defaults: 每个样本的默认字段（可选），例如 prompt_method
+            sample_mapper: 生成样本到保存样本的转换函数
+            on_saved: 每批保存成功后的回调，参数为样本列表和 save_samples_batch 的返回值
+                （使用 batch_sizer 时为 save_samples_adaptive 的返回值）
+            batch_sizer: 批大小控制器（可选），传入时批大小按请求耗时自动调整，忽略
+                save_batch_size，并通过 save_samples_adaptive 保存（413/超时自动拆分重试）
+            on_rejected: 使用 batch_sizer 时样本被拒绝的回调（可选），参数为 save_samples_adaptive
+                返回值中的 rejected 列表（样本与错误）；流水线本身只统计数量，不保留样本
+            near_duplicate_filter: 近似重复过滤器（可选），传入时与之前样本近似重复的样本
+                不进入缓冲区，只统计数量
+            on_near_duplicates: 被近似重复过滤器丢弃的样本的回调（可选），参数为样本列表
+        """
+        self.client = client
+        self.project_id = project_id
+        self.task_id = task_id
+        self.save_batch_size = save_batch_size
+        self.save_workers = save_workers
+        self.generate_workers = generate_workers
+        self.flush_interval = flush_interval
+        self.sample_defaults = sample_defaults or {}
+        self.sample_mapper = sample_mapper
+        self.on_saved = on_saved
+        self.batch_sizer = batch_sizer
+        self.near_duplicate_filter = near_duplicate_filter
+        self.on_rejected = on_rejected
+        self.on_near_duplicates = on_near_duplicates
+        self.buffer = SampleBuffer(max_buffered_samples, max_buffered_bytes)
+        self._generate_stats = _StageStats(generate_workers)
+        self._save_stats = _StageStats(save_workers)
+        self._save_threads: List[threading.Thread] = []
+        self._error: Optional[BaseException] = None
+        self._rejected = 0
+        self._near_duplicates = 0
+        self._lock = threading.Lock()
+
+    def start(self) -> "GenerateSavePipeline":
+        """
+        启动保存线程
+        """
+        self._save_stats.started_at = time.monotonic()
+        for i in range(self.save_workers):
+            thread = threading.Thread(target=self._save_loop, name=f"pipeline-save-{i}", daemon=True)
+            thread.start()
+            self._save_threads.append(thread)
+        return self
+
+    def _save_loop(self) -> None:
+        while True:
+            size = self.batch_sizer.next_size() if self.batch_sizer is not None else self.save_batch_size
+            batch = self.buffer.get_batch(size, self.flush_interval)
+            if not batch:
+                return
+            started = time.perf_counter()
+            try:
+                if self.batch_sizer is not None:
+                    result = self.client.save_samples_adaptive(
+                        self.project_id, self.task_id, batch, sizer=self.batch_sizer
+                    )
+                    with self._lock:
+                        self._rejected += len(result["rejected"])
+                else:
+                    result = self.client.save_samples_batch(self.project_id, self.task_id, {"samples": batch})
+                saved = result["samples"] if self.batch_sizer is not None else len(batch)
+                self._save_stats.record(saved, time.perf_counter() - started)
+                # 回调出错与保存出错一样终止流水线，否则保存线程退出后生成线程会永远阻塞在 put 上
+                if self.on_saved is not None:
+                    self.on_saved(batch, result)
+                if self.on_rejected is not None and self.batch_sizer is not None and result["rejected"]:
+                    self.on_rejected(result["rejected"])
+            except Exception as e:
+                with self._lock:
+                    if self._error is None:
+                        self._error = e
+                self.buffer.abort(e)
+                return
+
+    def put_samples(self, samples: Iterable[Any], input_data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        把生成的样本放入缓冲区，缓冲区满时阻塞
+
+        Args:
+            samples: 生成的样本
+            input_data: 对应的 generate_samples 请求（可选），用于补全 topic_path、模型等字段
+        """
+        mapped = [dict(self.sample_defaults, **self.sample_mapper(sample, input_data)) for sample in samples]
+        if mapped and self.near_duplicate_filter is not None:
+            mapped, duplicates = self.near_duplicate_filter.split(mapped)
+            if duplicates:
+                with self._lock:
+                    self._near_duplicates += len(duplicates)
+                if self.on_near_duplicates is not None:
+                    self.on_near_duplicates(duplicates)
+        if mapped:
+            try:
+                self.buffer.put(mapped)
+            except Exception as e:
+                if e is self._error:
+                    raise Exception(f"流水线保存样本失败: {str(e)}") from e
+                raise
+
+    def close(self) -> Dict[str, Any]:
+        """
+        等待缓冲区中的样本全部保存，停止保存线程
+
+        Returns:
+            统计信息，格式同 get_stats
+        """
+        self.buffer.close()
+        for thread in self._save_threads:
+            thread.join()
+        self._save_stats.finished_at = time.monotonic()
+        if self._error is not None:
+            raise Exception(f"流水线保存样本失败: {str(self._error)}") from self._error
+        return self.get_stats()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is not None:
+            self.buffer.abort(exc_val)
+            for thread in self._save_threads:
+                thread.join()
+            return
+        self.close()
+
+    def _generate(self, input_data: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        result = self.client.generate_samples(self.project_id, self.task_id, input_data)
+        busy = time.perf_counter() - started
+        if isinstance(result, dict):
+            samples = result.get("samples") or []
+        else:
+            samples = result or []
+        self._generate_stats.record(len(samples), busy)
+        self.put_samples(samples, input_data)
+
+    def run(self, requests: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        对每个请求调用 generate_samples，并把结果流式保存
+
+        请求按需从迭代器中读取（可以是生成器），同时最多 generate_workers 个生成请求。
+        任一阶段出错时停止并抛出异常。
+
+        Args:
+            requests: generate_samples 的 input_data 迭代器
+
+        Returns:
+            统计信息，格式同 get_stats
+        """
+        self.start()
+        self._generate_stats.started_at = time.monotonic()
+        pending = iter(requests)
+        futures = set()
+        error = None
+        with ThreadPoolExecutor(max_workers=self.generate_workers) as executor:
+            while True:
+                while error is None and len(futures) < self.generate_workers:
+                    input_data = next(pending, None)
+                    if input_data is None:
+                        break
+                    futures.add(executor.submit(self._generate, input_data))
+                if not futures:
+                    break
+                done, futures = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is not None and error is None:
+                        error = future.exception()
+                        self.buffer.abort(error)
+        self._generate_stats.finished_at = time.monotonic()
+        if error is not None:
+            for thread in self._save_threads:
+                thread.join()
+            if error is self._error:
+                raise Exception(f"流水线保存样本失败: {str(error)}") from error
+            if error.__cause__ is not None and error.__cause__ is self._error:
+                # put_samples 已包装为保存失败
+                raise error
+            raise Exception(f"流水线生成样本失败: {str(error)}") from error
+        return self.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取各阶段统计
+
+        Returns:
+            包含 generate、save（calls、samples、samples_per_sec、utilization）与
+            buffer（size、peak_samples、peak_bytes、put_wait_seconds）、rejected
+            （使用 batch_sizer 时被拒绝的样本数，样本与错误通过 on_rejected 回调获取）以及
+            near_duplicates（被近似重复过滤器丢弃的样本数）的字典
+        """
+        return {
+            "generate": self._generate_stats.to_dict(),
+            "save": self._save_stats.to_dict(),
+            "buffer": {
+                "size": len(self.buffer),
+                "max_samples": self.buffer.max_samples,
+                "peak_samples": self.buffer.peak_samples,
+                "peak_bytes": self.buffer.peak_bytes,
+                "put_wait_seconds": self.buffer.put_wait_seconds
+            },
+            "rejected": self._rejected,
+            "near_duplicates": self._near_duplicates
+        }
@@ -0,0 +1,346 @@
+import asyncio
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Any, Sequence, Tuple
+
+Target = Tuple[str, str]  # (provider, model_name)
+
+
+class GenerationJob:
+    """
+    一个主题的生成任务：为 topic 生成 num_samples 个样本
+
+    weight 为加权公平排队的权重，权重越大的主题分到的请求越多。
+    """
+
+    __slots__ = ("topic", "num_samples", "weight", "input_data", "generated", "pending", "failures", "failed",
+                 "finish_tag", "results")
+
+    def __init__(
+        self,
+        topic: Sequence[str],
+        num_samples: int,
+        weight: float = 1.0,
+        input_data: Optional[Dict[str, Any]] = None
+    ):
+        """
+        初始化生成任务
+
+        Args:
+            topic: 主题路径
+            num_samples: 目标样本数
+            weight: 权重
+            input_data: 该主题额外的 generate_samples 参数（可选），例如 human_guidance
+        """
+        self.topic = list(topic)
+        self.num_samples = num_samples
+        self.weight = weight
+        self.input_data = input_data or {}
+        self.generated = 0
+        self.pending = 0
+        self.failures = 0
+        self.failed = False
+        self.finish_tag = 0.0
+        self.results: List[Any] = []
+
+    @property
+    def remaining(self) -> int:
+        """
+        尚未分配给请求的样本数
+        """
+        return max(self.num_samples - self.generated - self.pending, 0)
+
+    @property
+    def done(self) -> bool:
+        return self.failed or self.generated >= self.num_samples
+
+
+class _ProviderState:
+    __slots__ = ("limit", "in_flight", "succeeded", "failed", "consecutive_failures", "healthy")
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_flight = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.consecutive_failures = 0
+        self.healthy = True
+
+
+def count_samples(result: Any, requested: int) -> int:
+    """
+    generate_samples 返回的样本数；返回值中没有 samples 列表时按请求数计
+    """
+    if isinstance(result, dict) and isinstance(result.get("samples"), list):
+        return len(result["samples"])
+    if isinstance(result, list):
+        return len(result)
+    return requested
+
+
+def jobs_from_tree(tree: Any, num_samples: int, weight: float = 1.0) -> List[GenerationJob]:
+    """
+    为主题树（dataset.topic_tree.TopicTree）的每个叶子节点创建生成任务
+
+    Args:
+        tree: 主题树
+        num_samples: 每个叶子的目标样本数
+        weight: 每个任务的权重
+
+    Returns:
+        生成任务列表
+    """
+    return [GenerationJob(leaf.path, num_samples, weight) for leaf in tree.leaves()]
+
+
+class GenerationScheduler:
+    """
+    把多个主题的 generate_samples 请求分发到多个 (provider, model_name) 上
+
+    - 每个 provider 有独立的并发上限（provider_limits，未列出的使用 default_limit）
+    - 主题之间按权重公平排队（start-time fair queueing）：每个请求带起始标签
+      max(虚拟时间, 该主题上一个请求的结束标签)，结束标签为起始标签 + 样本数 / 权重，
+      每次派发起始标签最小且有空闲 provider 的主题
+    - 主题的配额不绑定 provider：请求失败后样本数退回主题，由其他 provider 补上；
+      provider 连续失败 max_consecutive_failures 次后被标记为不可用，剩余配额全部
+      转给其他 provider
+    - 一个主题累计失败 max_failures_per_topic 次，或没有可用 provider 时标记为失败
+
+    用法:
+
+        scheduler = GenerationScheduler(
+            client,
+            project_id,
+            task_id,
+            targets=[("together_ai", "Qwen/Qwen2.5-72B-Instruct-Turbo"), ("openai", "gpt-4o-mini")],
+            provider_limits={"together_ai": 8, "openai": 4}
+        )
+        progress = scheduler.run(jobs_from_tree(tree, num_samples=20))
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        project_id: str,
+        task_id: str,
+        targets: Sequence[Target],
+        provider_limits: Optional[Dict[str, int]] = None,
+        default_limit: int = 4,
+        samples_per_request: int = 5,
+        input_defaults: Optional[Dict[str, Any]] = None,
+        max_consecutive_failures: int = 5,
+        max_failures_per_topic: int = 10,
+        on_result: Optional[Callable[[GenerationJob, Target, Any], None]] = None,
+        progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
+        """
+        初始化调度器
+
+        Args:
+            client: HetuAIDataGenClient（run）或 AsyncHetuAIDataGenClient（run_async）实例
+            project_id: 项目ID
+            task_id: 任务ID
+            targets: (provider, model_name) 列表
+            provider_limits: provider 到并发上限的映射（可选）
+            default_limit: 未在 provider_limits 中列出的 provider 的并发上限
+            samples_per_request: 每个 generate_samples 请求的样本数上限
+            input_defaults: generate_samples 的公共参数（可选），例如 human_guidance
+            max_consecutive_failures: provider 连续失败多少次后停用
+            max_failures_per_topic: 主题累计失败多少次后放弃
+            on_result: 每个成功请求的回调，参数为任务、(provider, model_name) 和返回值；
+                不传时返回值保存在 job.results 中
+            progress_callback: 每个请求结束后的进度回调，参数同 get_progress 的返回值
+        """
+        if not targets:
+            raise ValueError("targets 不能为空")
+        self.client = client
+        self.project_id = project_id
+        self.task_id = task_id
+        self.targets = [tuple(target) for target in targets]
+        self.samples_per_request = samples_per_request
+        self.input_defaults = input_defaults or {}
+        self.max_consecutive_failures = max_consecutive_failures
+        self.max_failures_per_topic = max_failures_per_topic
+        self.on_result = on_result
+        self.progress_callback = progress_callback
+        limits = provider_limits or {}
+        self.providers = {
+            provider: _ProviderState(limits.get(provider, default_limit))
+            for provider, _ in self.targets
+        }
+        # 每个 (provider, model_name) 的在途请求数与累计派发数，同一 provider 的多个模型轮流分到请求
+        self._target_in_flight: Dict[Target, int] = {target: 0 for target in self.targets}
+        self._target_dispatched: Dict[Target, int] = {target: 0 for target in self.targets}
+        self.jobs: List[GenerationJob] = []
+        self._virtual_time = 0.0
+        self._lock = threading.Lock()
+
+    def _pick_target(self) -> Optional[Target]:
+        """
+        选出负载最低的 provider；同一 provider 的多个模型按在途请求数、累计派发数轮流
+        """
+        best = None
+        best_key = None
+        for target in self.targets:
+            state = self.providers[target[0]]
+            if not state.healthy or state.in_flight >= state.limit:
+                continue
+            key = (state.in_flight / state.limit, self._target_in_flight[target], self._target_dispatched[target])
+            if best is None or key < best_key:
+                best, best_key = target, key
+        return best
+
+    def _next_request(self) -> Optional[Tuple[GenerationJob, Target, int]]:
+        """
+        选出下一个要派发的请求（调用方持有锁）
+        """
+        target = self._pick_target()
+        if target is None:
+            return None
+        chosen = None
+        chosen_start = None
+        for job in self.jobs:
+            if job.done or job.remaining <= 0:
+                continue
+            start = max(self._virtual_time, job.finish_tag)
+            if chosen is None or start < chosen_start:
+                chosen, chosen_start = job, start
+        if chosen is None:
+            return None
+
+        n = min(self.samples_per_request, chosen.remaining)
+        chosen.finish_tag = chosen_start + n / chosen.weight
+        self._virtual_time = chosen_start
+        chosen.pending += n
+        self.providers[target[0]].in_flight += 1
+        self._target_in_flight[target] += 1
+        self._target_dispatched[target] += 1
+        return chosen, target, n
+
+    def _request_input(self, job: GenerationJob, target: Target, n: int) -> Dict[str, Any]:
+        input_data = dict(self.input_defaults)
+        input_data.update(job.input_data)
+        input_data["topic"] = job.topic
+        input_data["num_samples"] = n
+        input_data["provider"], input_data["model_name"] = target
+        return input_data
+
+    def _complete(self, job: GenerationJob, target: Target, n: int, result: Any, error: Optional[Exception]) -> None:
+        with self._lock:
+            state = self.providers[target[0]]
+            state.in_flight -= 1
+            self._target_in_flight[target] -= 1
+            job.pending -= n
+            generated = 0 if error is not None else count_samples(result, n)
+            if generated > 0:
+                job.generated += generated
+                state.succeeded += 1
+                state.consecutive_failures = 0
+            else:
+                # 出错或没有生成任何样本：配额退回主题，由其他请求补上
+                job.failures += 1
+                state.failed += 1
+                state.consecutive_failures += 1
+                if state.consecutive_failures >= self.max_consecutive_failures:
+                    state.healthy = False
+                if job.failures >= self.max_failures_per_topic:
+                    job.failed = True
+            if not any(self.providers[p].healthy for p, _ in self.targets):
+                for pending_job in self.jobs:
+                    if not pending_job.done and pending_job.pending == 0:
+                        pending_job.failed = True
+
+        if error is None and generated > 0:
+            if self.on_result is not None:
+                self.on_result(job, target, result)
+            else:
+                job.results.append(result)
+        if self.progress_callback is not None:
+            self.progress_callback(self.get_progress())
+
+    def run(self, jobs: List[GenerationJob]) -> Dict[str, Any]:
+        """
+        使用线程池执行所有任务，直到全部完成或失败
+
+        Args:
+            jobs: 生成任务列表
+
+        Returns:
+            最终进度，格式同 get_progress
+        """
+        self.jobs = list(jobs)
+        max_workers = sum(state.limit for state in self.providers.values())
+        futures = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while True:
+                with self._lock:
+                    while True:
+                        request = self._next_request()
+                        if request is None:
+                            break
+                        job, target, n = request
+                        input_data = self._request_input(job, target, n)
+                        future = executor.submit(self.client.generate_samples, self.project_id, self.task_id, input_data)
+                        futures[future] = request
+                if not futures:
+                    break
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job, target, n = futures.pop(future)
+                    error = future.exception()
+                    self._complete(job, target, n, None if error else future.result(), error)
+        return self.get_progress()
+
+    async def run_async(self, jobs: List[GenerationJob]) -> Dict[str, Any]:
+        """
+        run 的 asyncio 版本，client 须为 AsyncHetuAIDataGenClient 实例
+        """
+        self.jobs = list(jobs)
+        tasks = {}
+        while True:
+            with self._lock:
+                while True:
+                    request = self._next_request()
+                    if request is None:
+                        break
+                    job, target, n = request
+                    input_data = self._request_input(job, target, n)
+                    coro = self.client.generate_samples(self.project_id, self.task_id, input_data)
+                    tasks[asyncio.ensure_future(coro)] = request
+            if not tasks:
+                break
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                job, target, n = tasks.pop(task)
+                error = task.exception()
+                self._complete(job, target, n, None if error else task.result(), error)
+        return self.get_progress()
+
+    def get_progress(self) -> Dict[str, Any]:
+        """
+        获取进度
+
+        Returns:
+            包含 samples_generated、samples_target、topics_done、topics_total、
+            failed_topics、各 provider 的 limit、in_flight、succeeded、failed、healthy
+            以及各 "provider/model_name" 的累计请求数（targets）的字典
+        """
+        with self._lock:
+            return {
+                "samples_generated": sum(min(job.generated, job.num_samples) for job in self.jobs),
+                "samples_target": sum(job.num_samples for job in self.jobs),
+                "topics_done": sum(1 for job in self.jobs if job.done and not job.failed),
+                "topics_total": len(self.jobs),
+                "failed_topics": [job.topic for job in self.jobs if job.failed],
+                "providers": {
+                    provider: {
+                        "limit": state.limit,
+                        "in_flight": state.in_flight,
+                        "succeeded": state.succeeded,
+                        "failed": state.failed,
+                        "healthy": state.healthy
+                    }
+                    for provider, state in self.providers.items()
+                },
+                "targets": {f"{provider}/{model}": count for (provider, model), count in self._target_dispatched.items()}
+            }
@@ -0,0 +1,324 @@
+import asyncio
+import json
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Iterator, List, Optional, Any, Sequence, Tuple
+
+
+def extract_subtopics(result: Any) -> List[str]:
+    """
+    从 generate_categories 的返回值中取出子主题名称
+
+    支持 {"categories": [...]} / {"subtopics": [...]} 或直接返回列表；列表元素可以是
+    字符串，也可以是带 name / topic / category 字段的对象。
+
+    Args:
+        result: generate_categories 的返回值
+
+    Returns:
+        子主题名称列表（去重，保持顺序）
+    """
+    if isinstance(result, dict):
+        items = result.get("categories") or result.get("subtopics") or []
+    elif isinstance(result, list):
+        items = result
+    else:
+        items = []
+
+    names = []
+    for item in items:
+        if isinstance(item, dict):
+            item = item.get("name") or item.get("topic") or item.get("category")
+        if isinstance(item, str) and item.strip() and item.strip() not in names:
+            names.append(item.strip())
+    return names
+
+
+class TopicNode:
+    """
+    主题树节点
+    """
+
+    __slots__ = ("name", "path", "children", "expanded")
+
+    def __init__(self, name: str, path: Tuple[str, ...]):
+        self.name = name
+        self.path = path
+        self.children: Dict[str, "TopicNode"] = {}
+        self.expanded = False
+
+    @property
+    def depth(self) -> int:
+        return len(self.path)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "expanded": self.expanded,
+            "children": [child.to_dict() for child in self.children.values()]
+        }
+
+
+class TopicTree:
+    """
+    以 node_path 为键的主题树（trie），在 generate_categories 之上按层展开
+
+    根节点的路径为空，请求时使用 root_node_path（默认 ["root"]）；其他节点的
+    node_path 为从第一层开始的主题名称列表。展开按广度优先进行，已展开的节点
+    会被跳过，配合 save / load 可以在中断后继续展开而不是从头开始。
+
+    用法:
+
+        tree = TopicTree.load("topics.json") if os.path.exists("topics.json") else TopicTree()
+        tree.expand(client, project_id, task_id, depth=5,
+                    input_defaults={"num_subtopics": 5, "model_name": "...", "provider": "..."},
+                    checkpoint_path="topics.json")
+    """
+
+    def __init__(self, root_node_path: Sequence[str] = ("root",)):
+        """
+        初始化主题树
+
+        Args:
+            root_node_path: 展开根节点时使用的 node_path
+        """
+        self.root_node_path = list(root_node_path)
+        self.root = TopicNode("root", ())
+
+    def node_path(self, node: TopicNode) -> List[str]:
+        """
+        节点对应的 generate_categories node_path
+        """
+        return list(node.path) if node.path else list(self.root_node_path)
+
+    def get(self, path: Sequence[str]) -> Optional[TopicNode]:
+        """
+        按路径查找节点
+
+        Args:
+            path: 主题名称路径，空路径为根节点
+
+        Returns:
+            节点，不存在时返回 None
+        """
+        node = self.root
+        for name in path:
+            node = node.children.get(name)
+            if node is None:
+                return None
+        return node
+
+    def add(self, path: Sequence[str]) -> TopicNode:
+        """
+        添加路径上的所有节点（已存在的节点保持不变）
+
+        Args:
+            path: 主题名称路径
+
+        Returns:
+            路径末端的节点
+        """
+        node = self.root
+        for name in path:
+            child = node.children.get(name)
+            if child is None:
+                child = node.children[name] = TopicNode(name, node.path + (name,))
+            node = child
+        return node
+
+    def set_children(self, node: TopicNode, names: List[str]) -> None:
+        """
+        记录节点的展开结果并把节点标记为已展开
+        """
+        for name in names:
+            if name not in node.children:
+                node.children[name] = TopicNode(name, node.path + (name,))
+        node.expanded = True
+
+    def iter_nodes(self, max_depth: Optional[int] = None) -> Iterator[TopicNode]:
+        """
+        广度优先遍历节点（包括根节点）
+
+        Args:
+            max_depth: 最大深度（可选），根节点深度为 0
+
+        Returns:
+            节点迭代器
+        """
+        queue = deque([self.root])
+        while queue:
+            node = queue.popleft()
+            yield node
+            if max_depth is None or node.depth < max_depth:
+                queue.extend(node.children.values())
+
+    def leaves(self) -> List[TopicNode]:
+        return [node for node in self.iter_nodes() if not node.children and node is not self.root]
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self.iter_nodes()) - 1
+
+    def __contains__(self, path: Sequence[str]) -> bool:
+        return self.get(path) is not None
+
+    def pending(self, depth: int) -> List[TopicNode]:
+        """
+        深度小于 depth 且尚未展开的节点（广度优先顺序）
+        """
+        return [node for node in self.iter_nodes(depth - 1) if not node.expanded]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"root_node_path": self.root_node_path, "root": self.root.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TopicTree":
+        tree = cls(data.get("root_node_path", ["root"]))
+        stack = [(tree.root, data.get("root", {}))]
+        while stack:
+            node, item = stack.pop()
+            node.expanded = bool(item.get("expanded"))
+            for child_item in item.get("children", []):
+                name = child_item["name"]
+                child = node.children[name] = TopicNode(name, node.path + (name,))
+                stack.append((child, child_item))
+        return tree
+
+    def save(self, path: str) -> None:
+        """
+        保存到 JSON 文件（先写临时文件再原子替换）
+        """
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TopicTree":
+        """
+        从 save 保存的 JSON 文件加载
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_dict(json.load(f))
+
+    def _request(self, node: TopicNode, input_defaults: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        input_data = dict(input_defaults or {})
+        input_data["node_path"] = self.node_path(node)
+        return input_data
+
+    def expand(
+        self,
+        client: Any,
+        project_id: str,
+        task_id: str,
+        depth: int,
+        input_defaults: Optional[Dict[str, Any]] = None,
+        max_workers: int = 4,
+        checkpoint_path: Optional[str] = None,
+        save_every: int = 20,
+        extract: Callable[[Any], List[str]] = extract_subtopics
+    ) -> Dict[str, Any]:
+        """
+        广度优先把主题树展开到指定深度
+
+        同时最多 max_workers 个 generate_categories 请求；节点展开后其子节点进入队尾，
+        所以仍是按层推进。某个节点失败时记录下来继续展开其他节点，该节点保持未展开，
+        下次调用 expand 时会重试。
+
+        Args:
+            client: HetuAIDataGenClient 实例
+            project_id: 项目ID
+            task_id: 任务ID
+            depth: 目标深度，例如 5 表示展开到第 5 层主题
+            input_defaults: generate_categories 的其他参数，如 num_subtopics、model_name、provider
+            max_workers: 最大并发请求数
+            checkpoint_path: 检查点路径（可选），每展开 save_every 个节点以及结束时保存
+            save_every: 保存检查点的间隔（展开的节点数）
+            extract: 从返回值中取出子主题名称的函数
+
+        Returns:
+            包含 expanded（本次展开的节点数）、failed（失败节点路径与错误）和 nodes（节点总数）的字典
+        """
+        queue = deque(self.pending(depth))
+        scheduled = set(queue)
+        expanded = 0
+        failed = []
+        futures = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while queue or futures:
+                while queue and len(futures) < max_workers:
+                    node = queue.popleft()
+                    input_data = self._request(node, input_defaults)
+                    futures[executor.submit(client.generate_categories, project_id, task_id, input_data)] = node
+
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node = futures.pop(future)
+                    try:
+                        names = extract(future.result())
+                    except Exception as e:
+                        failed.append({"path": list(node.path), "error": str(e)})
+                        continue
+                    self.set_children(node, names)
+                    expanded += 1
+                    if node.depth + 1 < depth:
+                        for child in node.children.values():
+                            if not child.expanded and child not in scheduled:
+                                scheduled.add(child)
+                                queue.append(child)
+                    if checkpoint_path and expanded % save_every == 0:
+                        self.save(checkpoint_path)
+
+        if checkpoint_path:
+            self.save(checkpoint_path)
+        return {"expanded": expanded, "failed": failed, "nodes": len(self)}
+
+    async def expand_async(
+        self,
+        client: Any,
+        project_id: str,
+        task_id: str,
+        depth: int,
+        input_defaults: Optional[Dict[str, Any]] = None,
+        max_workers: int = 4,
+        checkpoint_path: Optional[str] = None,
+        save_every: int = 20,
+        extract: Callable[[Any], List[str]] = extract_subtopics
+    ) -> Dict[str, Any]:
+        """
+        expand 的 asyncio 版本，client 为 AsyncHetuAIDataGenClient 实例，参数与返回值同 expand
+        """
+        queue = deque(self.pending(depth))
+        scheduled = set(queue)
+        expanded = 0
+        failed = []
+        tasks = {}
+
+        while queue or tasks:
+            while queue and len(tasks) < max_workers:
+                node = queue.popleft()
+                input_data = self._request(node, input_defaults)
+                tasks[asyncio.ensure_future(client.generate_categories(project_id, task_id, input_data))] = node
+
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                node = tasks.pop(task)
+                try:
+                    names = extract(task.result())
+                except Exception as e:
+                    failed.append({"path": list(node.path), "error": str(e)})
+                    continue
+                self.set_children(node, names)
+                expanded += 1
+                if node.depth + 1 < depth:
+                    for child in node.children.values():
+                        if not child.expanded and child not in scheduled:
+                            scheduled.add(child)
+                            queue.append(child)
+                if checkpoint_path and expanded % save_every == 0:
+                    self.save(checkpoint_path)
+
+        if checkpoint_path:
+            self.save(checkpoint_path)
+        return {"expanded": expanded, "failed": failed, "nodes": len(self)}
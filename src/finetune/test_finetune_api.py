@@ -1,26 +1,44 @@
-import requests
-from typing import Dict, List, Optional, Any
+import uuid
+from typing import Callable, Dict, Iterator, List, Optional, Any
+
+from core.download import DEFAULT_CHUNK_SIZE, download_to_file, iter_download, iter_lines
+from core.json_stream import iter_response_items
+from core.models import DatasetSplit, Finetune, Hyperparameter, Provider, decode_as
+from core.transport import HetuAITransport
 
 class HetuAIFinetuneClient:
     """
     HetuAI 微调客户端，用于与 hetu_ai_gw 的微调 API 进行交互
     """
     
-    def __init__(self, base_url: str = "http://localhost:8000", api_key: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        api_key: Optional[str] = None,
+        transport: Optional[HetuAITransport] = None,
+        typed: bool = False
+    ):
         """
         初始化 HetuAI 微调客户端
         
         Args:
             base_url: API 服务的基础 URL
             api_key: API 认证密钥（如果需要）
+            transport: 共享的 HTTP 传输层（可选），不传时创建独立的连接池
+            typed: 是否返回 core.models 中的类型化结果对象（使用 __slots__，内存占用更小），默认返回字典
         """
         self.base_url = base_url
+        self.typed = typed
+        self.transport = transport or HetuAITransport()
         self.headers = {
             "Content-Type": "application/json"
         }
         if api_key:
             self.headers["Authorization"] = f"Bearer {api_key}"
     
+    def _typed(self, data: Any, model: type) -> Any:
+        return decode_as(data, model) if self.typed else data
+    
     def get_dataset_splits(self, project_id: str, task_id: str) -> List[Dict[str, Any]]:
         """
         获取数据集分割列表
@@ -34,13 +52,36 @@ class HetuAIFinetuneClient:
         """
         url = f"{self.base_url}/api/finetune/projects/{project_id}/tasks/{task_id}/dataset_splits"
         
-        response = requests.get(url, headers=self.headers)
+        response = self.transport.get(url, headers=self.headers, endpoint="get_dataset_splits")
         
         if response.status_code == 200:
-            return response.json()
+            return self._typed(self.transport.decode(response), DatasetSplit)
         else:
-            error_msg = response.json().get("detail", "Unknown error")
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"获取数据集分割失败: {error_msg}")
+    
+    def iter_dataset_splits(self, project_id: str, task_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        逐个返回数据集分割，边接收边解析响应体
+        
+        与 get_dataset_splits 相同，但不等整个响应体下载并解析完成；内存中只保留当前分割。
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            
+        Returns:
+            数据集分割迭代器
+        """
+        url = f"{self.base_url}/api/finetune/projects/{project_id}/tasks/{task_id}/dataset_splits"
+        
+        response = self.transport.get(url, headers=self.headers, stream=True)
+        
+        if response.status_code != 200:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
             raise Exception(f"获取数据集分割失败: {error_msg}")
+        for item in iter_response_items(self.transport, response):
+            yield self._typed(item, DatasetSplit)
     
     def get_finetunes(self, project_id: str, task_id: str, update_status: bool = False) -> List[Dict[str, Any]]:
         """
@@ -57,14 +98,39 @@ class HetuAIFinetuneClient:
         url = f"{self.base_url}/api/finetune/projects/{project_id}/tasks/{task_id}/finetunes"
         params = {"update_status": str(update_status).lower()}
         
-        response = requests.get(url, headers=self.headers, params=params)
+        response = self.transport.get(url, headers=self.headers, params=params)
         
         if response.status_code == 200:
-            return response.json()
+            return self._typed(self.transport.decode(response), Finetune)
         else:
-            error_msg = response.json().get("detail", "Unknown error")
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
             raise Exception(f"获取微调列表失败: {error_msg}")
     
+    def iter_finetunes(self, project_id: str, task_id: str, update_status: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        逐个返回微调，边接收边解析响应体
+        
+        与 get_finetunes 相同，但不等整个响应体下载并解析完成；内存中只保留当前微调。
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            update_status: 是否更新状态
+            
+        Returns:
+            微调迭代器
+        """
+        url = f"{self.base_url}/api/finetune/projects/{project_id}/tasks/{task_id}/finetunes"
+        params = {"update_status": str(update_status).lower()}
+        
+        response = self.transport.get(url, headers=self.headers, params=params, stream=True)
+        
+        if response.status_code != 200:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"获取微调列表失败: {error_msg}")
+        for item in iter_response_items(self.transport, response):
+            yield self._typed(item, Finetune)
+    
     def get_finetune(self, project_id: str, task_id: str, finetune_id: str) -> Dict[str, Any]:
         """
         获取特定微调
@@ -79,12 +145,12 @@ class HetuAIFinetuneClient:
         """
         url = f"{self.base_url}/api/finetune/projects/{project_id}/tasks/{task_id}/finetunes/{finetune_id}"
         
-        response = requests.get(url, headers=self.headers)
+        response = self.transport.get(url, headers=self.headers)
         
         if response.status_code == 200:
-            return response.json()
+            return self._typed(self.transport.decode(response), Finetune)
         else:
-            error_msg = response.json().get("detail", "Unknown error")
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
             raise Exception(f"获取微调失败: {error_msg}")
     
     def update_finetune(self, project_id: str, task_id: str, finetune_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
@@ -102,12 +168,12 @@ class HetuAIFinetuneClient:
         """
         url = f"{self.base_url}/api/projects/{project_id}/tasks/{task_id}/finetunes/{finetune_id}"
         
-        response = requests.patch(url, headers=self.headers, json=updates)
+        response = self.transport.patch(url, headers=self.headers, json=updates)
         
         if response.status_code == 200:
-            return response.json()
+            return self._typed(self.transport.decode(response), Finetune)
         else:
-            error_msg = response.json().get("detail", "Unknown error")
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
             raise Exception(f"更新微调失败: {error_msg}")
     
     def get_finetune_providers(self) -> List[Dict[str, Any]]:
@@ -119,12 +185,12 @@ class HetuAIFinetuneClient:
         """
         url = f"{self.base_url}/api/finetune/finetune_providers"
         
-        response = requests.get(url, headers=self.headers)
+        response = self.transport.get(url, headers=self.headers, endpoint="get_finetune_providers")
         
         if response.status_code == 200:
-            return response.json()
+            return self._typed(self.transport.decode(response), Provider)
         else:
-            error_msg = response.json().get("detail", "Unknown error")
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
             raise Exception(f"获取微调提供商失败: {error_msg}")
     
     def get_finetune_hyperparameters(self, provider_id: str) -> List[Dict[str, Any]]:
@@ -139,15 +205,15 @@ class HetuAIFinetuneClient:
         """
         url = f"{self.base_url}/api/finetune/hyperparameters/{provider_id}"
         
-        response = requests.get(url, headers=self.headers)
+        response = self.transport.get(url, headers=self.headers, endpoint="get_finetune_hyperparameters")
         
         if response.status_code == 200:
-            return response.json()
+            return self._typed(self.transport.decode(response), Hyperparameter)
         else:
-            error_msg = response.json().get("detail", "Unknown error")
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
             raise Exception(f"获取微调超参数失败: {error_msg}")
     
-    def create_dataset_split(self, project_id: str, task_id: str, request_data: Dict[str, Any]) -> Dict[str, Any]:
+    def create_dataset_split(self, project_id: str, task_id: str, request_data: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
         """
         创建数据集分割
         
@@ -155,21 +221,28 @@ class HetuAIFinetuneClient:
             project_id: 项目ID
             task_id: 任务ID
             request_data: 请求数据
+            idempotency_key: 幂等键（可选），不传时自动生成；重试时保持不变，避免重复写入
             
         Returns:
             创建的数据集分割
         """
         url = f"{self.base_url}/api/finetune/projects/{project_id}/tasks/{task_id}/dataset_splits"
         
-        response = requests.post(url, headers=self.headers, json=request_data)
+        response = self.transport.post(
+            url,
+            headers=self.headers,
+            json=request_data,
+            idempotency_key=idempotency_key or uuid.uuid4().hex
+        )
+        self.transport.invalidate_cache(url)
         
         if response.status_code == 200:
-            return response.json()
+            return self._typed(self.transport.decode(response), DatasetSplit)
         else:
-            error_msg = response.json().get("detail", "Unknown error")
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
             raise Exception(f"创建数据集分割失败: {error_msg}")
     
-    def create_finetune(self, project_id: str, task_id: str, request_data: Dict[str, Any]) -> Dict[str, Any]:
+    def create_finetune(self, project_id: str, task_id: str, request_data: Dict[str, Any], idempotency_key: Optional[str] = None) -> Dict[str, Any]:
         """
         创建微调
         
@@ -177,18 +250,24 @@ class HetuAIFinetuneClient:
             project_id: 项目ID
             task_id: 任务ID
             request_data: 请求数据
+            idempotency_key: 幂等键（可选），不传时自动生成；重试时保持不变，避免重复写入
             
         Returns:
             创建的微调
         """
         url = f"{self.base_url}/api/finetune/projects/{project_id}/tasks/{task_id}/finetunes"
         
-        response = requests.post(url, headers=self.headers, json=request_data)
+        response = self.transport.post(
+            url,
+            headers=self.headers,
+            json=request_data,
+            idempotency_key=idempotency_key or uuid.uuid4().hex
+        )
         
         if response.status_code == 200:
-            return response.json()
+            return self._typed(self.transport.decode(response), Finetune)
         else:
-            error_msg = response.json().get("detail", "Unknown error")
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
             raise Exception(f"创建微调失败: {error_msg}")
     
     def download_dataset_jsonl(
@@ -221,6 +300,148 @@ class HetuAIFinetuneClient:
             JSONL 文件内容
         """
         url = f"{self.base_url}/api/finetune/download_dataset_jsonl"
+        params = self._download_params(
+            project_id, task_id, dataset_id, split_name, format_type, data_strategy,
+            system_message_generator, custom_system_message, custom_thinking_instructions
+        )
+        
+        response = self.transport.get(url, headers=self.headers, params=params)
+        
+        if response.status_code == 200:
+            return response.content
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"下载数据集失败: {error_msg}")
+    
+    def download_dataset_jsonl_to_file(
+        self, 
+        project_id: str, 
+        task_id: str, 
+        dataset_id: str, 
+        split_name: str, 
+        format_type: str, 
+        data_strategy: str,
+        output_path: str,
+        system_message_generator: Optional[str] = None,
+        custom_system_message: Optional[str] = None,
+        custom_thinking_instructions: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        resume: bool = True,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        流式下载数据集 JSONL 到文件，内存占用与数据集大小无关
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            dataset_id: 数据集ID
+            split_name: 分割名称
+            format_type: 格式类型
+            data_strategy: 数据策略
+            output_path: 保存路径，下载过程中写入 output_path + ".part"
+            system_message_generator: 系统消息生成器
+            custom_system_message: 自定义系统消息
+            custom_thinking_instructions: 自定义思考指令
+            chunk_size: 每次读取的字节数
+            resume: 是否用 HTTP Range 续传中断的下载（包括上次遗留的 .part 文件）
+            progress_callback: 进度回调，参数为已下载字节数和总字节数（未知时为 None）
+            
+        Returns:
+            包含 path、bytes、sha256、resumes、not_modified 的下载结果
+        """
+        url = f"{self.base_url}/api/finetune/download_dataset_jsonl"
+        params = self._download_params(
+            project_id, task_id, dataset_id, split_name, format_type, data_strategy,
+            system_message_generator, custom_system_message, custom_thinking_instructions
+        )
+        
+        return download_to_file(
+            self.transport,
+            url,
+            output_path,
+            headers=self.headers,
+            params=params,
+            chunk_size=chunk_size,
+            resume=resume,
+            progress_callback=progress_callback,
+            error_prefix="下载数据集失败"
+        )
+    
+    def iter_dataset_jsonl(
+        self, 
+        project_id: str, 
+        task_id: str, 
+        dataset_id: str, 
+        split_name: str, 
+        format_type: str, 
+        data_strategy: str,
+        system_message_generator: Optional[str] = None,
+        custom_system_message: Optional[str] = None,
+        custom_thinking_instructions: Optional[str] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        as_lines: bool = True,
+        resume: bool = True,
+        progress_callback: Optional[Callable[[int, Optional[int]], None]] = None
+    ) -> Iterator[bytes]:
+        """
+        流式读取数据集 JSONL，边下载边产出
+        
+        连接中断时从已读取的字节偏移用 HTTP Range 续传（以 If-Range 保证同一版本）；
+        只在本次迭代内续传且不计算校验和，需要跨进程续传或 SHA-256 时使用
+        download_dataset_jsonl_to_file。
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            dataset_id: 数据集ID
+            split_name: 分割名称
+            format_type: 格式类型
+            data_strategy: 数据策略
+            system_message_generator: 系统消息生成器
+            custom_system_message: 自定义系统消息
+            custom_thinking_instructions: 自定义思考指令
+            chunk_size: 每次读取的字节数
+            as_lines: 为 True 时逐行产出（不含换行符），否则按原始字节块产出
+            resume: 是否在连接中断后用 HTTP Range 续传
+            progress_callback: 进度回调，参数为已下载字节数和总字节数（未知时为 None）
+            
+        Returns:
+            行或字节块的迭代器
+        """
+        url = f"{self.base_url}/api/finetune/download_dataset_jsonl"
+        params = self._download_params(
+            project_id, task_id, dataset_id, split_name, format_type, data_strategy,
+            system_message_generator, custom_system_message, custom_thinking_instructions
+        )
+        
+        chunks = iter_download(
+            self.transport,
+            url,
+            headers=self.headers,
+            params=params,
+            chunk_size=chunk_size,
+            resume=resume,
+            progress_callback=progress_callback,
+            error_prefix="下载数据集失败"
+        )
+        if as_lines:
+            yield from iter_lines(chunks)
+        else:
+            yield from chunks
+    
+    def _download_params(
+        self,
+        project_id: str,
+        task_id: str,
+        dataset_id: str,
+        split_name: str,
+        format_type: str,
+        data_strategy: str,
+        system_message_generator: Optional[str],
+        custom_system_message: Optional[str],
+        custom_thinking_instructions: Optional[str]
+    ) -> Dict[str, Any]:
         params = {
             "project_id": project_id,
             "task_id": task_id,
@@ -236,11 +457,4 @@ class HetuAIFinetuneClient:
             params["custom_system_message"] = custom_system_message
         if custom_thinking_instructions:
             params["custom_thinking_instructions"] = custom_thinking_instructions
-        
-        response = requests.get(url, headers=self.headers, params=params)
-        
-        if response.status_code == 200:
-            return response.content
-        else:
-            error_msg = response.json().get("detail", "Unknown error")
-            raise Exception(f"下载数据集失败: {error_msg}")
+        return params
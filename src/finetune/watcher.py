@@ -0,0 +1,365 @@
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Any, Tuple
+
+# 微调连续多次不在 get_finetunes 的结果中（例如已被删除）时事件的 new_status
+MISSING_STATUS = "missing"
+
+TERMINAL_STATES = {"completed", "succeeded", "success", "failed", "error", "cancelled", "canceled", MISSING_STATUS}
+
+TaskKey = Tuple[str, str]  # (project_id, task_id)
+
+
+class FinetuneEvent:
+    """
+    微调状态变化事件
+    """
+
+    __slots__ = ("project_id", "task_id", "finetune_id", "old_status", "new_status", "finetune")
+
+    def __init__(
+        self,
+        project_id: str,
+        task_id: str,
+        finetune_id: str,
+        old_status: Optional[str],
+        new_status: Optional[str],
+        finetune: Any
+    ):
+        self.project_id = project_id
+        self.task_id = task_id
+        self.finetune_id = finetune_id
+        self.old_status = old_status
+        self.new_status = new_status
+        self.finetune = finetune
+
+    @property
+    def terminal(self) -> bool:
+        return self.new_status in TERMINAL_STATES
+
+    def __repr__(self) -> str:
+        return f"FinetuneEvent({self.finetune_id!r}: {self.old_status!r} -> {self.new_status!r})"
+
+
+class _TaskGroup:
+    __slots__ = ("key", "callbacks", "statuses", "missing", "interval", "next_poll", "polls", "errors")
+
+    def __init__(self, key: TaskKey, interval: float):
+        self.key = key
+        self.callbacks: Dict[str, List[Callable[[FinetuneEvent], None]]] = {}
+        self.statuses: Dict[str, Optional[str]] = {}
+        # 微调连续不在轮询结果中的次数
+        self.missing: Dict[str, int] = {}
+        self.interval = interval
+        self.next_poll = 0.0
+        self.polls = 0
+        self.errors = 0
+
+
+def _status_of(finetune: Any) -> Optional[str]:
+    status = finetune.get("status")
+    return status.lower() if isinstance(status, str) else status
+
+
+class FinetuneWatcher:
+    """
+    监视多个微调的状态
+
+    按 (project_id, task_id) 分组，每个任务每个间隔只调用一次
+    get_finetunes(update_status=True)，无论该任务下注册了多少个微调或多少个
+    回调。状态没有变化时该任务的轮询间隔按 backoff_factor 增长（最大 max_interval），
+    有变化时恢复为 interval；间隔带 ±jitter 抖动。只在状态变化时产生事件，
+    进入终止状态（completed、failed、cancelled 等）的微调产生最后一个事件后
+    移出轮询集合，任务下没有微调时整个任务不再轮询。连续 max_missing_polls 次
+    成功轮询都不在结果中的微调（例如已被删除）产生 new_status 为 "missing"、
+    finetune 为 None 的终止事件后同样移出。
+
+    用法:
+
+        watcher = FinetuneWatcher(client, interval=30, on_event=print)
+        for project_id, task_id, finetune_id in targets:
+            watcher.watch(project_id, task_id, finetune_id)
+        watcher.run()            # 所有微调结束后返回
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        interval: float = 30.0,
+        max_interval: float = 600.0,
+        backoff_factor: float = 1.5,
+        jitter: float = 0.1,
+        max_concurrency: int = 4,
+        on_event: Optional[Callable[[FinetuneEvent], None]] = None,
+        max_missing_polls: Optional[int] = 3
+    ):
+        """
+        初始化监视器
+
+        Args:
+            client: HetuAIFinetuneClient（run）或 AsyncHetuAIFinetuneClient（run_async）实例
+            interval: 基础轮询间隔（秒）
+            max_interval: 最大轮询间隔（秒）
+            backoff_factor: 状态没有变化时间隔的增长倍数
+            jitter: 间隔的随机抖动比例
+            max_concurrency: 同时进行的 get_finetunes 请求数上限
+            on_event: 所有微调共用的事件回调（可选）
+            max_missing_polls: 微调连续多少次不在轮询结果中时视为已消失，None 表示一直等待
+        """
+        self.client = client
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.jitter = jitter
+        self.max_concurrency = max_concurrency
+        self.on_event = on_event
+        self.max_missing_polls = max_missing_polls
+        self._groups: Dict[TaskKey, _TaskGroup] = {}
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        # run_async 运行期间的停止事件及其事件循环，stop 可以从任意线程唤醒等待
+        self._async_stopped: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def watch(
+        self,
+        project_id: str,
+        task_id: str,
+        finetune_id: str,
+        callback: Optional[Callable[[FinetuneEvent], None]] = None
+    ) -> None:
+        """
+        注册要监视的微调；同一个微调可以注册多个回调
+
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            finetune_id: 微调ID
+            callback: 该微调的事件回调（可选）
+        """
+        key = (project_id, task_id)
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                group = self._groups[key] = _TaskGroup(key, self.interval)
+            callbacks = group.callbacks.setdefault(finetune_id, [])
+            group.statuses.setdefault(finetune_id, None)
+            if callback is not None:
+                callbacks.append(callback)
+            # 新注册的微调尽快得到第一次状态
+            group.next_poll = min(group.next_poll, time.monotonic())
+            group.interval = self.interval
+
+    def unwatch(self, project_id: str, task_id: str, finetune_id: str) -> None:
+        """
+        取消监视微调
+        """
+        key = (project_id, task_id)
+        with self._lock:
+            group = self._groups.get(key)
+            if group is None:
+                return
+            group.callbacks.pop(finetune_id, None)
+            group.statuses.pop(finetune_id, None)
+            group.missing.pop(finetune_id, None)
+            if not group.callbacks:
+                del self._groups[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(group.callbacks) for group in self._groups.values())
+
+    def _due_groups(self) -> List[_TaskGroup]:
+        now = time.monotonic()
+        with self._lock:
+            due = [group for group in self._groups.values() if group.next_poll <= now]
+        due.sort(key=lambda group: group.next_poll)
+        return due[:self.max_concurrency]
+
+    def _next_wake(self) -> Optional[float]:
+        with self._lock:
+            if not self._groups:
+                return None
+            return min(group.next_poll for group in self._groups.values())
+
+    def _apply(self, group: _TaskGroup, finetunes: Any, error: Optional[Exception]) -> List[Tuple[FinetuneEvent, list]]:
+        """
+        根据一次轮询结果更新状态（持有锁），返回要分发的事件与回调
+        """
+        project_id, task_id = group.key
+        group.polls += 1
+        dispatch = []
+        changed = False
+        if error is not None:
+            group.errors += 1
+        else:
+            seen = set()
+            for finetune in finetunes or []:
+                finetune_id = finetune.get("id")
+                if finetune_id not in group.callbacks:
+                    continue
+                seen.add(finetune_id)
+                group.missing.pop(finetune_id, None)
+                old_status = group.statuses[finetune_id]
+                new_status = _status_of(finetune)
+                if new_status == old_status:
+                    continue
+                changed = True
+                group.statuses[finetune_id] = new_status
+                event = FinetuneEvent(project_id, task_id, finetune_id, old_status, new_status, finetune)
+                dispatch.append((event, list(group.callbacks[finetune_id])))
+                if event.terminal:
+                    group.callbacks.pop(finetune_id)
+                    group.statuses.pop(finetune_id)
+
+            for finetune_id in [fid for fid in group.callbacks if fid not in seen]:
+                misses = group.missing.get(finetune_id, 0) + 1
+                if self.max_missing_polls is None or misses < self.max_missing_polls:
+                    group.missing[finetune_id] = misses
+                    continue
+                changed = True
+                old_status = group.statuses.pop(finetune_id)
+                group.missing.pop(finetune_id, None)
+                event = FinetuneEvent(project_id, task_id, finetune_id, old_status, MISSING_STATUS, None)
+                dispatch.append((event, group.callbacks.pop(finetune_id)))
+
+        if not group.callbacks:
+            if self._groups.get(group.key) is group:
+                del self._groups[group.key]
+            return dispatch
+        if changed:
+            group.interval = self.interval
+        else:
+            group.interval = min(group.interval * self.backoff_factor, self.max_interval)
+        delay = group.interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+        group.next_poll = time.monotonic() + delay
+        return dispatch
+
+    def _dispatch(self, dispatch: List[Tuple[FinetuneEvent, list]]) -> None:
+        for event, callbacks in dispatch:
+            for callback in callbacks:
+                callback(event)
+            if self.on_event is not None:
+                self.on_event(event)
+
+    def poll_once(self) -> List[FinetuneEvent]:
+        """
+        轮询所有到期的任务一次
+
+        Returns:
+            本次产生的事件
+        """
+        due = self._due_groups()
+        if not due:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(due))) as executor:
+            futures = [
+                executor.submit(self.client.get_finetunes, project_id, task_id, True)
+                for project_id, task_id in (group.key for group in due)
+            ]
+        dispatch = []
+        with self._lock:
+            for group, future in zip(due, futures):
+                error = future.exception()
+                dispatch.extend(self._apply(group, None if error else future.result(), error))
+        self._dispatch(dispatch)
+        return [event for event, _ in dispatch]
+
+    def run(self, timeout: Optional[float] = None) -> None:
+        """
+        持续轮询，直到所有微调进入终止状态、调用 stop 或超时
+
+        Args:
+            timeout: 最长运行秒数（可选）
+        """
+        self._stopped.clear()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._stopped.is_set():
+            wake_at = self._next_wake()
+            if wake_at is None or (deadline is not None and wake_at > deadline):
+                return
+            if self._stopped.wait(max(wake_at - time.monotonic(), 0)):
+                return
+            self.poll_once()
+
+    async def poll_once_async(self) -> List[FinetuneEvent]:
+        """
+        poll_once 的 asyncio 版本，client 须为 AsyncHetuAIFinetuneClient 实例
+        """
+        due = self._due_groups()
+        if not due:
+            return []
+        results = await asyncio.gather(
+            *(self.client.get_finetunes(project_id, task_id, True) for project_id, task_id in (g.key for g in due)),
+            return_exceptions=True
+        )
+        dispatch = []
+        with self._lock:
+            for group, result in zip(due, results):
+                error = result if isinstance(result, Exception) else None
+                dispatch.extend(self._apply(group, None if error else result, error))
+        self._dispatch(dispatch)
+        return [event for event, _ in dispatch]
+
+    async def run_async(self, timeout: Optional[float] = None) -> None:
+        """
+        run 的 asyncio 版本
+        """
+        self._stopped.clear()
+        self._loop = asyncio.get_running_loop()
+        self._async_stopped = asyncio.Event()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            while not self._stopped.is_set():
+                wake_at = self._next_wake()
+                if wake_at is None or (deadline is not None and wake_at > deadline):
+                    return
+                try:
+                    await asyncio.wait_for(self._async_stopped.wait(), max(wake_at - time.monotonic(), 0))
+                    return
+                except asyncio.TimeoutError:
+                    pass
+                await self.poll_once_async()
+        finally:
+            self._async_stopped = None
+            self._loop = None
+
+    def stop(self) -> None:
+        """
+        停止 run / run_async，可以从任意线程调用，正在等待下一次轮询的 run / run_async 立即返回
+        """
+        self._stopped.set()
+        loop, event = self._loop, self._async_stopped
+        if loop is not None and event is not None:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取统计信息
+
+        Returns:
+            包含 tasks、finetunes 以及每个任务的 finetunes、missing（当前未出现在轮询结果中的
+            微调数）、interval、polls、errors 的字典
+        """
+        with self._lock:
+            return {
+                "tasks": len(self._groups),
+                "finetunes": sum(len(group.callbacks) for group in self._groups.values()),
+                "groups": {
+                    f"{project_id}/{task_id}": {
+                        "finetunes": len(group.callbacks),
+                        "missing": len(group.missing),
+                        "interval": group.interval,
+                        "polls": group.polls,
+                        "errors": group.errors
+                    }
+                    for (project_id, task_id), group in self._groups.items()
+                }
+            }
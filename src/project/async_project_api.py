@@ -0,0 +1,264 @@
+from typing import Dict, Iterable, List, Optional, Any
+
+from core.async_transport import AsyncHetuAITransport
+from core.bulk import DEFAULT_MAX_WORKERS, run_bulk_async
+from core.models import Project, decode_as
+from task.async_task_api import AsyncHetuAITaskClient
+
+class AsyncHetuAIClient:
+    """
+    HetuAI 异步客户端，用于与 hetu_ai_gw 的项目 API 进行交互
+    """
+    
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        api_key: Optional[str] = None,
+        transport: Optional[AsyncHetuAITransport] = None,
+        typed: bool = False
+    ):
+        """
+        初始化 HetuAI 异步客户端
+        
+        Args:
+            base_url: API 服务的基础 URL
+            api_key: API 认证密钥（如果需要）
+            transport: 共享的异步 HTTP 传输层（可选），不传时创建独立的连接池
+            typed: 是否返回 core.models 中的类型化结果对象（使用 __slots__，内存占用更小），默认返回字典
+        """
+        self.base_url = base_url
+        self.typed = typed
+        self.transport = transport or AsyncHetuAITransport()
+        self.headers = {
+            "Content-Type": "application/json"
+        }
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+    
+    def _typed(self, data: Any, model: type) -> Any:
+        return decode_as(data, model) if self.typed else data
+    
+    async def create_project(self, name: str, description: str = "") -> Dict[str, Any]:
+        """
+        创建新项目
+        
+        Args:
+            name: 项目名称
+            description: 项目描述
+            
+        Returns:
+            创建的项目信息
+        """
+        url = f"{self.base_url}/api/project"
+        payload = {
+            "name": name,
+            "description": description
+        }
+        
+        response = await self.transport.post(url, headers=self.headers, json=payload)
+        self.transport.invalidate_cache(f"{self.base_url}/api/projects")
+        
+        if response.status_code == 200:
+            return self._typed(self.transport.decode(response), Project)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"创建项目失败: {error_msg}")
+    
+    async def get_projects(self) -> List[Dict[str, Any]]:
+        """
+        获取所有项目
+        
+        Returns:
+            项目列表
+        """
+        url = f"{self.base_url}/api/projects"
+        
+        response = await self.transport.get(url, headers=self.headers, endpoint="get_projects")
+        
+        if response.status_code == 200:
+            return self._typed(self.transport.decode(response).get("projects", []), Project)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"获取项目列表失败: {error_msg}")
+    
+    async def get_project(self, project_id: str) -> Dict[str, Any]:
+        """
+        获取特定项目
+        
+        Args:
+            project_id: 项目ID
+            
+        Returns:
+            项目信息
+        """
+        url = f"{self.base_url}/api/projects/{project_id}"
+        
+        response = await self.transport.get(url, headers=self.headers, endpoint="get_project")
+        
+        if response.status_code == 200:
+            return self._typed(self.transport.decode(response), Project)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"获取项目失败: {error_msg}")
+    
+    async def update_project(self, project_id: str, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        更新项目信息
+        
+        Args:
+            project_id: 项目ID
+            updates: 要更新的字段，可以包含 name 和/或 description
+            
+        Returns:
+            更新后的项目信息
+        """
+        url = f"{self.base_url}/api/projects/{project_id}"
+        
+        response = await self.transport.patch(url, headers=self.headers, json=updates)
+        self.transport.invalidate_cache(url)
+        self.transport.invalidate_cache(f"{self.base_url}/api/projects")
+        
+        if response.status_code == 200:
+            return self._typed(self.transport.decode(response), Project)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"更新项目失败: {error_msg}")
+    
+    async def delete_project(
+        self,
+        project_id: str,
+        delete_tasks: bool = False,
+        max_workers: int = DEFAULT_MAX_WORKERS
+    ) -> Dict[str, Any]:
+        """
+        删除项目
+        
+        Args:
+            project_id: 项目ID
+            delete_tasks: 是否先并发删除项目下的所有任务；有任务删除失败时不删除项目
+            max_workers: 删除任务的最大并发请求数
+            
+        Returns:
+            删除操作的结果信息
+        """
+        if delete_tasks:
+            task_client = self._task_client()
+            # 任务列表可能已被缓存，删除前重新获取，避免漏掉缓存之后创建的任务
+            self.transport.invalidate_cache(f"{self.base_url}/api/projects/{project_id}/tasks")
+            tasks = await task_client.get_tasks(project_id)
+            task_ids = [task.get("id") for task in tasks]
+            results = await task_client.delete_many(project_id, task_ids, max_workers=max_workers)
+            failed = [result for result in results if not result["success"]]
+            if failed:
+                raise Exception(f"删除项目失败: {len(failed)} 个任务删除失败，例如 {failed[0]['item']}: {failed[0]['error']}")
+        
+        url = f"{self.base_url}/api/projects/{project_id}"
+        
+        response = await self.transport.delete(url, headers=self.headers)
+        self.transport.invalidate_cache(url, prefix=True)
+        self.transport.invalidate_cache(f"{self.base_url}/api/projects")
+        
+        if response.status_code == 200:
+            return self.transport.decode(response)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"删除项目失败: {error_msg}")
+    
+    async def import_project(self, project_path: str) -> Dict[str, Any]:
+        """
+        导入现有项目
+        
+        Args:
+            project_path: 项目路径
+            
+        Returns:
+            导入的项目信息
+        """
+        url = f"{self.base_url}/api/import-project"
+        payload = {
+            "project_path": project_path
+        }
+        
+        response = await self.transport.post(url, headers=self.headers, json=payload)
+        self.transport.invalidate_cache(f"{self.base_url}/api/projects")
+        
+        if response.status_code == 200:
+            return self._typed(self.transport.decode(response), Project)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"导入项目失败: {error_msg}")
+    
+    async def get_many(
+        self,
+        project_ids: Iterable[str],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ordered: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        并发获取多个项目的详情，单个项目失败不影响其他项目
+        
+        Args:
+            project_ids: 项目ID列表
+            max_workers: 最大并发请求数
+            ordered: 是否按输入顺序返回；为 False 时按完成顺序返回
+            
+        Returns:
+            每个项目一个结果，包含 index、item（项目ID）、success、result（项目信息）和 error
+        """
+        return await run_bulk_async(self.get_project, project_ids, max_workers=max_workers, ordered=ordered)
+    
+    async def create_many(
+        self,
+        projects: Iterable[Dict[str, Any]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ordered: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        并发创建多个项目，单个项目失败不影响其他项目
+        
+        Args:
+            projects: 项目列表，每项包含 name 和可选的 description
+            max_workers: 最大并发请求数
+            ordered: 是否按输入顺序返回；为 False 时按完成顺序返回
+            
+        Returns:
+            每个项目一个结果，包含 index、item（项目数据）、success、result（创建的项目信息）和 error
+        """
+        return await run_bulk_async(
+            lambda project: self.create_project(project["name"], project.get("description", "")),
+            projects,
+            max_workers=max_workers,
+            ordered=ordered
+        )
+    
+    async def delete_many(
+        self,
+        project_ids: Iterable[str],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ordered: bool = True,
+        delete_tasks: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        并发删除多个项目，单个项目失败不影响其他项目
+        
+        Args:
+            project_ids: 项目ID列表
+            max_workers: 最大并发请求数
+            ordered: 是否按输入顺序返回；为 False 时按完成顺序返回
+            delete_tasks: 是否先删除每个项目下的任务，见 delete_project；每个项目的任务在
+                该项目的工作线程中依次删除，总并发请求数不超过 max_workers
+            
+        Returns:
+            每个项目一个结果，包含 index、item（项目ID）、success、result 和 error
+        """
+        return await run_bulk_async(
+            lambda project_id: self.delete_project(project_id, delete_tasks=delete_tasks, max_workers=1),
+            project_ids,
+            max_workers=max_workers,
+            ordered=ordered
+        )
+    
+    def _task_client(self) -> AsyncHetuAITaskClient:
+        task_client = AsyncHetuAITaskClient(self.base_url, transport=self.transport, typed=self.typed)
+        task_client.headers = dict(self.headers)
+        return task_client
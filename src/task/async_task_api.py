@@ -0,0 +1,217 @@
+from typing import Dict, Iterable, List, Optional, Any
+
+from core.async_transport import AsyncHetuAITransport
+from core.bulk import DEFAULT_MAX_WORKERS, run_bulk_async
+from core.models import Task, decode_as
+
+class AsyncHetuAITaskClient:
+    """
+    HetuAI 异步任务客户端，用于与 hetu_ai_gw 的任务 API 进行交互
+    """
+    
+    def __init__(
+        self,
+        base_url: str = "http://localhost:8000",
+        api_key: Optional[str] = None,
+        transport: Optional[AsyncHetuAITransport] = None,
+        typed: bool = False
+    ):
+        """
+        初始化 HetuAI 异步任务客户端
+        
+        Args:
+            base_url: API 服务的基础 URL
+            api_key: API 认证密钥（如果需要）
+            transport: 共享的异步 HTTP 传输层（可选），不传时创建独立的连接池
+            typed: 是否返回 core.models 中的类型化结果对象（使用 __slots__，内存占用更小），默认返回字典
+        """
+        self.base_url = base_url
+        self.typed = typed
+        self.transport = transport or AsyncHetuAITransport()
+        self.headers = {
+            "Content-Type": "application/json"
+        }
+        if api_key:
+            self.headers["Authorization"] = f"Bearer {api_key}"
+    
+    def _typed(self, data: Any, model: type) -> Any:
+        return decode_as(data, model) if self.typed else data
+    
+    async def create_task(self, project_id: str, task_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        创建新任务
+        
+        Args:
+            project_id: 项目ID
+            task_data: 任务数据
+            
+        Returns:
+            创建的任务信息
+        """
+        url = f"{self.base_url}/api/projects/{project_id}/task"
+        
+        response = await self.transport.post(url, headers=self.headers, json=task_data)
+        self.transport.invalidate_cache(f"{self.base_url}/api/projects/{project_id}/tasks")
+        
+        if response.status_code == 200:
+            return self._typed(self.transport.decode(response), Task)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"创建任务失败: {error_msg}")
+    
+    async def update_task(self, project_id: str, task_id: str, task_updates: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        更新任务信息
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            task_updates: 要更新的字段
+            
+        Returns:
+            更新后的任务信息
+        """
+        url = f"{self.base_url}/api/projects/{project_id}/task/{task_id}"
+        
+        response = await self.transport.patch(url, headers=self.headers, json=task_updates)
+        self.transport.invalidate_cache(f"{self.base_url}/api/projects/{project_id}/tasks")
+        self.transport.invalidate_cache(f"{self.base_url}/api/projects/{project_id}/tasks/{task_id}")
+        
+        if response.status_code == 200:
+            return self._typed(self.transport.decode(response), Task)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"更新任务失败: {error_msg}")
+    
+    async def delete_task(self, project_id: str, task_id: str) -> Dict[str, Any]:
+        """
+        删除任务
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            
+        Returns:
+            删除操作的结果信息
+        """
+        url = f"{self.base_url}/api/projects/{project_id}/task/{task_id}"
+        
+        response = await self.transport.delete(url, headers=self.headers)
+        self.transport.invalidate_cache(f"{self.base_url}/api/projects/{project_id}/tasks")
+        self.transport.invalidate_cache(f"{self.base_url}/api/projects/{project_id}/tasks/{task_id}")
+        
+        if response.status_code == 200:
+            return {"success": True, "message": "任务已成功删除"}
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"删除任务失败: {error_msg}")
+    
+    async def get_tasks(self, project_id: str) -> List[Dict[str, Any]]:
+        """
+        获取项目下的所有任务
+        
+        Args:
+            project_id: 项目ID
+            
+        Returns:
+            任务列表
+        """
+        url = f"{self.base_url}/api/projects/{project_id}/tasks"
+        
+        response = await self.transport.get(url, headers=self.headers, endpoint="get_tasks")
+        
+        if response.status_code == 200:
+            return self._typed(self.transport.decode(response), Task)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"获取任务列表失败: {error_msg}")
+    
+    async def get_task(self, project_id: str, task_id: str) -> Dict[str, Any]:
+        """
+        获取特定任务
+        
+        Args:
+            project_id: 项目ID
+            task_id: 任务ID
+            
+        Returns:
+            任务信息
+        """
+        url = f"{self.base_url}/api/projects/{project_id}/tasks/{task_id}"
+        
+        response = await self.transport.get(url, headers=self.headers, endpoint="get_task")
+        
+        if response.status_code == 200:
+            return self._typed(self.transport.decode(response), Task)
+        else:
+            error_msg = self.transport.decode(response).get("detail", "Unknown error")
+            raise Exception(f"获取任务失败: {error_msg}")
+    
+    async def get_many(
+        self,
+        project_id: str,
+        task_ids: Iterable[str],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ordered: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        并发获取多个任务的详情，单个任务失败不影响其他任务
+        
+        Args:
+            project_id: 项目ID
+            task_ids: 任务ID列表
+            max_workers: 最大并发请求数
+            ordered: 是否按输入顺序返回；为 False 时按完成顺序返回
+            
+        Returns:
+            每个任务一个结果，包含 index、item（任务ID）、success、result（任务信息）和 error
+        """
+        return await run_bulk_async(
+            lambda task_id: self.get_task(project_id, task_id), task_ids, max_workers=max_workers, ordered=ordered
+        )
+    
+    async def create_many(
+        self,
+        project_id: str,
+        tasks: Iterable[Dict[str, Any]],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ordered: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        并发创建多个任务，单个任务失败不影响其他任务
+        
+        Args:
+            project_id: 项目ID
+            tasks: 任务数据列表，格式同 create_task 的 task_data
+            max_workers: 最大并发请求数
+            ordered: 是否按输入顺序返回；为 False 时按完成顺序返回
+            
+        Returns:
+            每个任务一个结果，包含 index、item（任务数据）、success、result（创建的任务信息）和 error
+        """
+        return await run_bulk_async(
+            lambda task_data: self.create_task(project_id, task_data), tasks, max_workers=max_workers, ordered=ordered
+        )
+    
+    async def delete_many(
+        self,
+        project_id: str,
+        task_ids: Iterable[str],
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        ordered: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        并发删除多个任务，单个任务失败不影响其他任务
+        
+        Args:
+            project_id: 项目ID
+            task_ids: 任务ID列表
+            max_workers: 最大并发请求数
+            ordered: 是否按输入顺序返回；为 False 时按完成顺序返回
+            
+        Returns:
+            每个任务一个结果，包含 index、item（任务ID）、success、result 和 error
+        """
+        return await run_bulk_async(
+            lambda task_id: self.delete_task(project_id, task_id), task_ids, max_workers=max_workers, ordered=ordered
+        )
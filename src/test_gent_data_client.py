@@ -1,4 +1,5 @@
 from dataset.dataset_api import HetuAIDataGenClient
+from core.models import Sample
 import json
 import os
 
@@ -42,8 +43,8 @@ def main():
         print(f"生成的样本: {json.dumps(samples_result, indent=2, ensure_ascii=False)}")
         
         # 保存第一个生成的样本（如果有）
-        if hasattr(samples_result, 'samples') and len(samples_result.samples) > 0:
-            first_sample = samples_result.samples[0]
+        if samples_result.get("samples"):
+            first_sample = Sample.from_dict(samples_result["samples"][0])
             
             # 测试保存单个样本
             print("\n测试保存样本...")